@@ -1,5 +1,9 @@
 import asyncio
 import json
+import os
+import queue
+import threading
+import time
 from datetime import datetime, timezone, timedelta
 
 import pandas as pd
@@ -46,8 +50,21 @@ def floor_time(ts: pd.Timestamp, tf: str):
         return ts.floor(f"{tf[:-1]}H")
     raise ValueError(tf)
 
-def save_csv(df: pd.DataFrame):
-    df.sort_index().to_csv(f"{SYMBOL}.csv")
+def save_csv(df: pd.DataFrame, path: str):
+    df.sort_index().to_csv(path)
+
+def save_trades_csv(rows: list, path: str):
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+def apply_candles(df: pd.DataFrame, candles: dict) -> pd.DataFrame:
+    """Fold ``{time: candle}`` rows into the persisted candle frame"""
+    for candle_time, candle in candles.items():
+        df.loc[candle_time] = candle
+    return df
+
+def append_trade(rows: list, trade: dict) -> list:
+    rows.append(trade)
+    return rows
 
 def load_csv_to_candles(file_bytes: bytes):
     from io import BytesIO
@@ -76,6 +93,126 @@ async def broadcast(candle: dict):
             dead.add(ws)
     clients.difference_update(dead)
 
+# ---------------- PERSISTENCE ---------------- #
+
+class PersistenceWorker:
+    """Background thread that owns every disk write of the backend.
+
+    Each file is tracked once with its initial state, an ``apply(state,
+    delta)`` function and a ``write(state, tmp_path)`` function; from then on
+    the event loop only enqueues small deltas (the candles or trades that
+    changed), so it never copies the accumulated data. The worker drains
+    whatever is queued, folds the deltas into the state it owns and writes
+    each touched file once per batch. A burst of candle closes or orders
+    therefore costs one write per file. Each file is written to a temp file
+    and swapped in with ``os.replace`` so readers never see a half-written CSV.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+        self._files: dict = {}
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.batches = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Flush everything still queued and stop the thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def track(self, path: str, state, apply, write):
+        """Hand ``state`` for ``path`` to the worker; ignored if the path is already tracked.
+
+        ``state`` belongs to the worker afterwards and must not be used by the caller.
+        """
+        self._queue.put(("track", path, (state, apply, write)))
+
+    def submit(self, path: str, delta):
+        """Queue ``delta`` to be folded into the state of a tracked ``path``"""
+        self._queue.put(("delta", path, delta))
+
+    def metrics(self) -> dict:
+        return {
+            "backlog": self._queue.qsize(),
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_write_ms": round(self.last_latency * 1000, 3),
+            "max_write_ms": round(self.max_latency * 1000, 3),
+            "avg_write_ms": round(self.total_latency / self.writes * 1000, 3) if self.writes else 0.0,
+        }
+
+    def _run(self):
+        running = True
+        while running:
+            dirty = set()
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    running = False
+                else:
+                    self._handle(item, dirty)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            for path in dirty:
+                state, _, write = self._files[path]
+                self._write(path, write, state)
+            if dirty:
+                self.batches += 1
+
+    def _handle(self, item, dirty: set):
+        kind, path, payload = item
+        if kind == "track":
+            self._files.setdefault(path, list(payload))
+            return
+
+        entry = self._files.get(path)
+        if entry is None:
+            self.errors += 1
+            print(f"Dropped update for untracked file {path}")
+            return
+        try:
+            entry[0] = entry[1](entry[0], payload)
+        except Exception as e:
+            self.errors += 1
+            print(f"Failed to apply update to {path}: {e}")
+            return
+        if path in dirty:
+            self.coalesced += 1
+        dirty.add(path)
+
+    def _write(self, path: str, write, state):
+        start = time.perf_counter()
+        tmp_path = f"{path}.tmp"
+        try:
+            write(state, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.errors += 1
+            print(f"Failed to write {path}: {e}")
+            return
+
+        latency = time.perf_counter() - start
+        self.writes += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+
+
+persistence = PersistenceWorker()
+
 # ---------------- DATA ---------------- #
 
 def fetch_historical():
@@ -124,6 +261,9 @@ async def stream_trades():
     ).set_index("time")
 
     last_candle = df.index[-1]
+    # The worker keeps its own copy from here on; only touched candles are sent
+    persistence.track(f"{SYMBOL}.csv", df.copy(), apply_candles, save_csv)
+    touched = {}
 
     async with websockets.connect(uri) as ws:
         async for msg in ws:
@@ -160,10 +300,12 @@ async def stream_trades():
             }
 
             await broadcast(candle)
+            touched[candle_time] = {k: v for k, v in candle.items() if k != "time"}
 
             # candle closed
             if candle_time != last_candle:
-                save_csv(df)
+                persistence.submit(f"{SYMBOL}.csv", touched)
+                touched = {}
                 last_candle = candle_time
 
 # ---------------- ENDPOINTS ---------------- # 
@@ -228,15 +370,25 @@ async def place_trade(
 
     trades.append(trade)
 
-    # Optional: persist to CSV
-    df = pd.DataFrame(trades)
-    df.to_csv(f"{symbol}_trades.csv", index=False)
+    # Optional: persist to CSV (written by the persistence thread)
+    path = f"{symbol}_trades.csv"
+    persistence.track(path, [], append_trade, save_trades_csv)
+    persistence.submit(path, trade)
 
     return {"success": True, "trade": trade}
 
+@app.get("/metrics/persistence")
+async def persistence_metrics():
+    return persistence.metrics()
+
 
 # ---------------- START ---------------- #
 
 @app.on_event("startup")
 async def startup():
+    persistence.start()
     asyncio.create_task(stream_trades())
+
+@app.on_event("shutdown")
+async def shutdown():
+    await asyncio.to_thread(persistence.stop)
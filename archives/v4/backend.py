@@ -2,13 +2,22 @@ import asyncio
 import json
 from datetime import datetime, timezone, timedelta
 from collections import defaultdict
-from typing import Dict, Set
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
 
+import numpy as np
+import pandas as pd
 import websockets
-from fastapi import FastAPI, WebSocket, UploadFile, File, HTTPException
+from fastapi import FastAPI, WebSocket, UploadFile, File, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 import aiohttp
 
+from fixedpoint import FloatScale, Scales
+from indicators import EMA, MACD, RSI, SMA, TEMA, BollingerBands, IndicatorEngine
+from shards import ShardedTrading, ShardUnavailable
+from signals import SignalService
+from trading import PaperTrading
+
 # ---------------- CONFIG ---------------- #
 
 BINANCE_WS = "wss://stream.binance.com:9443/ws"
@@ -27,6 +36,34 @@ INTERVAL_MS = {
 # Optimization settings
 BROADCAST_INTERVAL = 0.1  # seconds - batch updates every 100ms
 MAX_CANDLES_IN_MEMORY = 10000  # limit memory usage
+REORDER_WINDOW = 100  # how many candles behind the newest a late trade may land
+CSV_CHUNK_ROWS = 100_000  # rows parsed per chunk by /load-csv
+
+LEDGER_PATH = "trades.jsonl"  # append-only paper-trade log
+MAX_TRADES_PAGE = 1000
+MAX_BATCH_ORDERS = 5000  # orders accepted by one /trades/batch request
+
+INITIAL_BALANCE = 10_000.0
+DEFAULT_ACCOUNT = "default"
+EQUITY_SAMPLE_INTERVAL = 1.0  # seconds between equity-curve samples
+NUM_SHARDS = 0  # > 0 serves /accounts/... from this many worker processes
+SHARD_CALL_TIMEOUT = 10.0  # seconds before a shard request fails with 503
+
+# Fixed-point mode keeps prices in ticks and quantities in lots (int64) in the
+# candle store, paper engine and ledger; the API still speaks decimals.
+# Switching it on or off needs a fresh ledger file.
+FIXED_POINT = False
+SYMBOL_FILTERS = {"BTCUSDT": ("0.01", "0.00001")}  # tick size, step size
+
+MAX_INDICATOR_ROWS = 1000  # closed-candle rows per /indicators request
+
+# Live strategy signals for many pairs (empty list disables the service)
+SIGNAL_PAIRS = []  # e.g. ["BTC/USDT", "ETH/USDT"]
+SIGNAL_TIMEFRAME = "5m"
+SIGNAL_STRATEGY = "SampleStrategy"
+SIGNAL_STRATEGY_PATH = Path(__file__).resolve().parents[2] / "fretrade_templates"
+SIGNAL_WINDOW = 300  # closed candles per evaluation; must cover startup_candle_count
+SIGNAL_WORKERS = 4
 
 # ---------------- APP ---------------- #
 
@@ -40,64 +77,336 @@ app.add_middleware(
 
 # ---------------- IN-MEMORY DATA STRUCTURES ---------------- #
 
+CANDLE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(CANDLE_FIELDS))
+
+
 class CandleStore:
-    """Fast in-memory candle storage with O(1) lookups"""
+    """Columnar in-memory candle storage.
+
+    Candles live in preallocated NumPy arrays ordered by time: ``_times``
+    (int64 seconds) and ``_ohlcv`` (one column per field), valid in rows
+    ``[_start, _end)``. ``_ohlcv`` holds float64 values, or int64 ticks and
+    lots when the store is given a fixed-point ``scale``; candle dicts are
+    always converted back to decimals. Live trades only touch the newest rows, bulk
+    loads write a whole batch at once, and eviction just advances ``_start``;
+    the buffer is compacted when it runs out of room at the end.
+
+    Candles arriving out of order are inserted in place as long as they are
+    within ``reorder_window`` candles of the newest one; anything older is
+    dropped and counted in ``late_dropped``. Backfilled ranges go through
+    ``bulk_load``.
+
+    ``revision`` is bumped whenever a candle other than the newest changes
+    or is inserted, so derived state (indicators) knows to recompute.
+    """
     
-    def __init__(self):
-        self.candles: Dict[int, dict] = {}  # time -> candle
-        self.sorted_times = []
-        self.dirty = False
+    def __init__(
+        self,
+        max_candles: int = MAX_CANDLES_IN_MEMORY,
+        reorder_window: int = REORDER_WINDOW,
+        scale=None,
+    ):
+        self.scale = scale or FloatScale()
+        self.max_candles = max_candles
+        self.reorder_window = reorder_window
+        self.late_dropped = 0
+        self.revision = 0
+
+        capacity = 2 * max_candles
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._ohlcv = np.zeros((capacity, len(CANDLE_FIELDS)), dtype=self.scale.dtype)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def times(self) -> np.ndarray:
+        """View of the candle open times (seconds), ascending"""
+        return self._times[self._start:self._end]
+
+    @property
+    def ohlcv(self) -> np.ndarray:
+        """View of the candle values (in store units), one row per entry in ``times``"""
+        return self._ohlcv[self._start:self._end]
         
-    def update(self, time: int, price: float, qty: float):
-        """Update existing candle or create new one"""
-        if time in self.candles:
-            c = self.candles[time]
-            c['high'] = max(c['high'], price)
-            c['low'] = min(c['low'], price)
-            c['close'] = price
-            c['volume'] += qty
+    def update(self, time: int, price, qty) -> bool:
+        """Update existing candle or create new one.
+
+        ``price`` and ``qty`` may be the exchange's decimal strings. Returns
+        False if the trade was too late to be placed and was dropped.
+        """
+        price, qty = self.scale.price(price), self.scale.qty(qty)
+        end = self._end
+        if end > self._start and self._times[end - 1] == time:
+            self._apply_trade(end - 1, price, qty)
+            return True
+
+        times = self.times
+        if not len(times) or time > times[-1]:
+            self._reserve(1)
+            self._write_new(self._end, time, price, qty)
+            self._end += 1
+            self._evict()
+            return True
+
+        lo = max(0, len(times) - self.reorder_window)
+        if time < times[lo]:
+            # Too old to reorder - only an existing candle can still take it
+            lo = 0
+        offset = lo + int(np.searchsorted(times[lo:], time))
+        row = self._start + offset
+        if self._times[row] == time:
+            self._apply_trade(row, price, qty)
+            self.revision += 1
+            return True
+        if lo == 0 and len(times) > self.reorder_window:
+            self.late_dropped += 1
+            return False
+
+        # Shift the tail of the window right by one to make room; reserving may
+        # compact the buffer and move _start, so the row is taken after it
+        self._reserve(1)
+        row = self._start + offset
+        end = self._end
+        self._times[row + 1:end + 1] = self._times[row:end]
+        self._ohlcv[row + 1:end + 1] = self._ohlcv[row:end]
+        self._write_new(row, time, price, qty)
+        self._end += 1
+        self.revision += 1
+        self._evict()
+        return True
+
+    def bulk_load(self, times, opens, highs, lows, closes, volumes) -> int:
+        """Write a batch of complete candles given as columns.
+
+        The batch may be unsorted and may overlap what is already stored;
+        existing candles with the same time are overwritten and duplicate
+        times within the batch keep the last one. Index maintenance and
+        eviction run once per batch. Returns the number of new candles.
+        """
+        return self.load_batch(*self.prepare_batch(times, opens, highs, lows, closes, volumes))
+
+    def prepare_batch(self, times, opens, highs, lows, closes, volumes) -> tuple:
+        """Sort, deduplicate and convert a batch for ``load_batch``.
+
+        Only reads ``scale``, so it may run in a worker thread while the
+        event loop keeps updating the store.
+        """
+        t = np.asarray(times, dtype=np.int64)
+        values = np.column_stack([
+            *(self.scale.prices(col) for col in (opens, highs, lows, closes)),
+            self.scale.qtys(volumes),
+        ]) if t.size else np.empty((0, len(CANDLE_FIELDS)), dtype=self.scale.dtype)
+
+        if np.any(t[1:] < t[:-1]):
+            order = np.argsort(t, kind='stable')
+            t, values = t[order], values[order]
+        if np.any(t[1:] == t[:-1]):
+            keep = np.append(t[1:] != t[:-1], True)
+            t, values = t[keep], values[keep]
+        return t, values
+
+    def load_batch(self, t: np.ndarray, values: np.ndarray) -> int:
+        """Merge a batch from ``prepare_batch`` (sorted, unique times) into the store.
+
+        Costs O(k log n) for the lookups plus moving the stored candles
+        newer than the oldest inserted one, in place. A batch older than
+        everything stored goes into the free rows before ``_start`` when
+        there are enough; only a full store has them, so eviction drops the
+        batch again without anything having moved.
+        """
+        if not t.size:
+            return 0
+
+        current = self.times
+        if not len(current) or t[0] > current[-1]:
+            # Common case: the batch extends the series
+            t, values = t[-self.max_candles:], values[-self.max_candles:]
+            added = len(t)
+            self._reserve(added)
+            self._times[self._end:self._end + added] = t
+            self._ohlcv[self._end:self._end + added] = values
+            self._end += added
+            self._evict()
+            return added
+
+        pos = np.searchsorted(current, t)
+        hit = pos < len(current)
+        hit[hit] = current[pos[hit]] == t[hit]
+        self._ohlcv[self._start + pos[hit]] = values[hit]
+        self.revision += 1
+
+        new = ~hit
+        added = int(new.sum())
+        if not added:
+            return 0
+        t, values, pos = t[new], values[new], pos[new]
+
+        if pos[-1] == 0 and self._start >= added:
+            # Older than a full window: write it where eviction left room
+            self._start -= added
+            self._times[self._start:self._start + added] = t
+            self._ohlcv[self._start:self._start + added] = values
         else:
-            self.candles[time] = {
-                'open': price,
-                'high': price,
-                'low': price,
-                'close': price,
-                'volume': qty
-            }
-            self.sorted_times.append(time)
-            self.dirty = True
-            
-            # Memory management - keep only recent candles
-            if len(self.sorted_times) > MAX_CANDLES_IN_MEMORY:
-                old_time = self.sorted_times.pop(0)
-                del self.candles[old_time]
+            size = len(current)
+            self._reserve(added)
+            base = self._start
+            # Each stored candle from the first insertion point on moves right
+            # by the number of new candles that go before it
+            old = np.arange(pos[0], size)
+            dest = base + old + np.searchsorted(pos, old, side='right')
+            self._times[dest] = self._times[base + old]
+            self._ohlcv[dest] = self._ohlcv[base + old]
+            rows = base + pos + np.arange(added)
+            self._times[rows] = t
+            self._ohlcv[rows] = values
+            self._end += added
+
+        self._evict()
+        return added
+
+    def bulk_load_klines(self, klines: list) -> int:
+        """Write one page of Binance ``/api/v3/klines`` rows"""
+        if not klines:
+            return 0
+        raw = np.array([k[:6] for k in klines], dtype=np.float64)
+        # k[0] is open time in milliseconds - convert to seconds for consistency
+        return self.bulk_load(
+            raw[:, 0].astype(np.int64) // 1000,
+            raw[:, 1], raw[:, 2], raw[:, 3], raw[:, 4], raw[:, 5],
+        )
+
+    def merge(self, candles: Iterable[dict]) -> int:
+        """Merge a backfilled range of candle dicts (see ``bulk_load``)"""
+        candles = list(candles)
+        return self.bulk_load(
+            [c['time'] for c in candles],
+            *([c[f] for c in candles] for f in CANDLE_FIELDS),
+        )
+
+    def _apply_trade(self, row: int, price, qty):
+        c = self._ohlcv[row]
+        if price > c[HIGH]:
+            c[HIGH] = price
+        if price < c[LOW]:
+            c[LOW] = price
+        c[CLOSE] = price
+        c[VOLUME] += qty
+
+    def _write_new(self, row: int, time: int, price, qty):
+        self._times[row] = time
+        self._ohlcv[row] = (price, price, price, price, qty)
+
+    def _reserve(self, n: int):
+        """Make room for ``n`` more rows after ``_end``"""
+        if self._end + n <= len(self._times):
+            return
+        size = len(self)
+        if size + n > len(self._times):
+            capacity = max(2 * len(self._times), size + n)
+            times = np.zeros(capacity, dtype=np.int64)
+            ohlcv = np.zeros((capacity, len(CANDLE_FIELDS)), dtype=self.scale.dtype)
+        else:
+            times, ohlcv = self._times, self._ohlcv
+        times[:size] = self.times
+        ohlcv[:size] = self.ohlcv
+        self._times, self._ohlcv = times, ohlcv
+        self._start, self._end = 0, size
+
+    def _evict(self):
+        """Memory management - keep only recent candles"""
+        if len(self) > self.max_candles:
+            self._start = self._end - self.max_candles
+
+    def _to_dicts(self, start: int, end: int) -> list:
+        times = self._times[start:end].tolist()
+        ohlcv = self._ohlcv[start:end]
+        rows = np.column_stack([
+            self.scale.prices_out(ohlcv[:, :VOLUME]),
+            self.scale.qtys_out(ohlcv[:, VOLUME]),
+        ]).tolist()
+        return [
+            {'time': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for t, (o, h, l, c, v) in zip(times, rows)
+        ]
     
     def get(self, time: int) -> dict:
         """Get candle with time included"""
-        candle = self.candles.get(time)
-        if candle:
-            return {'time': time, **candle}
+        row = self._start + int(np.searchsorted(self.times, time))
+        if row < self._end and self._times[row] == time:
+            return self._to_dicts(row, row + 1)[0]
         return None
     
     def get_latest(self) -> dict:
         """Get most recent candle"""
-        if self.sorted_times:
-            return self.get(self.sorted_times[-1])
+        if len(self):
+            return self._to_dicts(self._end - 1, self._end)[0]
         return None
     
-    def get_all(self) -> list:
-        """Get all candles sorted by time"""
-        if self.dirty:
-            self.sorted_times.sort()
-            self.dirty = False
-        return [self.get(t) for t in self.sorted_times]
+    def get_all(self, limit: int = None) -> list:
+        """Get all candles sorted by time, or only the newest ``limit``"""
+        start = self._start if limit is None else max(self._start, self._end - limit)
+        return self._to_dicts(start, self._end)
 
 
-candle_store = CandleStore()
+scales = Scales(SYMBOL_FILTERS if FIXED_POINT else None)
+candle_store = CandleStore(scale=scales[SYMBOL])
 clients: Set[WebSocket] = set()
 
-# Trade ledger
-trades = []
+# Live indicators on the candle store (same settings as SampleStrategy)
+indicators = IndicatorEngine({
+    "rsi": RSI(14),
+    "macd": MACD(12, 26, 9),
+    "bb": BollingerBands(20, 2.0),
+    "tema": TEMA(9),
+    "ema": EMA(50),
+    "sma": SMA(200),
+}, history=MAX_CANDLES_IN_MEMORY)
+indicator_clients: Set[WebSocket] = set()
+indicator_lock = asyncio.Lock()
+last_indicators = None
+
+# Paper accounts, resting orders and the trade ledger, fed by the live trade
+# stream; created on startup, which replays the ledger
+trading: Optional[PaperTrading] = None
+equity_clients: Set[WebSocket] = set()
+
+def publish_equity(point: dict):
+    """Forward an equity sample from a shard process to /ws/equity"""
+    if equity_clients:
+        asyncio.create_task(send_all(equity_clients, json.dumps({"type": "equity", "data": point})))
+
+# Multi-account paper trading sharded across processes (optional)
+shards = ShardedTrading(
+    NUM_SHARDS, LEDGER_PATH, INITIAL_BALANCE, EQUITY_SAMPLE_INTERVAL,
+    on_equity=publish_equity, scales=scales, call_timeout=SHARD_CALL_TIMEOUT,
+) if NUM_SHARDS else None
+
+signal_clients: Set[WebSocket] = set()
+
+def publish_signal(event: dict):
+    """Forward an enter_long/exit_long event to /ws/signals"""
+    if signal_clients:
+        asyncio.create_task(send_all(signal_clients, json.dumps({"type": "signal", "data": event})))
+
+# Strategy signals evaluated in a process pool as candles close (optional)
+signal_service = SignalService(
+    SIGNAL_PAIRS,
+    SIGNAL_TIMEFRAME,
+    {
+        "strategy": SIGNAL_STRATEGY,
+        "strategy_path": str(SIGNAL_STRATEGY_PATH),
+        "exchange": {"name": "binance"},
+        "stake_currency": "USDT",
+        "dry_run": True,
+    },
+    SIGNAL_WINDOW,
+    SIGNAL_WORKERS,
+    on_signal=publish_signal,
+) if SIGNAL_PAIRS else None
 
 # Pending broadcast queue
 pending_update = None
@@ -119,6 +428,45 @@ def floor_time_ms(ts_ms: int, tf: str) -> int:
     
     return ts_seconds
 
+def indicator_inputs(after: Optional[int] = None) -> tuple:
+    """Candle times with decimal highs, lows and closes (copies, safe to hand to a thread)
+
+    With ``after``, only the candles newer than that time are converted.
+    """
+    times = candle_store.times
+    start = 0 if after is None else int(np.searchsorted(times, after, side="right"))
+    ohlcv = candle_store.ohlcv[start:]
+    return (
+        times[start:].copy(),
+        *(candle_store.scale.prices_out(ohlcv[:, col]) for col in (HIGH, LOW, CLOSE)),
+    )
+
+async def latest_indicators() -> Optional[dict]:
+    """Fold newly closed candles into the indicators and evaluate the forming one.
+
+    A changed revision (older candles edited) rebuilds the indicators from
+    the whole store in a worker thread. Otherwise only the candles after the
+    last committed one are converted, so a call costs the new candles rather
+    than the whole store.
+    """
+    async with indicator_lock:
+        revision = candle_store.revision
+        if revision != indicators.revision:
+            inputs = indicator_inputs()
+            indicators.adopt(await asyncio.to_thread(indicators.rebuilt, *inputs, revision))
+        # Candles edited during the rebuild are picked up by the next rebuild
+        return indicators.latest(*indicator_inputs(indicators.last_time))
+
+def normalize_times(col: pd.Series) -> np.ndarray:
+    """Vectorized conversion of a CSV time column to epoch seconds"""
+    if pd.api.types.is_numeric_dtype(col):
+        t = col.to_numpy(dtype=np.int64)
+        # Millisecond timestamps (Binance style) are scaled down to seconds
+        return np.where(t > 10**11, t // 1000, t)
+
+    dt = pd.to_datetime(col, utc=True)
+    return ((dt - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+
 # ---------------- DATA FETCHING ---------------- #
 
 async def fetch_historical():
@@ -146,27 +494,13 @@ async def fetch_historical():
                 if not data:
                     break
                 
-                for k in data:
-                    # k[0] is open time in milliseconds
-                    candle_time = k[0] // 1000  # Convert to seconds for consistency
-                    
-                    candle_store.update(
-                        candle_time,
-                        float(k[4]),  # close price
-                        float(k[5])   # volume
-                    )
-                    # Set OHLC properly for historical
-                    candle_store.candles[candle_time].update({
-                        'open': float(k[1]),
-                        'high': float(k[2]),
-                        'low': float(k[3]),
-                    })
+                candle_store.bulk_load_klines(data)
                 
                 start_ms = data[-1][0] + INTERVAL_MS[TIMEFRAME]
     
-    print(f"Loaded {len(candle_store.candles)} historical candles")
-    print(f"First candle time: {list(candle_store.sorted_times)[:3] if candle_store.sorted_times else 'none'}")
-    print(f"Last candle time: {list(candle_store.sorted_times)[-3:] if candle_store.sorted_times else 'none'}")
+    print(f"Loaded {len(candle_store)} historical candles")
+    print(f"First candle time: {candle_store.times[:3].tolist() if len(candle_store) else 'none'}")
+    print(f"Last candle time: {candle_store.times[-3:].tolist() if len(candle_store) else 'none'}")
     
     return candle_store.get_all()
 
@@ -174,7 +508,7 @@ async def fetch_historical():
 
 async def broadcast_worker():
     """Batched broadcasting - sends updates every BROADCAST_INTERVAL"""
-    global pending_update
+    global pending_update, last_indicators
     
     while True:
         await asyncio.sleep(BROADCAST_INTERVAL)
@@ -185,17 +519,36 @@ async def broadcast_worker():
                 msg = json.dumps(pending_update)
                 
                 # Broadcast to all clients
-                dead = set()
-                for ws in clients:
-                    try:
-                        await ws.send_text(msg)
-                    except:
-                        dead.add(ws)
-                
-                # Clean up dead connections
-                clients.difference_update(dead)
+                await send_all(clients, msg)
                 
                 pending_update = None
+        
+        if indicator_clients:
+            row = await latest_indicators()
+            if row and row != last_indicators:
+                await send_all(indicator_clients, json.dumps({"type": "indicators", "data": row}))
+                last_indicators = row
+
+async def equity_worker():
+    """Emit an equity-curve sample every EQUITY_SAMPLE_INTERVAL if anything moved"""
+    while True:
+        await asyncio.sleep(EQUITY_SAMPLE_INTERVAL)
+        
+        point = trading.sample(int(datetime.now(tz=timezone.utc).timestamp()))
+        if point and equity_clients:
+            await send_all(equity_clients, json.dumps({"type": "equity", "data": point}))
+
+async def send_all(targets: Set[WebSocket], msg: str):
+    """Send one message to every socket, dropping dead connections"""
+    dead = set()
+    for ws in targets:
+        try:
+            await ws.send_text(msg)
+        except:
+            dead.add(ws)
+    
+    # Clean up dead connections
+    targets.difference_update(dead)
 
 # ---------------- STREAM TRADES ---------------- #
 
@@ -217,8 +570,9 @@ async def stream_trades():
         async for msg in ws:
             t = json.loads(msg)
             
-            price = float(t["p"])
-            qty = float(t["q"])
+            # Decimal strings as sent; each consumer converts them to its own units
+            price = t["p"]
+            qty = t["q"]
             trade_time_ms = t["T"]  # Trade time in milliseconds
             
             # Calculate candle time (in seconds)
@@ -229,8 +583,15 @@ async def stream_trades():
             if trade_count <= 3:
                 print(f"Trade #{trade_count}: trade_time_ms={trade_time_ms}, candle_time={candle_time}, price={price}")
             
+            # Fill resting paper orders crossed by this trade, then re-mark positions
+            trading.on_trade(SYMBOL, price, qty, trade_time_ms // 1000)
+            if shards:
+                shards.broadcast_trade(SYMBOL, price, qty, trade_time_ms // 1000)
+            
             # Update candle store (fast in-memory operation)
-            candle_store.update(candle_time, price, qty)
+            if not candle_store.update(candle_time, price, qty):
+                # Too far behind the newest candle to reorder - skip it
+                continue
             
             # Prepare update for broadcast (will be sent in batch)
             async with broadcast_lock:
@@ -257,33 +618,291 @@ async def get_latest_candle():
         raise HTTPException(status_code=404, detail="No candles available")
     return candle
 
+@app.post("/load-csv")
+async def load_csv(file: UploadFile = File(...)):
+    """Stream a candle CSV into the store and return a summary.
+
+    The upload is parsed, sorted and converted CSV_CHUNK_ROWS at a time off
+    the event loop; each chunk is then merged into the candle store with one
+    load_batch call, so memory stays bounded by the chunk size rather than
+    the file size.
+    """
+    reader = None
+    rows = added = chunks = 0
+    first = last = None
+
+    try:
+        # read_csv already parses the header, so it runs off the loop too
+        reader = await asyncio.to_thread(pd.read_csv, file.file, chunksize=CSV_CHUNK_ROWS)
+        while True:
+            chunk = await asyncio.to_thread(next, reader, None)
+            if chunk is None:
+                break
+
+            # handle index-based CSV
+            if "time" not in chunk.columns:
+                if not isinstance(chunk.index, pd.RangeIndex):
+                    chunk = chunk.reset_index()
+                chunk = chunk.rename(columns={chunk.columns[0]: "time"})
+
+            chunk = chunk.dropna(subset=["time", *CANDLE_FIELDS])
+            if chunk.empty:
+                continue
+
+            times = normalize_times(chunk["time"])
+            batch = await asyncio.to_thread(
+                candle_store.prepare_batch,
+                times, *(chunk[f].to_numpy(dtype=np.float64) for f in CANDLE_FIELDS),
+            )
+            # The store is shared with the live stream, so the merge itself stays on the loop
+            added += candle_store.load_batch(*batch)
+            rows += len(chunk)
+            chunks += 1
+            first = int(times.min()) if first is None else min(first, int(times.min()))
+            last = int(times.max()) if last is None else max(last, int(times.max()))
+    except (KeyError, ValueError, pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid candle CSV: {e}")
+    finally:
+        if reader is not None:
+            reader.close()
+
+    return {
+        "success": True,
+        "rows": rows,
+        "added": added,
+        "chunks": chunks,
+        "first": first,
+        "last": last,
+        "candles": len(candle_store),
+    }
+
+def now_ts() -> int:
+    return int(datetime.now(tz=timezone.utc).timestamp())
+
 @app.post("/trade")
 async def place_trade(trade_data: dict):
     """Place a paper trade"""
-    symbol = trade_data.get("symbol")
-    side = trade_data.get("side", "").lower()
-    price = trade_data.get("price")
-    quantity = trade_data.get("quantity")
+    return trading.trade(
+        trade_data.get("account", DEFAULT_ACCOUNT),
+        trade_data.get("symbol"),
+        trade_data.get("side"),
+        trade_data.get("price"),
+        trade_data.get("quantity"),
+        now_ts(),
+    )
+
+def market_snapshot() -> Dict[str, float]:
+    """Last price per symbol, taken once so a whole batch sees the same market"""
+    latest = candle_store.get_latest()
+    return {SYMBOL: latest["close"]} if latest else {}
+
+def batch_orders(batch: dict, account: Optional[str] = None) -> list:
+    """Validate the /trades/batch envelope and fill in per-order defaults"""
+    orders = batch.get("orders")
+    if not isinstance(orders, list):
+        raise HTTPException(status_code=400, detail="orders must be a list")
+    if len(orders) > MAX_BATCH_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ORDERS} orders per batch")
     
-    if side not in {"buy", "sell"}:
-        return {"success": False, "error": "side must be 'buy' or 'sell'"}
-    
-    trade = {
-        "symbol": symbol,
-        "side": side,
-        "price": price,
-        "quantity": quantity,
-        "timestamp": int(datetime.now(tz=timezone.utc).timestamp())
+    return [
+        {
+            **o,
+            "account": account or o.get("account", DEFAULT_ACCOUNT),
+            "symbol": o.get("symbol", SYMBOL),
+        } if isinstance(o, dict) else o
+        for o in orders
+    ]
+
+def batch_response(results: list, prices: Dict[str, float]) -> dict:
+    filled = sum(1 for r in results if r["success"])
+    return {
+        "success": True,
+        "prices": prices,
+        "filled": filled,
+        "rejected": len(results) - filled,
+        "results": results,
     }
-    
-    trades.append(trade)
-    
-    return {"success": True, "trade": trade}
+
+@app.post("/trades/batch")
+async def place_trades_batch(batch: dict):
+    """Place many paper trades priced against one market snapshot"""
+    orders = batch_orders(batch)
+    prices = market_snapshot()
+    return batch_response(trading.trade_batch(orders, prices, now_ts()), prices)
 
 @app.get("/trades")
-async def get_trades():
-    """Get all trades"""
-    return trades
+async def get_trades(
+    account: Optional[str] = None,
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_TRADES_PAGE),
+):
+    """Get trades, optionally filtered by account/symbol/side/time range, one page at a time"""
+    return trading.trades(
+        account=account,
+        symbol=symbol,
+        side=side.lower() if side else None,
+        start=start,
+        end=end,
+        offset=offset,
+        limit=limit,
+    )
+
+@app.post("/orders")
+async def place_order(order_data: dict):
+    """Rest a limit, stop or stop_limit paper order until the trade stream fills it"""
+    return trading.place_order(
+        order_data.get("account", DEFAULT_ACCOUNT),
+        order_data.get("symbol", SYMBOL),
+        order_data,
+        now_ts(),
+    )
+
+@app.get("/orders")
+async def get_orders(symbol: Optional[str] = None):
+    """Get open orders"""
+    return trading.open_orders(symbol)
+
+@app.get("/orders/{order_id}")
+async def get_order(order_id: int):
+    """Get one order in any status, e.g. to see why it was rejected"""
+    try:
+        return trading.order(order_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown order")
+
+@app.delete("/orders/{order_id}")
+async def cancel_order(order_id: int):
+    """Cancel an open order"""
+    try:
+        return trading.cancel_order(order_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Order not open")
+
+@app.get("/portfolio/equity")
+async def get_equity_curve(limit: Optional[int] = Query(None, ge=1)):
+    """Get the sampled total-equity curve"""
+    return trading.portfolio.equity_curve(limit)
+
+@app.get("/portfolio/{account_id}")
+async def get_portfolio(account_id: str):
+    """Get cash, positions and PnL of one account"""
+    try:
+        return trading.snapshot(account_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown account")
+
+@app.get("/indicators/{symbol}/{tf}")
+async def get_indicators(
+    symbol: str,
+    tf: str,
+    limit: int = Query(100, ge=0, le=MAX_INDICATOR_ROWS),
+):
+    """Get indicator values: the last ``limit`` closed candles plus the forming one"""
+    if symbol.upper() != SYMBOL or tf != TIMEFRAME:
+        raise HTTPException(status_code=404, detail=f"No indicators for {symbol} {tf}")
+    
+    latest = await latest_indicators()
+    return {
+        "symbol": SYMBOL,
+        "timeframe": TIMEFRAME,
+        "closed": indicators.closed(limit) if limit else [],
+        "latest": latest,
+    }
+
+@app.get("/signals")
+async def get_signals():
+    """Get the latest strategy evaluation per pair"""
+    if not signal_service:
+        raise HTTPException(status_code=404, detail="Signal service is disabled")
+    return signal_service.latest
+
+# ---------------- ACCOUNTS ---------------- #
+# Same operations scoped to one account. With NUM_SHARDS > 0 they run in
+# the shard process that owns the account, otherwise in-process.
+
+async def account_call(account_id: str, method: str, *args):
+    if shards:
+        try:
+            return await shards.call(account_id, method, *args)
+        except ShardUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+    return getattr(trading, method)(*args)
+
+@app.post("/accounts/{account_id}/trade")
+async def account_trade(account_id: str, trade_data: dict):
+    """Place a paper trade for one account"""
+    return await account_call(
+        account_id, "trade",
+        account_id,
+        trade_data.get("symbol", SYMBOL),
+        trade_data.get("side"),
+        trade_data.get("price"),
+        trade_data.get("quantity"),
+        now_ts(),
+    )
+
+@app.post("/accounts/{account_id}/trades/batch")
+async def account_trades_batch(account_id: str, batch: dict):
+    """Place many paper trades for one account priced against one market snapshot"""
+    orders = batch_orders(batch, account_id)
+    prices = market_snapshot()
+    results = await account_call(account_id, "trade_batch", orders, prices, now_ts())
+    return batch_response(results, prices)
+
+@app.post("/accounts/{account_id}/orders")
+async def account_place_order(account_id: str, order_data: dict):
+    """Rest a paper order for one account"""
+    return await account_call(
+        account_id, "place_order", account_id, order_data.get("symbol", SYMBOL), order_data, now_ts()
+    )
+
+@app.get("/accounts/{account_id}/orders")
+async def account_orders(account_id: str, symbol: Optional[str] = None):
+    """Get open orders of one account"""
+    return await account_call(account_id, "open_orders", symbol, account_id)
+
+@app.get("/accounts/{account_id}/orders/{order_id}")
+async def account_order(account_id: str, order_id: int):
+    """Get one order of one account in any status"""
+    try:
+        return await account_call(account_id, "order", order_id, account_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown order")
+
+@app.delete("/accounts/{account_id}/orders/{order_id}")
+async def account_cancel_order(account_id: str, order_id: int):
+    """Cancel an open order of one account"""
+    try:
+        return await account_call(account_id, "cancel_order", order_id, account_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Order not open")
+
+@app.get("/accounts/{account_id}/portfolio")
+async def account_portfolio(account_id: str):
+    """Get cash, positions and PnL of one account"""
+    try:
+        return await account_call(account_id, "snapshot", account_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown account")
+
+@app.get("/accounts/{account_id}/trades")
+async def account_trades(
+    account_id: str,
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_TRADES_PAGE),
+):
+    """Get one account's trades, one page at a time"""
+    return await account_call(
+        account_id, "trades", account_id, symbol, side.lower() if side else None, start, end, offset, limit
+    )
 
 # ---------------- WEBSOCKET ---------------- #
 
@@ -295,10 +914,9 @@ async def candle_ws(ws: WebSocket):
     
     # Send current state immediately
     try:
-        all_candles = candle_store.get_all()
         await ws.send_text(json.dumps({
             "type": "snapshot",
-            "data": all_candles[-1000:]  # Last 1000 candles
+            "data": candle_store.get_all(limit=1000)  # Last 1000 candles
         }))
     except:
         clients.discard(ws)
@@ -311,17 +929,79 @@ async def candle_ws(ws: WebSocket):
     except:
         clients.discard(ws)
 
+@app.websocket("/ws/equity")
+async def equity_ws(ws: WebSocket):
+    """WebSocket endpoint for streaming equity-curve samples"""
+    await ws.accept()
+    equity_clients.add(ws)
+    
+    try:
+        while True:
+            await ws.receive_text()
+    except:
+        equity_clients.discard(ws)
+
+@app.websocket("/ws/indicators")
+async def indicators_ws(ws: WebSocket):
+    """WebSocket endpoint for live indicator values of the forming candle"""
+    await ws.accept()
+    indicator_clients.add(ws)
+    
+    try:
+        latest = await latest_indicators()
+        await ws.send_text(json.dumps({
+            "type": "snapshot",
+            "data": {"closed": indicators.closed(MAX_INDICATOR_ROWS), "latest": latest},
+        }))
+    except:
+        indicator_clients.discard(ws)
+        return
+    
+    try:
+        while True:
+            await ws.receive_text()
+    except:
+        indicator_clients.discard(ws)
+
+@app.websocket("/ws/signals")
+async def signals_ws(ws: WebSocket):
+    """WebSocket endpoint for enter_long/exit_long events"""
+    await ws.accept()
+    signal_clients.add(ws)
+    
+    try:
+        while True:
+            await ws.receive_text()
+    except:
+        signal_clients.discard(ws)
+
 # ---------------- STARTUP ---------------- #
 
 @app.on_event("startup")
 async def startup():
-    """Start background tasks"""
+    """Open the ledger and start background tasks"""
+    global trading
+    trading = await asyncio.to_thread(PaperTrading, LEDGER_PATH, INITIAL_BALANCE, scales)
     asyncio.create_task(stream_trades())
     asyncio.create_task(broadcast_worker())
+    asyncio.create_task(equity_worker())
+    if shards:
+        shards.start(asyncio.get_running_loop())
+    if signal_service:
+        asyncio.create_task(signal_service.run())
 
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup on shutdown"""
-    for ws in list(clients):
+    for ws in list(clients | equity_clients | indicator_clients | signal_clients):
         await ws.close()
-    clients.clear()
\ No newline at end of file
+    clients.clear()
+    equity_clients.clear()
+    indicator_clients.clear()
+    signal_clients.clear()
+    if signal_service:
+        signal_service.stop()
+    if shards:
+        await asyncio.to_thread(shards.stop)
+    if trading:
+        await asyncio.to_thread(trading.close)
\ No newline at end of file
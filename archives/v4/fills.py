@@ -0,0 +1,115 @@
+from typing import Dict, Tuple
+
+import numpy as np
+
+TAPE_SIZE = 5000  # recent market trades kept per symbol
+PARTICIPATION = 0.1  # share of recorded volume a paper order may take
+
+
+def walk_ladder(
+    quantities: np.ndarray, distances: np.ndarray, volumes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fill orders one after another against a depth ladder.
+
+    The ladder has ``volumes[i]`` available at ``distances[i]`` from the
+    reference price. Orders consume it in sequence, cheapest levels first,
+    so order k fills the slice of cumulative volume between the sum of the
+    earlier orders and that sum plus its own quantity. Everything is
+    evaluated with cumulative sums and ``searchsorted``: no per-order loop.
+
+    Returns ``(filled, avg_distance)`` per order; ``filled`` is below the
+    requested quantity once the ladder runs out.
+    """
+    quantities = np.asarray(quantities, dtype=np.float64)
+    if not len(distances):
+        return np.zeros_like(quantities), np.zeros_like(quantities)
+
+    order = np.argsort(distances, kind="stable")
+    d = np.asarray(distances, dtype=np.float64)[order]
+    v = np.asarray(volumes, dtype=np.float64)[order]
+    cum_v = np.concatenate(([0.0], np.cumsum(v)))
+    cum_n = np.concatenate(([0.0], np.cumsum(v * d)))
+
+    def area(x: np.ndarray) -> np.ndarray:
+        """Integral of distance over the first ``x`` units of volume"""
+        i = np.clip(np.searchsorted(cum_v, x, side="right") - 1, 0, len(d) - 1)
+        return cum_n[i] + (x - cum_v[i]) * d[i]
+
+    ends = np.minimum(np.cumsum(quantities), cum_v[-1])
+    starts = np.concatenate(([0.0], ends[:-1]))
+    filled = ends - starts
+    avg_distance = np.divide(
+        area(ends) - area(starts), filled, out=np.zeros_like(filled), where=filled > 0
+    )
+    return filled, avg_distance
+
+
+class TradeTape:
+    """Ring buffer of recent market trades for one symbol"""
+
+    def __init__(self, size: int = TAPE_SIZE):
+        self.prices = np.zeros(size, dtype=np.float64)
+        self.qtys = np.zeros(size, dtype=np.float64)
+        self.count = 0
+
+    def record(self, price: float, qty: float):
+        i = self.count % len(self.prices)
+        self.prices[i] = price
+        self.qtys[i] = qty
+        self.count += 1
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        n = min(self.count, len(self.prices))
+        return self.prices[:n], self.qtys[:n]
+
+
+class FillModel:
+    """Volume-weighted fill prices from the recorded trade tape.
+
+    The tape is turned into a symmetric depth ladder around the reference
+    price: each recorded trade offers ``participation`` of its quantity at
+    its distance from that price. Buys walk it upwards and sells downwards,
+    each side consuming liquidity in submission order, so large orders pay
+    for their size and may fill only partially. Without any recorded tape
+    orders fill in full at the reference price.
+    """
+
+    def __init__(self, tape_size: int = TAPE_SIZE, participation: float = PARTICIPATION):
+        self.tape_size = tape_size
+        self.participation = participation
+        self.tapes: Dict[str, TradeTape] = {}
+
+    def record(self, symbol: str, price: float, qty: float):
+        tape = self.tapes.get(symbol)
+        if tape is None:
+            tape = self.tapes[symbol] = TradeTape(self.tape_size)
+        tape.record(price, qty)
+
+    def fill(
+        self, symbol: str, buys: np.ndarray, quantities: np.ndarray, price: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Filled quantity and average price per order.
+
+        ``buys`` is a boolean mask (True = buy), ``quantities`` the requested
+        sizes and ``price`` the reference (last) price.
+        """
+        buys = np.asarray(buys, dtype=bool)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        filled = quantities.copy()
+        prices = np.full(len(quantities), float(price))
+
+        tape = self.tapes.get(symbol)
+        if tape is None or not tape.count:
+            return filled, prices
+
+        tape_prices, tape_qtys = tape.view()
+        distances = np.abs(tape_prices - price)
+        volumes = tape_qtys * self.participation
+
+        for mask, sign in ((buys, 1.0), (~buys, -1.0)):
+            if mask.any():
+                side_filled, avg_distance = walk_ladder(quantities[mask], distances, volumes)
+                filled[mask] = side_filled
+                prices[mask] = price + sign * avg_distance
+
+        return filled, prices
@@ -0,0 +1,171 @@
+from decimal import Decimal, InvalidOperation, ROUND_FLOOR, ROUND_HALF_EVEN
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+QUOTE_UNIT = "0.00000001"  # smallest cash amount in fixed-point mode
+
+
+def _parse(value, unit: Decimal, rounding: str) -> int:
+    """Exact decimal -> integer multiple of ``unit``. Strings are never routed through float"""
+    try:
+        d = value if isinstance(value, Decimal) else Decimal(str(value))
+        return int((d / unit).to_integral_value(rounding=rounding))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid number: {value!r}")
+
+
+def _divisor(unit: Decimal) -> Tuple[bool, float]:
+    """How to turn integer multiples of ``unit`` back into the nearest float.
+
+    Dividing by an exact integer like 100 rounds correctly; multiplying by
+    0.01 does not, so units whose inverse is integral are divided.
+    """
+    inv = 1 / unit
+    if inv == inv.to_integral_value():
+        return True, float(inv)
+    return False, float(unit)
+
+
+def _unscale(values, how: Tuple[bool, float]):
+    divide, factor = how
+    return values / factor if divide else values * factor
+
+
+class FloatScale:
+    """Plain float prices and quantities (the default)"""
+
+    dtype = np.float64
+
+    def price(self, value):
+        return None if value is None else float(value)
+
+    qty = price
+
+    def prices(self, values) -> np.ndarray:
+        return np.asarray(values, dtype=np.float64)
+
+    qtys = prices
+
+    def round_prices(self, values: np.ndarray) -> np.ndarray:
+        return values
+
+    round_qtys = round_prices
+
+    def price_out(self, value):
+        return value
+
+    qty_out = prices_out = qtys_out = price_out
+
+    def notional(self, price, qty):
+        return price * qty
+
+    def share(self, total, part, whole):
+        """Part of ``total`` proportional to ``part / whole``"""
+        return total if part == whole else total * part / whole
+
+    def unit_price(self, cost, qty) -> float:
+        """Decimal price per unit of a ``cost`` paid for ``qty``"""
+        return cost / qty
+
+
+class FixedScale:
+    """Prices in ticks and quantities in lots as int64.
+
+    ``price * qty`` of two scaled values is in units of ``tick * step``;
+    ``notional`` rescales it to the shared quote unit so cash from every
+    symbol adds up exactly. Cost-basis splits use floor division, so any
+    remainder stays with the position until it is closed.
+    """
+
+    dtype = np.int64
+
+    def __init__(self, tick_size: str, step_size: str, quote_unit: str = QUOTE_UNIT):
+        self.tick = Decimal(tick_size)
+        self.step = Decimal(step_size)
+        factor = self.tick * self.step / Decimal(quote_unit)
+        if factor != factor.to_integral_value() or factor < 1:
+            raise ValueError(
+                f"tick {tick_size} x step {step_size} is not a multiple of quote unit {quote_unit}"
+            )
+        self.factor = int(factor)
+        self._price_out = _divisor(self.tick)
+        self._qty_out = _divisor(self.step)
+
+    def price(self, value) -> Optional[int]:
+        return None if value is None else _parse(value, self.tick, ROUND_HALF_EVEN)
+
+    def qty(self, value) -> Optional[int]:
+        return None if value is None else _parse(value, self.step, ROUND_HALF_EVEN)
+
+    def prices(self, values) -> np.ndarray:
+        return self.round_prices(np.asarray(values, dtype=np.float64) / float(self.tick))
+
+    def qtys(self, values) -> np.ndarray:
+        return np.rint(np.asarray(values, dtype=np.float64) / float(self.step)).astype(np.int64)
+
+    def round_prices(self, values: np.ndarray) -> np.ndarray:
+        """Round simulated (float) prices to whole ticks"""
+        return np.rint(values).astype(np.int64)
+
+    def round_qtys(self, values: np.ndarray) -> np.ndarray:
+        """Round simulated (float) quantities down to whole lots"""
+        return np.floor(values).astype(np.int64)
+
+    def price_out(self, value):
+        return None if value is None else float(_unscale(value, self._price_out))
+
+    def qty_out(self, value):
+        return None if value is None else float(_unscale(value, self._qty_out))
+
+    def prices_out(self, values: np.ndarray) -> np.ndarray:
+        return _unscale(values, self._price_out)
+
+    def qtys_out(self, values: np.ndarray) -> np.ndarray:
+        return _unscale(values, self._qty_out)
+
+    def notional(self, price: int, qty: int) -> int:
+        return price * qty * self.factor
+
+    def share(self, total: int, part: int, whole: int) -> int:
+        return total if part == whole else total * part // whole
+
+    def unit_price(self, cost: int, qty: int) -> float:
+        return self.price_out(cost / (qty * self.factor))
+
+
+class Scales:
+    """Per-symbol scales plus the quote (cash) unit.
+
+    Without ``filters`` everything stays float. With them every symbol needs
+    an entry ``symbol -> (tick_size, step_size)``, given as decimal strings.
+    """
+
+    def __init__(self, filters: Optional[Dict[str, Tuple[str, str]]] = None, quote_unit: str = QUOTE_UNIT):
+        self.fixed = filters is not None
+        self._float = FloatScale()
+        self._symbols = {
+            symbol: FixedScale(tick, step, quote_unit)
+            for symbol, (tick, step) in (filters or {}).items()
+        }
+        self._quote_unit = Decimal(quote_unit)
+        self._quote_out = _divisor(self._quote_unit)
+
+    def __getitem__(self, symbol: str):
+        """Scale of ``symbol``. Raises ValueError if fixed-point has no filter for it"""
+        if not self.fixed:
+            return self._float
+        scale = self._symbols.get(symbol)
+        if scale is None:
+            raise ValueError(f"No tick/step size configured for {symbol}")
+        return scale
+
+    def quote(self, value):
+        if not self.fixed:
+            return float(value)
+        return _parse(value, self._quote_unit, ROUND_FLOOR)
+
+    def quote_out(self, value):
+        if not self.fixed:
+            return float(value)
+        return float(_unscale(value, self._quote_out))
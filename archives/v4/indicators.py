@@ -0,0 +1,323 @@
+import abc
+import copy
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+HISTORY_LEN = 10_000  # closed-candle indicator rows kept for /indicators
+
+
+class Indicator(abc.ABC):
+    """Recursive indicator over one price per candle.
+
+    ``step(state, x)`` is pure and returns ``(new_state, value)``, so the
+    committed ``state`` only advances when a candle closes and the forming
+    candle can be evaluated any number of times with ``peek``. Values are
+    None until the indicator has seen enough candles. ``source`` picks the
+    price: ``"close"`` or ``"typical"`` ((high + low + close) / 3).
+    """
+
+    source = "close"
+
+    def __init__(self):
+        self.state = self.initial()
+
+    @abc.abstractmethod
+    def initial(self):
+        """Committed state before any candle"""
+
+    @abc.abstractmethod
+    def step(self, state, x: float):
+        """``(new_state, value)`` after folding in ``x``; must not mutate ``state``"""
+
+    def commit(self, x: float):
+        self.state, value = self.step(self.state, x)
+        return value
+
+    def peek(self, x: float):
+        return self.step(self.state, x)[1]
+
+    def reset(self):
+        self.state = self.initial()
+
+
+class EMA(Indicator):
+    """Exponential moving average seeded with the SMA of the first ``period`` values"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        super().__init__()
+
+    def initial(self):
+        return (0, 0.0)  # (values seen, running sum until seeded, then the EMA)
+
+    def step(self, state, x):
+        n, v = state
+        if n < self.period - 1:
+            return (n + 1, v + x), None
+        if n == self.period - 1:
+            v = (v + x) / self.period
+        else:
+            v += self.alpha * (x - v)
+        return (n + 1, v), v
+
+
+class TEMA(Indicator):
+    """Triple EMA: 3*EMA - 3*EMA(EMA) + EMA(EMA(EMA))"""
+
+    def __init__(self, period: int):
+        self.ema = EMA(period)
+        super().__init__()
+
+    def initial(self):
+        return (self.ema.initial(),) * 3
+
+    def step(self, state, x):
+        s1, s2, s3 = state
+        s1, e1 = self.ema.step(s1, x)
+        if e1 is None:
+            return (s1, s2, s3), None
+        s2, e2 = self.ema.step(s2, e1)
+        if e2 is None:
+            return (s1, s2, s3), None
+        s3, e3 = self.ema.step(s3, e2)
+        if e3 is None:
+            return (s1, s2, s3), None
+        return (s1, s2, s3), 3 * e1 - 3 * e2 + e3
+
+
+class RSI(Indicator):
+    """Wilder's RSI"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        super().__init__()
+
+    def initial(self):
+        return (0, None, 0.0, 0.0)  # (changes seen, previous close, avg gain, avg loss)
+
+    def step(self, state, x):
+        n, prev, gain, loss = state
+        if prev is None:
+            return (0, x, 0.0, 0.0), None
+
+        change = x - prev
+        up, down = max(change, 0.0), max(-change, 0.0)
+        n += 1
+        p = self.period
+        if n < p:
+            return (n, x, gain + up, loss + down), None
+        if n == p:
+            gain, loss = (gain + up) / p, (loss + down) / p
+        else:
+            gain, loss = (gain * (p - 1) + up) / p, (loss * (p - 1) + down) / p
+
+        total = gain + loss
+        value = 100.0 * gain / total if total else 0.0
+        return (n, x, gain, loss), value
+
+
+class MACD(Indicator):
+    """MACD line, signal and histogram (``macd``/``macdsignal``/``macdhist``)"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+        super().__init__()
+
+    def initial(self):
+        return (self.fast.initial(), self.slow.initial(), self.signal.initial())
+
+    def step(self, state, x):
+        sf, ss, sg = state
+        sf, fast = self.fast.step(sf, x)
+        ss, slow = self.slow.step(ss, x)
+        if fast is None or slow is None:
+            return (sf, ss, sg), {"macd": None, "macdsignal": None, "macdhist": None}
+
+        macd = fast - slow
+        sg, signal = self.signal.step(sg, macd)
+        hist = None if signal is None else macd - signal
+        return (sf, ss, sg), {"macd": macd, "macdsignal": signal, "macdhist": hist}
+
+
+class Rolling(Indicator):
+    """Rolling window over the last ``period`` values.
+
+    The state holds the previous ``period - 1`` values in a deque with their
+    running sum and sum of squares, so evaluating or committing a value costs
+    O(1). Commits mutate the state in place instead of copying it through
+    ``step``; the sums are recomputed from the window once every ``period``
+    commits to keep float drift bounded at amortized O(1).
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        super().__init__()
+
+    def initial(self):
+        return [deque(), 0.0, 0.0, 0]  # window, sum, sum of squares, commits since resum
+
+    def step(self, state, x):
+        new = [deque(state[0]), *state[1:]]
+        return new, self._fold(new, x)
+
+    def commit(self, x: float):
+        return self._fold(self.state, x)
+
+    def _fold(self, state, x: float):
+        window, total, squares, _ = state
+        value = None if len(window) != self.period - 1 else self.value(total + x, squares + x * x)
+        if self.period > 1:
+            window.append(x)
+            state[1] += x
+            state[2] += x * x
+            if len(window) > self.period - 1:
+                old = window.popleft()
+                state[1] -= old
+                state[2] -= old * old
+        state[3] += 1
+        if state[3] >= self.period:
+            state[1], state[2], state[3] = sum(window), sum(v * v for v in window), 0
+        return value
+
+    def peek(self, x: float):
+        window, total, squares, _ = self.state
+        if len(window) != self.period - 1:
+            return None
+        return self.value(total + x, squares + x * x)
+
+    def value(self, total: float, squares: float):
+        return total / self.period
+
+
+class SMA(Rolling):
+    """Simple moving average"""
+
+
+class BollingerBands(Rolling):
+    """Bollinger Bands (``bb_lowerband``/``bb_middleband``/``bb_upperband``)
+
+    Like ``qtpylib.bollinger_bands(qtpylib.typical_price(df))`` in
+    SampleStrategy: over the typical price, with the sample standard deviation.
+    """
+
+    source = "typical"
+
+    def __init__(self, period: int = 20, stds: float = 2.0):
+        self.stds = stds
+        super().__init__(period)
+
+    def step(self, state, x):
+        state, value = super().step(state, x)
+        return state, value or self.empty()
+
+    def commit(self, x):
+        return super().commit(x) or self.empty()
+
+    def peek(self, x):
+        return super().peek(x) or self.empty()
+
+    def value(self, total, squares):
+        n = self.period
+        mean = total / n
+        var = (squares - total * mean) / (n - 1) if n > 1 else 0.0
+        std = max(var, 0.0) ** 0.5
+        return {
+            "bb_lowerband": mean - self.stds * std,
+            "bb_middleband": mean,
+            "bb_upperband": mean + self.stds * std,
+        }
+
+    def empty(self) -> dict:
+        return {"bb_lowerband": None, "bb_middleband": None, "bb_upperband": None}
+
+
+class IndicatorEngine:
+    """Indicators kept current with a candle series, one candle at a time.
+
+    ``sync`` commits every candle that has closed since the last call (all
+    but the newest), so each candle is folded in exactly once. ``latest``
+    adds provisional values for the still-forming newest candle without
+    touching the committed state. When older candles change (backfill,
+    out-of-order trades) the caller bumps ``revision``; ``rebuilt`` computes
+    a fresh engine from the whole series without touching this one, so it
+    can run in a worker thread, and ``adopt`` swaps it in.
+    """
+
+    def __init__(self, indicators: Dict[str, Indicator], history: int = HISTORY_LEN):
+        self.indicators = indicators
+        self.history = deque(maxlen=history)
+        self.last_time: Optional[int] = None
+        self.revision: Optional[int] = None
+
+    def reset(self):
+        for ind in self.indicators.values():
+            ind.reset()
+        self.history.clear()
+        self.last_time = None
+
+    def sync(self, times: np.ndarray, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+             revision: Optional[int] = None):
+        """Commit candles closed since the last sync.
+
+        The arrays only need to cover the candles after ``last_time`` (plus the
+        forming one); earlier rows are skipped either way. A ``revision`` other than the engine's resets and recomputes
+        everything in place; pass None to skip the check.
+        """
+        if revision is not None and revision != self.revision:
+            self.reset()
+            self.revision = revision
+
+        if len(times) < 2:
+            return
+        start = 0 if self.last_time is None else int(np.searchsorted(times, self.last_time, side="right"))
+        sources = self._sources(highs[start:-1], lows[start:-1], closes[start:-1])
+        for i, t in enumerate(times[start:-1].tolist()):
+            self.history.append(self._row(t, {k: v[i] for k, v in sources.items()}, commit=True))
+            self.last_time = t
+
+    def latest(self, times: np.ndarray, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+               revision: Optional[int] = None) -> Optional[dict]:
+        """Provisional indicator row for the forming (newest) candle"""
+        self.sync(times, highs, lows, closes, revision)
+        if not len(times):
+            return None
+        sources = self._sources(highs[-1:], lows[-1:], closes[-1:])
+        return self._row(int(times[-1]), {k: v[0] for k, v in sources.items()}, commit=False)
+
+    def rebuilt(self, times: np.ndarray, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                revision: int) -> "IndicatorEngine":
+        """A new engine synced from scratch to ``revision``; leaves this one untouched"""
+        engine = IndicatorEngine(copy.deepcopy(self.indicators), self.history.maxlen)
+        engine.sync(times, highs, lows, closes, revision)
+        return engine
+
+    def adopt(self, other: "IndicatorEngine"):
+        self.indicators = other.indicators
+        self.history = other.history
+        self.last_time = other.last_time
+        self.revision = other.revision
+
+    def closed(self, limit: Optional[int] = None) -> List[dict]:
+        rows = list(self.history)
+        return rows if limit is None else rows[-limit:]
+
+    @staticmethod
+    def _sources(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> Dict[str, list]:
+        return {
+            "close": np.asarray(closes, dtype=np.float64).tolist(),
+            "typical": ((np.asarray(highs, dtype=np.float64) + lows + closes) / 3.0).tolist(),
+        }
+
+    def _row(self, time: int, prices: Dict[str, float], commit: bool) -> dict:
+        row = {"time": time, "provisional": not commit}
+        for name, ind in self.indicators.items():
+            x = prices[ind.source]
+            value = ind.commit(x) if commit else ind.peek(x)
+            if isinstance(value, dict):
+                row.update(value)
+            else:
+                row[name] = value
+        return row
@@ -0,0 +1,166 @@
+import itertools
+import json
+import os
+import queue
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+INDEXED_FIELDS = ("account", "symbol", "side")
+
+
+class TradeLedger:
+    """Append-only paper-trade ledger.
+
+    Every trade is written as one JSON line to a write-ahead log and then
+    added to in-memory indexes, so recording a trade costs the same no matter
+    how long the ledger is. The log is replayed on startup; a torn last line
+    left by a crash is cut off so new records start on a fresh line, lines
+    that are not a trade record are skipped (both are reported and counted
+    in ``skipped``), and records keep the ids they were written with.
+
+    Writes go through a background thread, so callers on the event loop only
+    serialize and enqueue; records still queued when the process dies are
+    lost. ``close`` writes everything queued before closing the file.
+
+    Indexes are kept for every combination of ``INDEXED_FIELDS`` values
+    (including none, i.e. all trades) as parallel ascending
+    ``timestamps``/``rows`` lists (positions in ``records``), so a filtered,
+    time-bounded page is two bisects plus a slice.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.records: List[dict] = []
+        self._index: Dict[tuple, Tuple[List[int], List[int]]] = {}
+        self._next_id = 0
+        self.skipped = 0
+
+        self._replay()
+        self._wal = open(path, "a", encoding="utf-8")
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="ledger", daemon=True)
+        self._writer.start()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def append(self, trade: dict) -> dict:
+        """Log a trade and index it. The stored record gets an ``id``"""
+        return self.extend([trade])[0]
+
+    def extend(self, trades: List[dict]) -> List[dict]:
+        """Log many trades with a single write"""
+        records = [{"id": self._next_id + i, **t} for i, t in enumerate(trades)]
+        if not records:
+            return records
+
+        self._next_id += len(records)
+        self._queue.put("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        for record in records:
+            self._add(record)
+        return records
+
+    def query(
+        self,
+        account: Optional[str] = None,
+        symbol: Optional[str] = None,
+        side: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> Tuple[int, List[dict]]:
+        """Trades matching the filters, oldest first.
+
+        ``start`` is inclusive and ``end`` exclusive (seconds). Returns the
+        total number of matches and the requested page.
+        """
+        entry = self._index.get(self._key((account, symbol, side)))
+        if entry is None:
+            return 0, []
+
+        timestamps, rows = entry
+        lo = 0 if start is None else bisect_left(timestamps, start)
+        hi = len(rows) if end is None else bisect_left(timestamps, end, lo)
+
+        page = rows[lo + offset:min(hi, lo + offset + limit)]
+        return max(0, hi - lo), [self.records[i] for i in page]
+
+    def close(self):
+        """Write everything queued, then close the log"""
+        self._queue.put(None)
+        self._writer.join()
+        self._wal.close()
+
+    def _write_loop(self):
+        running = True
+        while running:
+            chunks = []
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    running = False
+                else:
+                    chunks.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if chunks:
+                self._wal.write("".join(chunks))
+                self._wal.flush()
+                if self.fsync:
+                    os.fsync(self._wal.fileno())
+
+    @staticmethod
+    def _key(values: tuple) -> tuple:
+        return tuple((f, v) for f, v in zip(INDEXED_FIELDS, values) if v is not None)
+
+    def _add(self, record: dict):
+        row = len(self.records)
+        self.records.append(record)
+        choices = [(record.get(f), None) for f in INDEXED_FIELDS]
+        keys = {self._key(values) for values in itertools.product(*choices)}
+
+        ts = record["timestamp"]
+        for key in keys:
+            timestamps, rows = self._index.setdefault(key, ([], []))
+            if not timestamps or ts >= timestamps[-1]:
+                timestamps.append(ts)
+                rows.append(row)
+            else:
+                pos = bisect_right(timestamps, ts)
+                timestamps.insert(pos, ts)
+                rows.insert(pos, row)
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+
+        good = 0  # bytes up to the end of the last complete line
+        with open(self.path, "rb") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.endswith(b"\n"):
+                    # Torn last line from a crash
+                    self.skipped += 1
+                    print(f"Ledger {self.path}: cutting off torn line {lineno}")
+                    break
+                good += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict) or not isinstance(record.get("timestamp"), (int, float)):
+                    self.skipped += 1
+                    print(f"Ledger {self.path}: skipping line {lineno}, not a trade record")
+                    continue
+                if not isinstance(record.get("id"), int):
+                    record["id"] = self._next_id
+                self._next_id = max(self._next_id, record["id"] + 1)
+                self._add(record)
+
+        if good < os.path.getsize(self.path):
+            os.truncate(self.path, good)
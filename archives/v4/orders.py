@@ -0,0 +1,234 @@
+import heapq
+import itertools
+from collections import defaultdict, deque
+from typing import Callable, Dict, List, Optional
+
+ORDER_TYPES = {"limit", "stop", "stop_limit"}
+QTY_EPSILON = 1e-12  # remaining quantity below this counts as filled
+
+
+class OrderBook:
+    """Resting orders for one symbol, kept in price-priority heaps.
+
+    Heap entries are ``(key, seq, order_id)`` where ``key`` is the price
+    (negated for max-heaps), so the best order is always at index 0.
+    Cancelled orders are left in place and skipped when they surface.
+    """
+
+    def __init__(self):
+        self.bids = []        # buy limits, highest price first
+        self.asks = []        # sell limits, lowest price first
+        self.buy_stops = []   # trigger when price >= stop, lowest stop first
+        self.sell_stops = []  # trigger when price <= stop, highest stop first
+        self.market = deque() # triggered stops waiting for liquidity, FIFO
+
+
+class MatchingEngine:
+    """Paper matching engine for resting limit, stop and stop-limit orders.
+
+    Orders are matched against each trade from the live stream: the trade
+    price decides which orders cross and the trade quantity is the liquidity
+    they share, in price-time priority. Limit orders fill at their limit
+    price, triggered stops at the trade price. Matching a trade costs
+    O(log n + fills) regardless of how many orders are resting.
+
+    Each fill is passed to ``on_fill`` before the order or the trade's
+    liquidity is touched. If it raises ValueError (e.g. the account cannot
+    pay), the order is closed with status ``"rejected"`` and a ``reason``
+    instead, and the liquidity goes to the next order. ``on_trigger`` is
+    told about every stop order that triggers.
+    """
+
+    def __init__(
+        self,
+        on_fill: Optional[Callable[[dict], None]] = None,
+        on_trigger: Optional[Callable[[dict], None]] = None,
+    ):
+        self.on_fill = on_fill
+        self.on_trigger = on_trigger
+        self.orders: Dict[int, dict] = {}
+        self.open: Dict[int, dict] = {}
+        self.books: Dict[str, OrderBook] = defaultdict(OrderBook)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+
+    def submit(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        quantity: float,
+        price: Optional[float] = None,
+        stop_price: Optional[float] = None,
+        timestamp: Optional[int] = None,
+        account: Optional[str] = None,
+    ) -> dict:
+        """Validate and rest a new order. Raises ValueError on bad input"""
+        side = side.lower()
+        if side not in {"buy", "sell"}:
+            raise ValueError("side must be 'buy' or 'sell'")
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"type must be one of {sorted(ORDER_TYPES)}")
+        if not quantity or quantity <= 0:
+            raise ValueError("quantity must be positive")
+        if order_type in {"limit", "stop_limit"} and (price is None or price <= 0):
+            raise ValueError(f"{order_type} order needs a positive price")
+        if order_type in {"stop", "stop_limit"} and (stop_price is None or stop_price <= 0):
+            raise ValueError(f"{order_type} order needs a positive stop_price")
+
+        order = {
+            "id": next(self._ids),
+            "account": account,
+            "symbol": symbol,
+            "side": side,
+            "type": order_type,
+            "quantity": quantity,
+            "price": price,
+            "stop_price": stop_price,
+            "filled": 0.0,
+            "avg_fill_price": None,
+            "status": "open",
+            "triggered": False,
+            "timestamp": timestamp,
+        }
+        self.orders[order["id"]] = order
+        self.open[order["id"]] = order
+        self._rest(order)
+        return order
+
+    def restore(self, orders: List[dict]):
+        """Take back orders saved from an earlier run, in id order.
+
+        Open ones are rested again where they were: untriggered stops wait
+        for their stop price, triggered ones are back in the market queue or
+        on the book. New ids continue after the highest restored one.
+        """
+        for order in sorted(orders, key=lambda o: o["id"]):
+            self.orders[order["id"]] = order
+            if order["status"] == "open":
+                self.open[order["id"]] = order
+                self._rest(order)
+        if self.orders:
+            self._ids = itertools.count(max(self.orders) + 1)
+
+    def _rest(self, order: dict):
+        book = self.books[order["symbol"]]
+        if order["type"] == "limit" or (order["triggered"] and order["type"] == "stop_limit"):
+            self._rest_limit(book, order)
+        elif order["triggered"]:
+            book.market.append(order)
+        elif order["side"] == "buy":
+            heapq.heappush(book.buy_stops, (order["stop_price"], next(self._seq), order["id"]))
+        else:
+            heapq.heappush(book.sell_stops, (-order["stop_price"], next(self._seq), order["id"]))
+
+    def cancel(self, order_id: int) -> dict:
+        """Cancel an open order. Raises KeyError if it is not open"""
+        order = self.open.pop(order_id)
+        order["status"] = "canceled"
+        return order
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[dict]:
+        return [o for o in self.open.values() if symbol is None or o["symbol"] == symbol]
+
+    def on_trade(self, symbol: str, price: float, qty: float, timestamp: int) -> List[dict]:
+        """Match resting orders against one market trade.
+
+        Returns the fills and, with ``status: "rejected"``, the orders
+        rejected while matching it.
+        """
+        book = self.books.get(symbol)
+        if book is None:
+            return []
+
+        self._trigger_stops(book, price)
+
+        fills = []
+        available = qty
+
+        # Triggered stops are market orders and go first
+        while available > QTY_EPSILON and book.market:
+            order = book.market[0]
+            if order["status"] != "open":
+                book.market.popleft()
+                continue
+            available -= self._fill(order, price, available, timestamp, fills)
+            if order["status"] != "open":
+                book.market.popleft()
+
+        # Buy limits at or above the trade price, best price first
+        while available > QTY_EPSILON and book.bids and -book.bids[0][0] >= price:
+            order = self.orders[book.bids[0][2]]
+            if order["status"] == "open":
+                available -= self._fill(order, order["price"], available, timestamp, fills)
+            if order["status"] != "open":
+                heapq.heappop(book.bids)
+
+        # Sell limits at or below the trade price, best price first
+        while available > QTY_EPSILON and book.asks and book.asks[0][0] <= price:
+            order = self.orders[book.asks[0][2]]
+            if order["status"] == "open":
+                available -= self._fill(order, order["price"], available, timestamp, fills)
+            if order["status"] != "open":
+                heapq.heappop(book.asks)
+
+        return fills
+
+    def _rest_limit(self, book: OrderBook, order: dict):
+        if order["side"] == "buy":
+            heapq.heappush(book.bids, (-order["price"], next(self._seq), order["id"]))
+        else:
+            heapq.heappush(book.asks, (order["price"], next(self._seq), order["id"]))
+
+    def _trigger_stops(self, book: OrderBook, price: float):
+        triggered = []
+        while book.buy_stops and book.buy_stops[0][0] <= price:
+            triggered.append(heapq.heappop(book.buy_stops)[2])
+        while book.sell_stops and -book.sell_stops[0][0] >= price:
+            triggered.append(heapq.heappop(book.sell_stops)[2])
+
+        for order_id in triggered:
+            order = self.orders[order_id]
+            if order["status"] != "open":
+                continue
+            order["triggered"] = True
+            if self.on_trigger is not None:
+                self.on_trigger(order)
+            if order["type"] == "stop_limit":
+                self._rest_limit(book, order)
+            else:
+                book.market.append(order)
+
+    def _fill(self, order: dict, price: float, available: float, timestamp: int, fills: list) -> float:
+        """Fill as much of ``order`` as ``available`` allows; returns the quantity filled"""
+        qty = min(order["quantity"] - order["filled"], available)
+        fill = {
+            "order_id": order["id"],
+            "account": order["account"],
+            "symbol": order["symbol"],
+            "side": order["side"],
+            "price": price,
+            "quantity": qty,
+            "timestamp": timestamp,
+        }
+        if self.on_fill is not None:
+            try:
+                self.on_fill(fill)
+            except ValueError as e:
+                order["status"] = "rejected"
+                order["reason"] = str(e)
+                self.open.pop(order["id"], None)
+                fills.append({**fill, "status": "rejected", "reason": str(e)})
+                return 0
+
+        prev = order["filled"]
+        order["filled"] = prev + qty
+        order["avg_fill_price"] = (
+            price if not prev else (order["avg_fill_price"] * prev + price * qty) / order["filled"]
+        )
+        if order["quantity"] - order["filled"] <= QTY_EPSILON:
+            order["status"] = "filled"
+            self.open.pop(order["id"], None)
+
+        fills.append(fill)
+        return qty
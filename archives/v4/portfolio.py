@@ -0,0 +1,194 @@
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Set
+
+from fixedpoint import Scales
+
+QTY_EPSILON = 1e-12  # positions smaller than this are closed
+EQUITY_CURVE_LEN = 10_000  # samples kept for /portfolio/equity
+
+
+class PaperAccount:
+    """Cash and positions of one paper account, marked to market incrementally.
+
+    Each position remembers the price it was last marked at, so a tick only
+    adjusts that one position and the running ``market_value`` total. Equity
+    is read in O(1) without a full price dict. Positions carry their cost
+    basis rather than an average price, and all amounts go through the
+    symbol's scale, so with fixed-point scales the books stay exact.
+    """
+
+    def __init__(self, account_id: str, initial_balance, scales: Scales):
+        self.id = account_id
+        self.scales = scales
+        self.cash = initial_balance
+        self.realized = 0
+        self.market_value = 0
+        self.cost = 0
+        self.positions: Dict[str, dict] = {}
+
+    @property
+    def equity(self):
+        return self.cash + self.market_value
+
+    @property
+    def unrealized(self):
+        return self.market_value - self.cost
+
+    def buy(self, symbol: str, price, qty):
+        cost = self.scales[symbol].notional(price, qty)
+        if cost > self.cash:
+            raise ValueError("Insufficient balance")
+
+        pos = self.positions.get(symbol)
+        if pos is None:
+            pos = self.positions[symbol] = {"qty": 0, "cost": 0, "mark": price}
+        else:
+            self.mark(symbol, price)
+
+        pos["qty"] += qty
+        pos["cost"] += cost
+        self.cash -= cost
+        self.cost += cost
+        # The new lot is valued at the current mark, so unrealized is unchanged
+        self.market_value += cost
+
+    def sell(self, symbol: str, price, qty):
+        pos = self.positions.get(symbol)
+        if not pos or pos["qty"] < qty:
+            raise ValueError("Insufficient position")
+
+        scale = self.scales[symbol]
+        self.mark(symbol, price)
+        proceeds = scale.notional(price, qty)
+        basis = scale.share(pos["cost"], qty, pos["qty"])
+        self.cash += proceeds
+        self.realized += proceeds - basis
+        self.market_value -= proceeds
+        self.cost -= basis
+        pos["qty"] -= qty
+        pos["cost"] -= basis
+
+        if pos["qty"] <= QTY_EPSILON:
+            # Drop the rounding residue together with the position
+            self.market_value -= scale.notional(pos["mark"], pos["qty"])
+            self.cost -= pos["cost"]
+            del self.positions[symbol]
+
+    def mark(self, symbol: str, price):
+        """Re-mark one position at ``price``; returns the change in equity"""
+        pos = self.positions.get(symbol)
+        if pos is None:
+            return 0
+
+        delta = self.scales[symbol].notional(price - pos["mark"], pos["qty"])
+        pos["mark"] = price
+        self.market_value += delta
+        return delta
+
+    def snapshot(self) -> dict:
+        quote_out = self.scales.quote_out
+        positions = {}
+        for symbol, pos in self.positions.items():
+            scale = self.scales[symbol]
+            positions[symbol] = {
+                "qty": scale.qty_out(pos["qty"]),
+                "avg_price": scale.unit_price(pos["cost"], pos["qty"]),
+                "mark": scale.price_out(pos["mark"]),
+            }
+        return {
+            "account": self.id,
+            "cash": quote_out(self.cash),
+            "positions": positions,
+            "realized_pnl": quote_out(self.realized),
+            "unrealized_pnl": quote_out(self.unrealized),
+            "total_equity": quote_out(self.equity),
+        }
+
+
+class Portfolio:
+    """All paper accounts, indexed by the symbols they hold.
+
+    A tick in one symbol re-marks only the accounts holding it (O(1) each)
+    and moves the running ``total_equity`` by the summed deltas. Accounts
+    touched since the last sample are tracked so ``sample`` only reports
+    what changed.
+    """
+
+    def __init__(self, initial_balance: float, scales: Optional[Scales] = None):
+        self.scales = scales or Scales()
+        self.initial_balance = self.scales.quote(initial_balance)
+        self.accounts: Dict[str, PaperAccount] = {}
+        self.holders: Dict[str, Set[str]] = defaultdict(set)
+        self.total_equity = 0
+        self.curve = deque(maxlen=EQUITY_CURVE_LEN)
+        self._dirty: Set[str] = set()
+
+    def account(self, account_id: str) -> PaperAccount:
+        """Get an account, opening it with the initial balance on first use"""
+        acc = self.accounts.get(account_id)
+        if acc is None:
+            acc = self.accounts[account_id] = PaperAccount(account_id, self.initial_balance, self.scales)
+            self.total_equity += acc.equity
+            self._dirty.add(account_id)
+        return acc
+
+    def buy(self, account_id: str, symbol: str, price, qty):
+        self._trade(account_id, symbol, price, qty, "buy")
+
+    def sell(self, account_id: str, symbol: str, price, qty):
+        self._trade(account_id, symbol, price, qty, "sell")
+
+    def apply_fill(self, fill: dict):
+        """Book a matching-engine fill. Raises ValueError like buy/sell"""
+        self._trade(fill["account"], fill["symbol"], fill["price"], fill["quantity"], fill["side"])
+
+    def on_tick(self, symbol: str, price):
+        holders = self.holders.get(symbol)
+        if not holders:
+            return
+
+        delta = 0
+        for account_id in holders:
+            delta += self.accounts[account_id].mark(symbol, price)
+        self.total_equity += delta
+        self._dirty.update(holders)
+
+    def sample(self, timestamp: int) -> Optional[dict]:
+        """Equity-curve point for accounts changed since the last sample, or None"""
+        if not self._dirty:
+            return None
+
+        quote_out = self.scales.quote_out
+        point = {
+            "time": timestamp,
+            "total_equity": quote_out(self.total_equity),
+            "accounts": {a: quote_out(self.accounts[a].equity) for a in self._dirty},
+        }
+        self._dirty.clear()
+        self.curve.append({"time": timestamp, "total_equity": point["total_equity"]})
+        return point
+
+    def equity_curve(self, limit: Optional[int] = None) -> List[dict]:
+        curve = list(self.curve)
+        return curve if limit is None else curve[-limit:]
+
+    def _trade(self, account_id: str, symbol: str, price, qty, side: str):
+        acc = self.accounts.get(account_id)
+        opened = acc is None
+        if opened:
+            # Only opened for good once the trade goes through
+            acc = PaperAccount(account_id, self.initial_balance, self.scales)
+        before = 0 if opened else acc.equity
+        if side == "buy":
+            acc.buy(symbol, price, qty)
+        else:
+            acc.sell(symbol, price, qty)
+        if opened:
+            self.accounts[account_id] = acc
+        self.total_equity += acc.equity - before
+
+        if symbol in acc.positions:
+            self.holders[symbol].add(account_id)
+        else:
+            self.holders[symbol].discard(account_id)
+        self._dirty.add(account_id)
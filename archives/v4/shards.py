@@ -0,0 +1,253 @@
+import asyncio
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+import zlib
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fixedpoint import Scales
+from trading import PaperTrading
+
+# PaperTrading methods a shard will run on request
+SHARD_METHODS = {
+    "on_trade",
+    "trade",
+    "trade_batch",
+    "place_order",
+    "cancel_order",
+    "order",
+    "open_orders",
+    "trades",
+    "snapshot",
+}
+
+
+class ShardUnavailable(RuntimeError):
+    """A shard did not answer in time or its process died"""
+
+
+def shard_for(account: str, num_shards: int) -> int:
+    """Stable account -> shard routing (``hash()`` is salted per process)"""
+    return zlib.crc32(account.encode()) % num_shards
+
+
+def _shard_worker(
+    shard_id: int,
+    commands,
+    results,
+    ledger_path: str,
+    initial_balance: float,
+    sample_interval: float,
+    scales: Optional[Scales],
+):
+    """Process loop of one shard: run commands in order, sample equity on a timer"""
+    trading = PaperTrading(ledger_path, initial_balance, scales)
+    next_sample = time.monotonic() + sample_interval
+
+    while True:
+        try:
+            msg = commands.get(timeout=sample_interval)
+        except queue.Empty:
+            msg = None
+
+        if msg is not None:
+            method, req_id, args = msg
+            if method == "stop":
+                break
+
+            try:
+                payload = getattr(trading, method)(*args)
+                ok = True
+            except Exception as e:
+                payload, ok = e, False
+            if req_id is not None:
+                results.send((req_id, ok, payload))
+
+        now = time.monotonic()
+        if now >= next_sample:
+            next_sample = now + sample_interval
+            point = trading.sample(int(time.time()))
+            if point:
+                point["shard"] = shard_id
+                results.send((None, True, point))
+
+    trading.close()
+    results.close()
+
+
+class ShardedTrading:
+    """Paper accounts spread over worker processes by account id.
+
+    Each shard process owns a ``PaperTrading`` (positions, orders and its
+    own ledger file) for the accounts routed to it, so hundreds of
+    simulated strategies run on all cores. Market trades are broadcast to
+    every shard; account requests go to exactly one. Every shard replies on
+    its own pipe, read by a thread that resolves the waiting futures; with
+    no lock shared between shards, a shard killed mid-write cannot wedge
+    the others.
+
+    A shard whose pipe closes without being stopped has died: its waiting
+    requests fail with ``ShardUnavailable`` and it is started again. The new
+    process rebuilds its accounts from its ledger and order journal (cash,
+    positions and resting orders, see ``PaperTrading``); only commands still
+    queued for the dead process, and journal or ledger writes it had not
+    flushed, are lost. A request that gets no reply within ``call_timeout``
+    seconds fails the same way. ``stop`` waits up to ``stop_timeout``
+    seconds for the shards to exit and terminates (then kills) the rest.
+    """
+
+    def __init__(
+        self,
+        num_shards: int,
+        ledger_path: str,
+        initial_balance: float,
+        sample_interval: float = 1.0,
+        on_equity: Optional[Callable[[dict], None]] = None,
+        scales: Optional[Scales] = None,
+        call_timeout: float = 10.0,
+        stop_timeout: float = 10.0,
+    ):
+        self.num_shards = num_shards
+        self.call_timeout = call_timeout
+        self.stop_timeout = stop_timeout
+        self.ledger_path = ledger_path
+        self.initial_balance = initial_balance
+        self.sample_interval = sample_interval
+        self.on_equity = on_equity
+        self.scales = scales
+
+        self._ctx = mp.get_context("spawn")
+        self._commands = [self._ctx.Queue() for _ in range(num_shards)]
+        self._results: List[Optional[Connection]] = [None] * num_shards
+        self._procs: List[Optional[mp.Process]] = [None] * num_shards
+        self._pending: Dict[int, Tuple[int, asyncio.Future]] = {}
+        self._ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        for shard_id in range(self.num_shards):
+            self._spawn(shard_id)
+
+        self._reader = threading.Thread(target=self._read_results, name="shard-results", daemon=True)
+        self._reader.start()
+
+    def stop(self):
+        """Ask every shard to close its ledger and exit; terminate those that do not in time"""
+        self._stopping = True
+        for commands in self._commands:
+            commands.put(("stop", None, ()))
+
+        deadline = time.monotonic() + self.stop_timeout
+        for shard_id, proc in enumerate(self._procs):
+            if proc is None:
+                continue
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                print(f"Shard {shard_id} did not stop within {self.stop_timeout}s, terminating it")
+                proc.terminate()
+                proc.join(1.0)
+                if proc.is_alive():
+                    proc.kill()
+                    proc.join(1.0)
+        if self._reader:
+            # The reader exits once every pipe has closed
+            self._reader.join(max(1.0, deadline - time.monotonic()))
+
+    def broadcast_trade(self, symbol: str, price, qty, timestamp: int):
+        """Feed one market trade to every shard (fire and forget)"""
+        msg = ("on_trade", None, (symbol, price, qty, timestamp))
+        for commands in self._commands:
+            commands.put(msg)
+
+    async def call(self, account: str, method: str, *args):
+        """Run a ``PaperTrading`` method on the shard owning ``account``.
+
+        Raises ``ShardUnavailable`` if the shard is down or does not answer in time.
+        """
+        if method not in SHARD_METHODS:
+            raise ValueError(f"Unknown shard method {method}")
+
+        shard_id = shard_for(account, self.num_shards)
+        proc = self._procs[shard_id]
+        if proc is None or not proc.is_alive():
+            raise ShardUnavailable(f"shard {shard_id} is not running")
+
+        req_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[req_id] = (shard_id, future)
+        self._commands[shard_id].put((method, req_id, args))
+        try:
+            return await asyncio.wait_for(future, self.call_timeout)
+        except asyncio.TimeoutError:
+            raise ShardUnavailable(f"shard {shard_id} did not answer within {self.call_timeout}s")
+        finally:
+            self._pending.pop(req_id, None)
+
+    def _spawn(self, shard_id: int):
+        root, dot, ext = self.ledger_path.rpartition(".")
+        path = f"{root}.shard{shard_id}.{ext}" if dot else f"{ext}.shard{shard_id}"
+        receiver, sender = self._ctx.Pipe(duplex=False)
+        proc = self._ctx.Process(
+            target=_shard_worker,
+            args=(
+                shard_id, self._commands[shard_id], sender, path,
+                self.initial_balance, self.sample_interval, self.scales,
+            ),
+            name=f"paper-shard-{shard_id}",
+            daemon=True,
+        )
+        proc.start()
+        # Only the shard holds the write end now, so its exit closes the pipe
+        sender.close()
+        self._results[shard_id] = receiver
+        self._procs[shard_id] = proc
+
+    def _read_results(self):
+        while True:
+            conns = {conn: i for i, conn in enumerate(self._results) if conn is not None and not conn.closed}
+            if not conns and self._stopping:
+                return
+            for conn in wait(list(conns), timeout=self.sample_interval):
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    conn.close()
+                    if not self._stopping:
+                        self._loop.call_soon_threadsafe(self._restart, conns[conn])
+                    continue
+                self._loop.call_soon_threadsafe(self._resolve, *msg)
+
+    def _restart(self, shard_id: int):
+        """Fail the requests waiting on a dead shard and start it again"""
+        if self._stopping:
+            return
+        proc = self._procs[shard_id]
+        if proc.is_alive():
+            proc.kill()
+        print(f"Shard {shard_id} exited with code {proc.exitcode}, restarting it")
+        for owner, future in list(self._pending.values()):
+            if owner == shard_id and not future.done():
+                future.set_exception(ShardUnavailable(f"shard {shard_id} died"))
+        # Commands queued for the dead process are dropped with its queue
+        self._commands[shard_id] = self._ctx.Queue()
+        self._spawn(shard_id)
+
+    def _resolve(self, req_id: Optional[int], ok: bool, payload):
+        if req_id is None:
+            if self.on_equity:
+                self.on_equity(payload)
+            return
+
+        shard_id, future = self._pending.pop(req_id, (None, None))
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(payload)
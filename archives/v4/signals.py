@@ -0,0 +1,144 @@
+import asyncio
+import json
+import multiprocessing as mp
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+import numpy as np
+import websockets
+
+BINANCE_WS = "wss://stream.binance.com:9443/stream"
+BINANCE_REST = "https://api.binance.com"
+FREQTRADE_PATH = Path(__file__).resolve().parents[2] / "freqtrade"
+
+KLINE_FIELDS = ("date", "open", "high", "low", "close", "volume")
+
+# Strategy instance of a pool worker, loaded once by _init_worker
+_strategy = None
+
+
+def _init_worker(config: dict):
+    """Load the strategy once per worker process (same way as examples/example.py)"""
+    global _strategy
+    sys.path.append(str(FREQTRADE_PATH))
+    from freqtrade.data.dataprovider import DataProvider
+    from freqtrade.resolvers import StrategyResolver
+
+    _strategy = StrategyResolver.load_strategy(config)
+    _strategy.dp = DataProvider(config, None, None)
+    _strategy.ft_bot_start()
+
+
+def _evaluate(pair: str, columns: Dict[str, np.ndarray]) -> dict:
+    """Run the strategy's indicator, entry and exit logic on one window; report the last candle"""
+    import pandas as pd
+
+    df = pd.DataFrame(columns)
+    df["date"] = pd.to_datetime(df["date"], unit="s", utc=True)
+    metadata = {"pair": pair}
+    df = _strategy.advise_indicators(df, metadata)
+    df = _strategy.advise_entry(df, metadata)
+    df = _strategy.advise_exit(df, metadata)
+
+    last = df.iloc[-1]
+    return {
+        "pair": pair,
+        "time": int(columns["date"][-1]),
+        "close": float(last["close"]),
+        "enter_long": int(last.get("enter_long", 0) == 1),
+        "exit_long": int(last.get("exit_long", 0) == 1),
+    }
+
+
+class SignalService:
+    """Strategy signals for many pairs, evaluated as each candle closes.
+
+    One combined Binance kline stream feeds a bounded window of closed
+    candles per pair. Every close sends that pair's window to a process pool
+    whose workers hold a loaded strategy, so ``populate_indicators`` and the
+    entry/exit logic run on ``window`` rows instead of a full history and
+    pairs are evaluated in parallel. ``on_signal`` receives every evaluation
+    that has ``enter_long`` or ``exit_long`` set.
+    """
+
+    def __init__(
+        self,
+        pairs: List[str],
+        timeframe: str,
+        strategy_config: dict,
+        window: int,
+        workers: int,
+        on_signal: Optional[Callable[[dict], None]] = None,
+    ):
+        self.pairs = {p.replace("/", "").upper(): p for p in pairs}
+        self.timeframe = timeframe
+        self.window = window
+        self.on_signal = on_signal
+        self.windows: Dict[str, deque] = {p: deque(maxlen=window) for p in pairs}
+        self.latest: Dict[str, dict] = {}
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=({**strategy_config, "timeframe": timeframe},),
+        )
+
+    async def run(self):
+        """Seed the windows from REST, then follow the kline stream"""
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(self._seed(session, pair) for pair in self.pairs.values()))
+        print(f"Signal windows seeded for {len(self.pairs)} pairs")
+
+        streams = "/".join(f"{symbol.lower()}@kline_{self.timeframe}" for symbol in self.pairs)
+        async with websockets.connect(f"{BINANCE_WS}?streams={streams}") as ws:
+            async for msg in ws:
+                data = json.loads(msg).get("data", {})
+                k = data.get("k")
+                if not k or not k["x"]:
+                    continue  # only closed candles produce signals
+
+                pair = self.pairs.get(data["s"])
+                if pair is None:
+                    continue
+                self.windows[pair].append(
+                    (k["t"] // 1000, float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+                )
+                asyncio.create_task(self._evaluate(pair))
+
+    def stop(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _seed(self, session: aiohttp.ClientSession, pair: str):
+        async with session.get(
+            f"{BINANCE_REST}/api/v3/klines",
+            params={"symbol": pair.replace("/", ""), "interval": self.timeframe, "limit": self.window + 1},
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as resp:
+            klines = await resp.json()
+
+        now_ms = int(time.time() * 1000)
+        for k in klines:
+            if k[6] < now_ms:  # skip the still-forming candle
+                self.windows[pair].append((k[0] // 1000, *map(float, k[1:6])))
+
+    async def _evaluate(self, pair: str):
+        rows = np.array(self.windows[pair], dtype=np.float64)
+        columns = {f: rows[:, i] for i, f in enumerate(KLINE_FIELDS)}
+        columns["date"] = columns["date"].astype(np.int64)
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, _evaluate, pair, columns)
+        except Exception as e:
+            print(f"Signal evaluation failed for {pair}: {e}")
+            return
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        self.latest[pair] = result
+        if self.on_signal and (result["enter_long"] or result["exit_long"]):
+            self.on_signal(result)
@@ -0,0 +1,307 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from fills import FillModel
+from fixedpoint import Scales
+from ledger import TradeLedger
+from orders import QTY_EPSILON, MatchingEngine
+from portfolio import Portfolio
+
+
+def journal_path(ledger_path: str) -> str:
+    """Order journal kept next to a ledger: trades.jsonl -> trades.orders.jsonl"""
+    root, ext = os.path.splitext(ledger_path)
+    return f"{root}.orders{ext}"
+
+
+class PaperTrading:
+    """Matching engine, portfolio and ledger for a set of paper accounts.
+
+    The backend runs one of these in-process; with sharding enabled every
+    shard process owns its own instance for the accounts routed to it.
+    Methods return plain dicts so they can be sent back over a queue as-is.
+
+    Prices and quantities are converted with ``scales`` on the way in and
+    out, so with fixed-point scales the engine, portfolio and ledger only
+    ever see integer ticks and lots.
+
+    Cash and positions are rebuilt on startup by booking the replayed ledger
+    records again, in the order they were written. Resting orders are
+    rebuilt from an order journal next to the ledger (submits, cancels and
+    stop triggers) plus the fills and rejections in the ledger.
+    """
+
+    def __init__(self, ledger_path: str, initial_balance: float, scales: Optional[Scales] = None):
+        self.scales = scales or Scales()
+        self.ledger = TradeLedger(ledger_path)
+        self.journal = TradeLedger(journal_path(ledger_path))
+        self.portfolio = Portfolio(initial_balance, self.scales)
+        self._rebook()
+        self.matching = MatchingEngine(on_fill=self.portfolio.apply_fill, on_trigger=self._journal_trigger)
+        self._restore_orders()
+        self.fills = FillModel()
+
+    def _rebook(self):
+        """Fold the replayed ledger into the portfolio"""
+        for record in self.ledger.records:
+            if record.get("status") == "rejected":
+                continue
+            try:
+                self.portfolio.apply_fill(record)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Ledger record {record.get('id')} could not be booked again: {e}")
+
+    def _restore_orders(self):
+        """Rebuild every order from the journal and its fills from the ledger"""
+        orders: Dict[int, dict] = {}
+        for event in self.journal.records:
+            kind = event.get("event")
+            if kind == "submit":
+                order = dict(event["order"])
+                orders[order["id"]] = order
+                continue
+            order = orders.get(event.get("order_id"))
+            if order is None:
+                continue
+            if kind == "cancel" and order["status"] == "open":
+                order["status"] = "canceled"
+            elif kind == "trigger":
+                order["triggered"] = True
+
+        for record in self.ledger.records:
+            order = orders.get(record.get("order_id"))
+            if order is None:
+                continue
+            if record.get("status") == "rejected":
+                order["status"] = "rejected"
+                order["reason"] = record.get("reason")
+                continue
+            prev, qty, price = order["filled"], record["quantity"], record["price"]
+            order["filled"] = prev + qty
+            order["avg_fill_price"] = (
+                price if not prev else (order["avg_fill_price"] * prev + price * qty) / order["filled"]
+            )
+            if order["status"] == "open" and order["quantity"] - order["filled"] <= QTY_EPSILON:
+                order["status"] = "filled"
+
+        self.matching.restore(list(orders.values()))
+
+    def _journal(self, event: str, subject: dict, **fields):
+        # The journal is a TradeLedger, which orders records by timestamp
+        self.journal.append({"event": event, "timestamp": subject["timestamp"] or 0, **fields})
+
+    def _journal_trigger(self, order: dict):
+        self._journal("trigger", order, order_id=order["id"])
+
+    def on_trade(self, symbol: str, price, qty, timestamp: int):
+        """Fill resting orders crossed by a market trade, then re-mark positions.
+
+        ``price`` and ``qty`` may be the exchange's decimal strings. Fills are
+        booked by the matching engine as they happen; fills and rejected
+        orders are both logged to the ledger.
+        """
+        scale = self.scales[symbol]
+        price, qty = scale.price(price), scale.qty(qty)
+        self.fills.record(symbol, price, qty)
+        self.ledger.extend(self.matching.on_trade(symbol, price, qty, timestamp))
+        self.portfolio.on_tick(symbol, price)
+
+    def trade(self, account: str, symbol: str, side: str, price: float, quantity: float, timestamp: int) -> dict:
+        """Execute an instant paper trade, walking the recorded tape from ``price``"""
+        return self.trade_batch(
+            [{"account": account, "symbol": symbol, "side": side, "quantity": quantity}],
+            {symbol: price},
+            timestamp,
+        )[0]
+
+    def trade_batch(self, orders: List[dict], prices: Dict[str, float], timestamp: int) -> List[dict]:
+        """Execute many market orders against one ``prices`` snapshot.
+
+        Fill prices and quantities come from the ``FillModel``, computed for
+        all orders of a symbol at once; an order bigger than the recorded
+        liquidity fills partially. Fills are then applied in sequence (so
+        earlier buys can fund later sells) and each order gets its own
+        result. Accepted trades are logged to the ledger in one write.
+        """
+        results: List[Optional[dict]] = [None] * len(orders)
+        by_symbol: Dict[str, List[int]] = {}
+
+        for i, order in enumerate(orders):
+            if not isinstance(order, dict):
+                results[i] = {"success": False, "error": "order must be an object"}
+                continue
+
+            symbol = order.get("symbol")
+            if prices.get(symbol) is None:
+                results[i] = {"success": False, "error": f"No market price for {symbol}"}
+                continue
+
+            error = self._check_order((order.get("side") or "").lower(), order.get("quantity"))
+            if error:
+                results[i] = {"success": False, "error": error}
+                continue
+            by_symbol.setdefault(symbol, []).append(i)
+
+        fills: Dict[int, tuple] = {}
+        for symbol, slots in by_symbol.items():
+            try:
+                scale = self.scales[symbol]
+                reference = scale.price(prices[symbol])
+                requested = [scale.qty(orders[i]["quantity"]) for i in slots]
+            except ValueError as e:
+                for i in slots:
+                    results[i] = {"success": False, "error": str(e)}
+                continue
+
+            buys = np.array([orders[i]["side"].lower() == "buy" for i in slots])
+            filled, fill_prices = self.fills.fill(symbol, buys, np.array(requested, dtype=np.float64), reference)
+            filled = scale.round_qtys(filled).tolist()
+            fill_prices = scale.round_prices(fill_prices).tolist()
+            for k, i in enumerate(slots):
+                fills[i] = (fill_prices[k], filled[k], requested[k], reference)
+
+        records, slots = [], []
+        for i, order in enumerate(orders):
+            if results[i] is not None:
+                continue
+
+            symbol = order["symbol"]
+            price, quantity, requested, reference = fills[i]
+            if requested <= 0:
+                results[i] = {"success": False, "error": f"quantity is below the step size of {symbol}"}
+                continue
+            if quantity <= 0:
+                results[i] = {"success": False, "error": f"No liquidity for {symbol}"}
+                continue
+
+            side = order["side"].lower()
+            error = self._book_trade(order.get("account"), symbol, side, price, quantity)
+            if error:
+                results[i] = {"success": False, "error": error}
+                continue
+
+            records.append({
+                "account": order.get("account"),
+                "symbol": symbol,
+                "side": side,
+                "price": price,
+                "quantity": quantity,
+                "requested_quantity": requested,
+                "reference_price": reference,
+                "timestamp": timestamp,
+            })
+            slots.append(i)
+
+        for i, trade in zip(slots, self.ledger.extend(records)):
+            results[i] = {"success": True, "trade": self._trade_out(trade)}
+        return results
+
+    def _check_order(self, side: str, quantity: float) -> Optional[str]:
+        if side not in {"buy", "sell"}:
+            return "side must be 'buy' or 'sell'"
+        if not isinstance(quantity, (int, float)) or quantity <= 0:
+            return "quantity must be positive"
+        return None
+
+    def _book_trade(self, account: str, symbol: str, side: str, price, quantity) -> Optional[str]:
+        """Apply a fill to the portfolio; returns an error message if rejected"""
+        try:
+            if side == "buy":
+                self.portfolio.buy(account, symbol, price, quantity)
+            else:
+                self.portfolio.sell(account, symbol, price, quantity)
+        except (TypeError, ValueError) as e:
+            return str(e)
+        return None
+
+    def place_order(self, account: str, symbol: str, order_data: dict, timestamp: int) -> dict:
+        """Rest a limit, stop or stop_limit order until the trade stream fills it"""
+        try:
+            scale = self.scales[symbol]
+            order = self.matching.submit(
+                symbol=symbol,
+                side=order_data.get("side", ""),
+                order_type=order_data.get("type", "limit"),
+                quantity=scale.qty(order_data.get("quantity")),
+                price=scale.price(order_data.get("price")),
+                stop_price=scale.price(order_data.get("stop_price")),
+                timestamp=timestamp,
+                account=account,
+            )
+        except (TypeError, ValueError) as e:
+            return {"success": False, "error": str(e)}
+
+        self._journal("submit", order, order=dict(order))
+        return {"success": True, "order": self._order_out(order)}
+
+    def cancel_order(self, order_id: int, account: Optional[str] = None) -> dict:
+        """Cancel an open order. Raises KeyError if it is not open for ``account``"""
+        order = self.matching.open.get(order_id)
+        if order is None or (account is not None and order["account"] != account):
+            raise KeyError(order_id)
+        order = self.matching.cancel(order_id)
+        self._journal("cancel", order, order_id=order_id)
+        return self._order_out(order)
+
+    def order(self, order_id: int, account: Optional[str] = None) -> dict:
+        """Any order by id, including filled, canceled and rejected ones. Raises KeyError if unknown"""
+        order = self.matching.orders.get(order_id)
+        if order is None or (account is not None and order["account"] != account):
+            raise KeyError(order_id)
+        return self._order_out(order)
+
+    def open_orders(self, symbol: Optional[str] = None, account: Optional[str] = None) -> list:
+        orders = self.matching.open_orders(symbol)
+        if account is not None:
+            orders = [o for o in orders if o["account"] == account]
+        return [self._order_out(o) for o in orders]
+
+    def trades(
+        self,
+        account: Optional[str] = None,
+        symbol: Optional[str] = None,
+        side: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> dict:
+        """One page of ledger trades; see ``TradeLedger.query``"""
+        total, page = self.ledger.query(account, symbol, side, start, end, offset, limit)
+        return {"total": total, "offset": offset, "limit": limit, "trades": [self._trade_out(t) for t in page]}
+
+    def snapshot(self, account: str) -> dict:
+        """Cash, positions and PnL of one account. Raises KeyError if unknown"""
+        return self.portfolio.accounts[account].snapshot()
+
+    def sample(self, timestamp: int) -> Optional[dict]:
+        return self.portfolio.sample(timestamp)
+
+    def close(self):
+        self.ledger.close()
+        self.journal.close()
+
+    def _trade_out(self, trade: dict) -> dict:
+        """Ledger record with decimal prices and quantities for the API"""
+        scale = self.scales[trade["symbol"]]
+        out = dict(trade)
+        for field in ("price", "reference_price"):
+            if field in out:
+                out[field] = scale.price_out(out[field])
+        for field in ("quantity", "requested_quantity"):
+            if field in out:
+                out[field] = scale.qty_out(out[field])
+        return out
+
+    def _order_out(self, order: dict) -> dict:
+        scale = self.scales[order["symbol"]]
+        return {
+            **order,
+            "quantity": scale.qty_out(order["quantity"]),
+            "filled": scale.qty_out(order["filled"]),
+            "price": scale.price_out(order["price"]),
+            "stop_price": scale.price_out(order["stop_price"]),
+            "avg_fill_price": scale.price_out(order["avg_fill_price"]),
+        }
@@ -0,0 +1,212 @@
+"""
+Content-addressed cache of analyzed strategy DataFrames.
+
+``strategy.analyze_ticker`` is pure for a given input: same OHLCV, same
+strategy code, same parameter values -> same indicator and signal columns.
+The cache key is a hash of exactly those inputs, the value the analyzed
+frame stored as Feather (columnar, memory-mapped on read). Files are
+evicted least-recently-used first once the cache grows past ``max_bytes``.
+
+Informative pairs (``informative_pairs()`` and ``@informative``) are inputs
+too: their candles are read from ``strategy.dp`` and hashed into the key.
+Strategies whose output the key cannot pin down - FreqAI models, or
+informative pairs without a DataProvider to read them from - bypass the
+cache. Data a strategy reads from ``dp`` without declaring it is not seen.
+
+The strategy code in the key is its own file only: a change in a helper
+module the strategy imports does not invalidate entries. Of the config, only
+the keys in ``config_keys`` (``STRATEGY_CONFIG_KEYS`` by default) are hashed;
+strategies that read other config values need them added there. Clear the
+cache directory after changing either.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from pyarrow import feather
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+DEFAULT_MAX_BYTES = 2 * 1024**3
+# Config values commonly read in populate_* (informative pair names, candle types)
+STRATEGY_CONFIG_KEYS = ("timeframe", "stake_currency", "trading_mode", "margin_mode", "candle_type_def")
+
+
+def hash_ohlcv(df: pd.DataFrame) -> str:
+    """Digest of the candle dates and OHLCV values"""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(np.ascontiguousarray(df["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)).tobytes())
+    h.update(np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def strategy_fingerprint(strategy, config_keys: Iterable[str] = STRATEGY_CONFIG_KEYS) -> Dict[str, Any]:
+    """What about the strategy can change analyze_ticker output, as far as the key sees it.
+
+    Hashes the strategy's own source file, not the modules it imports, and
+    only the ``config_keys`` entries of its config (see module docs).
+    """
+    path = getattr(strategy, "__file__", None) or inspect.getfile(type(strategy))
+    source = Path(path).read_bytes()
+
+    params = {}
+    if hasattr(strategy, "enumerate_parameters"):
+        params = {name: param.value for name, param in strategy.enumerate_parameters()}
+
+    try:
+        import freqtrade
+        version = getattr(freqtrade, "__version__", "")
+    except ImportError:
+        version = ""
+
+    config = getattr(strategy, "config", None) or {}
+    return {
+        "class": type(strategy).__name__,
+        "source": hashlib.blake2b(source, digest_size=20).hexdigest(),
+        "params": params,
+        "timeframe": getattr(strategy, "timeframe", None),
+        "config": {k: config.get(k) for k in sorted(config_keys)},
+        "freqtrade": version,
+    }
+
+
+def informative_inputs(strategy) -> Optional[Dict[str, str]]:
+    """Hashes of the informative candles the strategy declares, or None if they cannot be read"""
+    config = getattr(strategy, "config", None) or {}
+    if config.get("freqai", {}).get("enabled"):
+        return None  # output depends on trained model state
+
+    gather = getattr(strategy, "gather_informative_pairs", None) or getattr(strategy, "informative_pairs", None)
+    pairs = gather() if callable(gather) else []
+    if not pairs:
+        return {}
+
+    dp = getattr(strategy, "dp", None)
+    if dp is None:
+        return None
+    hashes = {}
+    for pair, timeframe, *candle_type in pairs:
+        try:
+            df = dp.get_pair_dataframe(pair, timeframe, *candle_type)
+        except Exception:
+            return None
+        if df is None:
+            return None
+        hashes["|".join(map(str, (pair, timeframe, *candle_type)))] = hash_ohlcv(df) if len(df) else ""
+    return hashes
+
+
+class AnalysisCache:
+    """On-disk LRU cache of analyzed DataFrames, keyed by content.
+
+    Recency is the file's mtime, refreshed on every hit, so the cache
+    survives restarts without a separate index.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        config_keys: Iterable[str] = STRATEGY_CONFIG_KEYS,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.config_keys = tuple(config_keys)
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def key(self, strategy, df: pd.DataFrame, metadata: dict, kind: str = "analyzed") -> Optional[str]:
+        """Content key, or None when the strategy's output cannot be keyed (see module docs)"""
+        informative = informative_inputs(strategy)
+        if informative is None:
+            return None
+        payload = json.dumps(
+            {
+                "kind": kind,
+                "ohlcv": hash_ohlcv(df),
+                "informative": informative,
+                "strategy": strategy_fingerprint(strategy, self.config_keys),
+                "metadata": metadata,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            df = feather.read_table(path, memory_map=True).to_pandas()
+        except (FileNotFoundError, OSError):
+            return None
+        os.utime(path)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        path = self._path(key)
+        # Per writer, so concurrent puts of the same key don't share a temp file
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        df.reset_index(drop=True).to_feather(tmp)
+        os.replace(tmp, path)
+        self._evict()
+
+    def analyze(self, strategy, df: pd.DataFrame, metadata: dict) -> pd.DataFrame:
+        """``strategy.analyze_ticker(df, metadata)``, served from the cache when possible"""
+        return self._cached(
+            self.key(strategy, df, metadata), lambda: strategy.analyze_ticker(df, metadata)
+        )
+
+    def cache_indicators(self, strategy):
+        """Route ``strategy.advise_all_indicators`` (what Backtesting calls) through the cache"""
+        def advise_all_indicators(data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+            return {
+                pair: self._cached(
+                    self.key(strategy, df, {"pair": pair}, kind="indicators"),
+                    lambda: strategy.advise_indicators(df.copy(), {"pair": pair}),
+                ).copy()
+                for pair, df in data.items()
+            }
+
+        strategy.advise_all_indicators = advise_all_indicators
+        return strategy
+
+    def _cached(self, key: Optional[str], compute) -> pd.DataFrame:
+        if key is None:
+            self.bypassed += 1
+            return compute()
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        df = compute()
+        self.put(key, df)
+        return df
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.feather"
+
+    def _evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.feather"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -29,6 +29,10 @@ from freqtrade.plot.plotting import (
     generate_plot_filename
 )
 
+from analysis_cache import AnalysisCache
+from informative_cache import install_alignment_cache
+from partitioned_data import PartitionedStore
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -87,17 +91,28 @@ config["pairs"] = pairs
 datadir = config.get("datadir", data_dir)
 logging.info(f"Data directory: {GREY}{datadir}{RESET} | Directory exists: {GREEN}SUCCESS{RESET}" if datadir.exists() else f"Data directory: {GREY}{datadir}{RESET} | Directory exists: {RED}FAIL{RESET}")
 
-data = load_data(
-    datadir = config.get("datadir", data_dir),
-    timeframe = config.get("timeframe", "5m"),
-    pairs = config.get("pairs", ["BTC/USDT"]),
-    timerange = config.get("timerange"),
-    data_format = "json",
-    fill_up_missing = True,
-    
-    startup_candles = 0,
-    candle_type = CandleType.SPOT,
-)
+# With a partitioned store (python partitioned_data.py) only the months overlapping the timerange are read
+partitioned = PartitionedStore(data_dir / "partitioned")
+if partitioned.exists():
+    data = partitioned.load(
+        pairs = config.get("pairs", ["BTC/USDT"]),
+        timeframe = config.get("timeframe", "5m"),
+        timerange = config.get("timerange"),
+        fill_up_missing = True,
+        startup_candles = 0,
+    )
+else:
+    data = load_data(
+        datadir = config.get("datadir", data_dir),
+        timeframe = config.get("timeframe", "5m"),
+        pairs = config.get("pairs", ["BTC/USDT"]),
+        timerange = config.get("timerange"),
+        data_format = "json",
+        fill_up_missing = True,
+
+        startup_candles = 0,
+        candle_type = CandleType.SPOT,
+    )
 
 logging.info(f"Loaded {GREEN}{len(data)}{RESET} | pairs of data from {datadir}")
 
@@ -123,11 +138,15 @@ logging.info(f"Loading strategy: {GREEN}{config['strategy']}{RESET} from {GREY}{
 strategy = StrategyResolver.load_strategy(config)
 strategy.dp = DataProvider(config, None, None)
 strategy.ft_bot_start()
+# Informative pair merges are aligned once and only extended by new candles
+informative_cache = install_alignment_cache(strategy)
 
 # Generate buy/sell signals using strategy
+# Analyzed frames are cached by data + strategy code + parameters, so reruns skip indicators
+analysis_cache = AnalysisCache(config["user_data_dir"] / "analysis_cache")
 for key in data.keys():
     logging.info(f"Analyzing {key}")
-    df = strategy.analyze_ticker(data[key], {"pair": key})
+    df = analysis_cache.analyze(strategy, data[key], {"pair": key})
     # print(df.tail())
     # print(df.describe())
 
@@ -136,6 +155,15 @@ for key in data.keys():
     res_data = df.set_index("date", drop=False)
     print(res_data.tail())
 
+logging.info(
+    f"Analysis cache: {GREEN}{analysis_cache.hits}{RESET} hits, {analysis_cache.misses} misses, "
+    f"{analysis_cache.bypassed} bypassed"
+)
+logging.info(
+    f"Informative cache: {GREEN}{informative_cache.hits}{RESET} hits, "
+    f"{informative_cache.appends} appends, {informative_cache.misses} misses"
+)
+
 # ==================== 3. Backtesting ==================================
 # Store original config before modifications (required for storing backtest results)
 config["original_config"] = deepcopy(config)
@@ -217,6 +245,7 @@ config["original_config"] = clean_config_for_json(deepcopy(config))
 
 try:
     backtesting = Backtesting(config)
+    analysis_cache.cache_indicators(backtesting.strategylist[0])
     backtesting.start()
     
     print("\n" + "="*50)
@@ -0,0 +1,408 @@
+"""
+Parameter search with a persistent result cache and early stopping.
+
+Every evaluated point is stored in a SQLite file keyed by the strategy
+source, the candles it was tested on, the timerange, the loss function and
+the parameter values. Reruns, concurrent searches and repeated samples look
+the key up before backtesting, so after a small change to the search (more
+epochs, other stopping rules) every unchanged evaluation is reused.
+
+Two stopping rules are available:
+
+- patience: stop once ``patience`` evaluations in a row have not improved the
+  best loss by more than ``min_delta``.
+- successive halving: score all candidates on the most recent
+  ``1 / eta**(rungs - 1)`` of the timerange, keep the best ``1 / eta``, and
+  repeat on ``eta`` times longer ranges until the survivors run on the full
+  timerange.
+
+Backtests run in a process pool over shared-memory OHLCV (see
+parallel_backtest.py). Workers return their trades and the search scores
+each batch of finished evaluations with one ``batch_loss`` call of the
+configured hyperopt loss (SampleHyperOptLoss by default).
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing as mp
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "freqtrade"))
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent / "fretrade_templates"))
+
+from freqtrade.configuration import TimeRange
+from freqtrade.data.history import load_data
+from freqtrade.enums import CandleType, RunMode
+from freqtrade.exchange import timeframe_to_seconds
+from freqtrade.loggers import setup_logging
+from freqtrade.resolvers import StrategyResolver
+from freqtrade.strategy import CategoricalParameter, DecimalParameter, IntParameter, RealParameter
+
+from analysis_cache import hash_ohlcv, strategy_fingerprint
+from parallel_backtest import attach_frame, share_frame, slice_frame, summarize
+from sample_hyperopt_loss import batch_loss
+
+# ANSI color codes
+GREEN = "\033[32m"
+RED = "\033[31m"
+YELLOW = "\033[33m"
+GREY = "\033[90m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+TEMPLATES_PATH = Path(__file__).parent.parent / "fretrade_templates"
+
+
+class ResultCache:
+    """Evaluated points in SQLite, safe to share between concurrent runs (WAL mode)"""
+
+    def __init__(self, path: Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, strategy TEXT, params TEXT, timerange TEXT, "
+            "loss REAL, metrics TEXT, created REAL)"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(strategy_hash: str, data_hash: str, timerange: str, loss: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps([strategy_hash, data_hash, timerange, loss, params], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT loss, metrics FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {"loss": row[0], **json.loads(row[1])}
+
+    def put(self, key: str, strategy: str, params: Dict[str, Any], timerange: str, result: Dict[str, Any]):
+        metrics = {k: v for k, v in result.items() if k != "loss"}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, strategy, json.dumps(params, sort_keys=True), timerange, result["loss"],
+             json.dumps(metrics, default=str), time.time()),
+        )
+        self.conn.commit()
+
+
+def search_space(strategy) -> Dict[str, Any]:
+    """Optimizable parameters of the strategy, by name"""
+    return {name: p for name, p in strategy.enumerate_parameters() if p.optimize}
+
+
+def sample_point(space: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    point = {}
+    for name, p in space.items():
+        if isinstance(p, IntParameter):
+            point[name] = int(rng.integers(p.low, p.high + 1))
+        elif isinstance(p, DecimalParameter):
+            point[name] = round(float(rng.uniform(p.low, p.high)), p._decimals)
+        elif isinstance(p, RealParameter):
+            point[name] = float(rng.uniform(p.low, p.high))
+        elif isinstance(p, CategoricalParameter):
+            point[name] = p.opt_range[int(rng.integers(len(p.opt_range)))]
+    return point
+
+
+def strategy_hash(strategy) -> str:
+    """Strategy identity without its current parameter values (those are part of the point)"""
+    fingerprint = {k: v for k, v in strategy_fingerprint(strategy).items() if k != "params"}
+    return hashlib.blake2b(json.dumps(fingerprint, sort_keys=True).encode(), digest_size=20).hexdigest()
+
+
+def data_hash(data: Dict[str, pd.DataFrame], timerange: TimeRange, startup_seconds: int) -> str:
+    """Digest of exactly the candles a backtest on ``timerange`` reads"""
+    h = hashlib.blake2b(digest_size=20)
+    for pair in sorted(data):
+        h.update(pair.encode())
+        h.update(hash_ohlcv(slice_frame(data[pair], timerange, startup_seconds)).encode())
+    return h.hexdigest()
+
+
+def score_epochs(
+    loss: Any,
+    trade_lists: List[pd.DataFrame],
+    timerange: TimeRange,
+    config: Dict[str, Any],
+    processed: Dict[str, pd.DataFrame],
+) -> np.ndarray:
+    """Loss of every trade list, all backtested on ``timerange``, in one ``batch_loss`` call"""
+    return batch_loss(
+        loss if isinstance(loss, type) else type(loss),
+        trade_lists,
+        min_date=pd.Timestamp(timerange.startts, unit="s", tz="UTC").to_pydatetime(),
+        max_date=pd.Timestamp(timerange.stopts, unit="s", tz="UTC").to_pydatetime(),
+        config=config,
+        processed=processed,
+    )
+
+
+def evaluate_point(
+    params: Dict[str, Any],
+    timerange: str,
+    shared: Dict[str, Dict[str, Any]],
+    base_config: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Backtest one parameter point; returns its trades and summary, scored by the caller (worker process)"""
+    from freqtrade.optimize.backtesting import Backtesting
+
+    tr = TimeRange.parse_timerange(timerange)
+    backtesting = Backtesting(base_config)
+    strategy = backtesting.strategylist[0]
+    for name, value in params.items():
+        getattr(strategy, name).value = value
+
+    startup = strategy.startup_candle_count * timeframe_to_seconds(base_config["timeframe"])
+    data = {pair: slice_frame(attach_frame(pair, meta), tr, startup) for pair, meta in shared.items()}
+    backtesting.backtest_one_strategy(strategy, data, tr)
+
+    content = getattr(backtesting, "all_bt_content", None) or backtesting.all_results
+    trades = content[strategy.get_strategy_name()]["results"]
+    Backtesting.cleanup()
+    return {"trades": trades, **summarize(trades, base_config["dry_run_wallet"])}
+
+
+def halving_rungs(start: int, stop: int, eta: int, rungs: int) -> List[str]:
+    """Timeranges ending at ``stop``, each ``eta`` times longer than the previous, the last one full"""
+    length = stop - start
+    return [f"{stop - length // eta ** (rungs - 1 - r)}-{stop}" for r in range(rungs)]
+
+
+class HyperoptSearch:
+    """Random search over the strategy's parameters with caching and early stopping"""
+
+    def __init__(self, base_config: Dict[str, Any], cache: ResultCache, workers: Optional[int] = None):
+        from freqtrade.resolvers.hyperopt_resolver import HyperOptLossResolver
+
+        self.config = base_config
+        self.cache = cache
+        self.workers = workers
+        self.strategy = StrategyResolver.load_strategy(base_config)
+        self.space = search_space(self.strategy)
+        self.strategy_hash = strategy_hash(self.strategy)
+        self.startup = self.strategy.startup_candle_count * timeframe_to_seconds(base_config["timeframe"])
+        self.loss_name = base_config["hyperopt_loss"]
+        self.loss = HyperOptLossResolver.load_hyperoptloss(base_config)
+        self.data: Dict[str, pd.DataFrame] = {}
+        self._data_hashes: Dict[str, str] = {}
+
+    def load(self):
+        timerange = TimeRange.parse_timerange(self.config["timerange"]) if self.config.get("timerange") else None
+        self.data = load_data(
+            datadir=self.config["datadir"],
+            timeframe=self.config["timeframe"],
+            pairs=self.config["pairs"],
+            timerange=timerange,
+            data_format=self.config["dataformat_ohlcv"],
+            fill_up_missing=True,
+            startup_candles=self.strategy.startup_candle_count,
+            candle_type=CandleType.SPOT,
+        )
+        if not self.data:
+            raise ValueError(f"No data found for {self.config['pairs']}")
+
+    def full_range(self) -> Tuple[int, int]:
+        """First and last candle usable for trading, in seconds"""
+        start = min(int(df["date"].iloc[0].timestamp()) for df in self.data.values()) + self.startup
+        stop = max(int(df["date"].iloc[-1].timestamp()) for df in self.data.values())
+        return start, stop
+
+    def key(self, params: Dict[str, Any], timerange: str) -> str:
+        if timerange not in self._data_hashes:
+            tr = TimeRange.parse_timerange(timerange)
+            self._data_hashes[timerange] = data_hash(self.data, tr, self.startup)
+        return ResultCache.key(self.strategy_hash, self._data_hashes[timerange], timerange, self.loss_name, params)
+
+    def run(
+        self,
+        epochs: int,
+        seed: int = 0,
+        patience: Optional[int] = None,
+        min_delta: float = 0.0,
+        eta: Optional[int] = None,
+        rungs: int = 3,
+    ) -> pd.DataFrame:
+        """Sample ``epochs`` points and evaluate them; returns the final rung sorted by loss"""
+        rng = np.random.default_rng(seed)
+        points, seen = [], set()
+        for _ in range(epochs):
+            point = sample_point(self.space, rng)
+            marker = json.dumps(point, sort_keys=True)
+            if marker not in seen:
+                seen.add(marker)
+                points.append(point)
+        logging.info(f"{len(points)} distinct points out of {epochs} samples")
+
+        start, stop = self.full_range()
+        blocks, shared = [], {}
+        for pair, df in self.data.items():
+            shm, meta = share_frame(df)
+            blocks.append(shm)
+            shared[pair] = meta
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("spawn")) as pool:
+                if eta:
+                    rows = []
+                    for r, timerange in enumerate(halving_rungs(start, stop, eta, rungs)):
+                        rows = self._evaluate(pool, shared, points, timerange)
+                        logging.info(f"Rung {r + 1}/{rungs} {GREY}{timerange}{RESET}: {len(rows)} points")
+                        if r < rungs - 1:
+                            survivors = sorted(rows, key=lambda row: row["loss"])[: max(1, len(rows) // eta)]
+                            points = [row["params"] for row in survivors]
+                else:
+                    rows = self._evaluate(pool, shared, points, f"{start}-{stop}", patience, min_delta)
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        report = pd.DataFrame([{**row["params"], **{k: v for k, v in row.items() if k != "params"}} for row in rows])
+        if not report.empty:
+            report = report.sort_values("loss", ignore_index=True)
+        return report
+
+    def _evaluate(
+        self,
+        pool: ProcessPoolExecutor,
+        shared: Dict[str, Dict[str, Any]],
+        points: List[Dict[str, Any]],
+        timerange: str,
+        patience: Optional[int] = None,
+        min_delta: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """Evaluate points on one timerange, cache first, in submission order for patience"""
+        rows, todo = [], []
+        for params in points:
+            key = self.key(params, timerange)
+            cached = self.cache.get(key)
+            if cached is None:
+                todo.append((key, params))
+            else:
+                rows.append({"params": params, "timerange": timerange, "cached": True, **cached})
+
+        best, stale = min((row["loss"] for row in rows), default=np.inf), 0
+        pending = {}
+        queue = iter(todo)
+        limit = (self.workers or mp.cpu_count()) * 2
+
+        def submit():
+            for key, params in queue:
+                future = pool.submit(evaluate_point, params, timerange, shared, self.config)
+                pending[future] = (key, params)
+                if len(pending) >= limit:
+                    return
+
+        tr = TimeRange.parse_timerange(timerange)
+        processed = None
+
+        submit()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            finished = []
+            for future in done:
+                key, params = pending.pop(future)
+                try:
+                    finished.append((key, params, future.result()))
+                except Exception as e:
+                    logging.error(f"{RED}{params} failed: {e}{RESET}")
+
+            # Everything that finished together is scored in one batch
+            losses = []
+            if finished:
+                if processed is None:
+                    processed = {pair: slice_frame(df, tr, self.startup) for pair, df in self.data.items()}
+                trade_lists = [result.pop("trades") for _, _, result in finished]
+                losses = score_epochs(self.loss, trade_lists, tr, self.config, processed)
+            for (key, params, result), value in zip(finished, losses):
+                result = {"loss": float(value), **result}
+                self.cache.put(key, self.strategy.get_strategy_name(), params, timerange, result)
+                rows.append({"params": params, "timerange": timerange, "cached": False, **result})
+
+                if result["loss"] < best - min_delta:
+                    best, stale = result["loss"], 0
+                else:
+                    stale += 1
+
+            if patience is not None and stale >= patience:
+                logging.info(f"{YELLOW}No improvement for {stale} evaluations, stopping early{RESET}")
+                for future in pending:
+                    future.cancel()
+                break
+            submit()
+
+        return rows
+
+
+if __name__ == "__main__":
+    setup_logging(config={"verbosity": 0})
+
+    user_data_dir = Path(__file__).parent / "user_data"
+    exchange_name = "binance"
+
+    EPOCHS = 200
+    SEED = 0
+    WORKERS = None  # defaults to the number of CPUs
+    PATIENCE = 50  # None disables patience-based stopping
+    MIN_DELTA = 0.001
+    ETA = None  # e.g. 3 enables successive halving (PATIENCE is then not used)
+    RUNGS = 3
+
+    base_config: Dict[str, Any] = {
+        "timeframe": "5m",
+        "timerange": None,  # e.g. "20240101-20250101"
+        "pairs": ["BTC/USDT"],
+        "exchange": {"name": exchange_name, "pair_whitelist": ["BTC/USDT"]},
+        "user_data_dir": user_data_dir,
+        "datadir": user_data_dir / "data" / exchange_name,
+        "strategy": "SampleStrategy",
+        "strategy_path": str(Path(__file__).parent / "strategies"),
+        "hyperopt_loss": "SampleHyperOptLoss",
+        "hyperopt_path": str(TEMPLATES_PATH),
+        "dataformat_ohlcv": "json",
+        "dataformat_trades": "json",
+        "runmode": RunMode.BACKTEST,
+        "stake_currency": "USDT",
+        "stake_amount": 30,
+        "dry_run_wallet": 1000,
+        "max_open_trades": 3,
+        "export": "none",
+        "pairlists": [{"method": "StaticPairList"}],
+        "entry_pricing": {"price_side": "same", "use_order_book": True, "order_book_top": 1},
+        "exit_pricing": {"price_side": "same", "use_order_book": True, "order_book_top": 1},
+    }
+
+    cache = ResultCache(user_data_dir / "hyperopt_results" / "hyperopt_cache.sqlite")
+    search = HyperoptSearch(base_config, cache, WORKERS)
+    search.load()
+
+    started = time.perf_counter()
+    report = search.run(EPOCHS, SEED, patience=PATIENCE, min_delta=MIN_DELTA, eta=ETA, rungs=RUNGS)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"\n{BOLD}Search finished in {elapsed:.1f}s{RESET} "
+        f"{GREY}(cache: {cache.hits} hits, {cache.misses} misses){RESET}"
+    )
+    if not report.empty:
+        print(report.head(20).to_string(index=False))
+        out = user_data_dir / "hyperopt_results" / "search_report.csv"
+        report.to_csv(out, index=False)
+        print(f"{GREY}Report saved to {out}{RESET}")
@@ -0,0 +1,314 @@
+"""
+Cached alignment of informative (higher-timeframe / correlated-pair) frames.
+
+``merge_informative_pair`` re-merges the whole informative frame onto the
+whole base frame on every analysis: strategies with ``informative_pairs``,
+the ``@informative`` decorator and FreqAI's ``include_timeframes`` x
+``include_corr_pairlist`` features all pay it once per informative series,
+per pair, per candle. ``AlignmentCache.merge`` returns the same frame, but
+keeps the aligned informative columns per (pair, informative pair,
+timeframe). When the base window only moved forward and the informative
+candles it already used are unchanged, only the rows after the last closed
+informative candle are aligned and appended. When the inputs are the same as
+last time (every strategy of a backtest merging the same informative data)
+the stored columns are reused as they are.
+
+``install_alignment_cache`` routes freqtrade's ``merge_informative_pair``
+(and a loaded strategy's own import of it) through one process-wide cache,
+and tracks the pair the strategy is analyzing so each base pair keeps its own
+entries.
+"""
+
+import sys
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "freqtrade"))
+
+try:
+    from freqtrade.exchange import timeframe_to_seconds
+except ImportError:
+    TIMEFRAME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000, "y": 31536000}
+
+    def timeframe_to_seconds(timeframe: str) -> int:
+        """Same parsing as freqtrade's (ccxt's ``parse_timeframe``), for use without freqtrade"""
+        return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+
+DEFAULT_MAX_BYTES = 512 * 1024**2
+PATCHED_MODULES = [
+    "freqtrade.strategy",
+    "freqtrade.strategy.strategy_helper",
+    "freqtrade.strategy.informative_decorator",
+    "freqtrade.freqai.data_kitchen",
+]
+
+# Pair of the base frame being analyzed, set around ``advise_indicators`` (see `track_pair`)
+base_pair: ContextVar[Optional[str]] = ContextVar("base_pair", default=None)
+
+
+def source_rows(dates: np.ndarray, merge_dates: np.ndarray, ffill: bool, carry: int = -1) -> np.ndarray:
+    """Informative row each base candle takes its values from, -1 for none.
+
+    A base candle matches the informative candle whose merge date equals its
+    date; with ``ffill`` the following candles keep the last match, like
+    ``pd.merge_ordered(..., fill_method="ffill", how="left")``. ``carry`` is
+    the match in effect before ``dates[0]``.
+    """
+    pos = np.searchsorted(merge_dates, dates)
+    hit = pos < len(merge_dates)
+    hit[hit] = merge_dates[pos[hit]] == dates[hit]
+    src = np.where(hit, pos, -1)
+    if ffill and len(src):
+        src[0] = max(src[0], carry)
+        np.maximum.accumulate(src, out=src)
+    return src
+
+
+def _renamed(informative: pd.DataFrame, timeframe_inf: str, append_timeframe: bool, suffix: Optional[str]) -> list:
+    if append_timeframe:
+        return [f"{col}_{timeframe_inf}" for col in informative.columns]
+    if suffix:
+        return [f"{col}_{suffix}" for col in informative.columns]
+    return list(informative.columns)
+
+
+def _gather(informative: pd.DataFrame, src: np.ndarray, columns: list) -> pd.DataFrame:
+    # informative has a RangeIndex, so -1 is a missing label and becomes NaN
+    aligned = informative.reindex(src).reset_index(drop=True)
+    aligned.columns = columns
+    return aligned
+
+
+class AlignedSeries:
+    """
+    Aligned informative columns for one window of base candles.
+
+    Keeps the base dates, the informative frame they were aligned from and,
+    per base candle, the informative row it took its values from.
+    """
+
+    def __init__(self, dates: np.ndarray, informative: pd.DataFrame, merge_dates: np.ndarray,
+                 src: np.ndarray, aligned: pd.DataFrame):
+        self.dates = dates
+        self.informative = informative
+        self.merge_dates = merge_dates
+        self.src = src
+        self.aligned = aligned
+        self.realigned = len(dates)
+
+    def extend(self, dates: np.ndarray, informative: pd.DataFrame, merge_dates: np.ndarray, ffill: bool) -> bool:
+        """
+        Move the window to `dates` / `informative` if both only moved forward.
+        Returns False if the cached rows cannot be reused.
+        """
+        if not len(dates) or not len(self.dates) or not len(merge_dates) or not len(self.merge_dates):
+            return False
+
+        start = np.searchsorted(self.dates, dates[0])
+        kept = len(self.dates) - start
+        if kept <= 0 or len(dates) < kept or not np.array_equal(self.dates[start:], dates[:kept]):
+            return False
+
+        # Informative candles already used must be unchanged, new ones appended after them
+        inf_start = np.searchsorted(self.merge_dates, merge_dates[0])
+        inf_kept = len(self.merge_dates) - inf_start
+        if (
+            inf_kept <= 0
+            or len(merge_dates) < inf_kept
+            or not np.array_equal(self.merge_dates[inf_start:], merge_dates[:inf_kept])
+            or not informative.iloc[:inf_kept].equals(self.informative.iloc[inf_start:].reset_index(drop=True))
+        ):
+            return False
+
+        # Rows from the first new informative candle on are aligned again
+        if len(merge_dates) > inf_kept:
+            kept = min(kept, np.searchsorted(dates, merge_dates[inf_kept]))
+
+        src = self.src[start:start + kept] - inf_start
+        src[src < 0] = -1
+        if ffill:
+            # A window never carries a match from candles that left it
+            matched = np.flatnonzero((src >= 0) & (merge_dates[np.maximum(src, 0)] == dates[:kept]))
+            src[:matched[0] if len(matched) else kept] = -1
+        carry = src[-1] if kept else -1
+        new_src = source_rows(dates[kept:], merge_dates, ffill, carry)
+
+        columns = list(self.aligned.columns)
+        head = self.aligned.iloc[start:start + kept].reset_index(drop=True)
+        dropped = (src < 0) & (self.src[start:start + kept] >= 0)
+        if dropped.any():
+            head = head.mask(np.broadcast_to(dropped[:, None], head.shape))
+        tail = _gather(informative, new_src, columns)
+
+        self.aligned = pd.concat([head, tail], ignore_index=True) if len(head) else tail
+        self.dates = dates
+        self.informative = informative
+        self.merge_dates = merge_dates
+        self.src = np.concatenate([src, new_src])
+        self.realigned = len(new_src) + int(dropped.sum())
+        return True
+
+    def nbytes(self) -> int:
+        return int(
+            self.aligned.memory_usage(index=False).sum()
+            + self.informative.memory_usage(index=False).sum()
+            + self.dates.nbytes + self.merge_dates.nbytes + self.src.nbytes
+        )
+
+
+class AlignmentCache:
+    """
+    LRU of aligned informative columns, bounded by `max_bytes`.
+
+    `merge` is a drop-in for freqtrade's ``merge_informative_pair``. Pass
+    ``key=(pair, informative_pair)`` when calling it directly; without a key
+    the series is identified by the base pair being analyzed (`base_pair`,
+    set for strategies passed to `install_alignment_cache`) and the
+    informative frame's (already suffixed) column names, which is what the
+    ``@informative`` decorator and FreqAI produce. Two series sharing a key
+    are still merged correctly, they just evict each other.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.series: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.appends = 0
+        self.misses = 0
+
+    def merge(
+        self,
+        dataframe: pd.DataFrame,
+        informative: pd.DataFrame,
+        timeframe: str,
+        timeframe_inf: str,
+        ffill: bool = True,
+        append_timeframe: bool = True,
+        date_column: str = "date",
+        suffix: Optional[str] = None,
+        key: Optional[Hashable] = None,
+    ) -> pd.DataFrame:
+        seconds = timeframe_to_seconds(timeframe)
+        seconds_inf = timeframe_to_seconds(timeframe_inf)
+        if seconds_inf < seconds:
+            raise ValueError("Tried to merge a faster timeframe to a slower timeframe.")
+
+        informative = informative.reset_index(drop=True)
+        columns = _renamed(informative, timeframe_inf, append_timeframe, suffix)
+        dates = dataframe["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        # An informative candle is merged onto the last base candle inside it,
+        # the one that closes together with it
+        merge_dates = informative[date_column].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        merge_dates = merge_dates + (seconds_inf - seconds) * 10**9
+
+        if key is None:
+            key = (base_pair.get(), suffix, tuple(informative.columns))
+        key = (key, timeframe, timeframe_inf, ffill, tuple(columns))
+
+        series = self.series.get(key)
+        if series is not None and series.extend(dates, informative, merge_dates, ffill):
+            self.series.move_to_end(key)
+            if series.realigned:
+                self.appends += 1
+            else:
+                self.hits += 1
+            aligned = series.aligned
+        else:
+            self.misses += 1
+            src = source_rows(dates, merge_dates, ffill)
+            aligned = _gather(informative, src, columns)
+            self.series[key] = AlignedSeries(dates, informative.copy(), merge_dates, src, aligned)
+            self.series.move_to_end(key)
+            while self._nbytes() > self.max_bytes and len(self.series) > 1:
+                self.series.popitem(last=False)
+
+        merged = dataframe.reset_index(drop=True)
+        return pd.concat([merged, aligned.copy()], axis=1)
+
+    def _nbytes(self) -> int:
+        return sum(s.nbytes() for s in self.series.values())
+
+
+_cache: Optional[AlignmentCache] = None
+
+
+def strategy_namespaces(strategy: Any) -> List[dict]:
+    """
+    Global namespaces of the modules the strategy's class and its bases were defined in.
+
+    freqtrade loads strategies by file path without registering them in
+    ``sys.modules``, so the modules are found through their functions' ``__globals__``.
+    """
+    namespaces: List[dict] = []
+    for cls in type(strategy).__mro__:
+        for attr in vars(cls).values():
+            func = getattr(attr, "__func__", attr)  # staticmethod / classmethod
+            namespace = getattr(func, "__globals__", None)
+            if namespace is not None and not any(namespace is seen for seen in namespaces):
+                namespaces.append(namespace)
+    return namespaces
+
+
+def track_pair(strategy: Any):
+    """
+    Set `base_pair` to ``metadata["pair"]`` while ``strategy.advise_indicators`` runs.
+
+    Every merge of an analysis happens inside it: ``populate_indicators``, the
+    ``@informative`` decorator and FreqAI's feature engineering.
+    """
+    advise_indicators = strategy.advise_indicators
+    if getattr(advise_indicators, "tracks_pair", False):
+        return
+
+    def tracked(dataframe: pd.DataFrame, metadata: dict) -> pd.DataFrame:
+        token = base_pair.set(metadata.get("pair"))
+        try:
+            return advise_indicators(dataframe, metadata)
+        finally:
+            base_pair.reset(token)
+
+    tracked.tracks_pair = True
+    strategy.advise_indicators = tracked
+
+
+def install_alignment_cache(strategy: Any = None, max_bytes: int = DEFAULT_MAX_BYTES) -> AlignmentCache:
+    """
+    Route ``merge_informative_pair`` through one process-wide `AlignmentCache`.
+
+    Patches freqtrade's own references (strategy helpers, the ``@informative``
+    decorator, the FreqAI data kitchen) and, if given, the modules the
+    strategy's classes were defined in, which hold their own imported reference.
+    A given strategy also has its base pair tracked (`track_pair`), so merges
+    are keyed per pair.
+    """
+    global _cache
+    if _cache is None:
+        _cache = AlignmentCache(max_bytes)
+
+    def merge_informative_pair(dataframe, informative, timeframe, timeframe_inf, ffill=True,
+                               append_timeframe=True, date_column="date", suffix=None):
+        return _cache.merge(dataframe, informative, timeframe, timeframe_inf, ffill=ffill,
+                            append_timeframe=append_timeframe, date_column=date_column, suffix=suffix)
+
+    namespaces = []
+    for name in PATCHED_MODULES:
+        module = sys.modules.get(name)
+        if module is None:
+            try:
+                module = __import__(name, fromlist=["merge_informative_pair"])
+            except ImportError:
+                continue
+        namespaces.append(vars(module))
+    if strategy is not None:
+        namespaces.extend(strategy_namespaces(strategy))
+        track_pair(strategy)
+
+    for namespace in namespaces:
+        if "merge_informative_pair" in namespace:
+            namespace["merge_informative_pair"] = merge_informative_pair
+    return _cache
@@ -0,0 +1,223 @@
+"""
+Migrate a user_data/data/<exchange> tree from json to feather or parquet,
+and benchmark how fast each format loads.
+
+Every OHLCV json file is converted in a process pool. The new file is
+written next to the original under a temporary name, read back and compared
+with the source (row count and a checksum over dates and OHLCV values), and
+only then moved into place with an atomic rename. The json original is moved
+to a backup folder (or deleted) after the swap, so an interrupted run never
+leaves a pair without data.
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ANSI color codes for better output
+GREEN = "\033[32m"
+RED = "\033[31m"
+YELLOW = "\033[33m"
+GREY = "\033[90m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+FORMATS = {"json": ".json", "feather": ".feather", "parquet": ".parquet"}
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+# <pair>-<timeframe>[-<candle type>].json, e.g. BTC_USDT-1m.json or BTC_USDT_USDT-1h-futures.json
+OHLCV_FILE = re.compile(r"^(?P<pair>.+)-(?P<timeframe>\d+[smhdwM])(?:-(?P<candle_type>[a-z_]+))?$")
+BACKUP_DIR = ".json_backup"
+
+
+def find_ohlcv_files(datadir: Path, data_format: str = "json") -> List[Path]:
+    """OHLCV files of one format under ``datadir`` (trades files are skipped)"""
+    ext = FORMATS[data_format]
+    return sorted(
+        p for p in datadir.rglob(f"*{ext}")
+        if BACKUP_DIR not in p.parts
+        and not p.stem.endswith("-trades")
+        and OHLCV_FILE.match(p.stem)
+    )
+
+
+def load_ohlcv(path: Path, data_format: Optional[str] = None) -> pd.DataFrame:
+    """Load one OHLCV file into the freqtrade column layout (format taken from the suffix by default)"""
+    data_format = data_format or next((f for f, ext in FORMATS.items() if ext == path.suffix), None)
+    if data_format == "json":
+        with open(path) as f:
+            raw = np.array(json.load(f), dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        df = pd.DataFrame(raw[:, 1:], columns=OHLCV_COLUMNS[1:])
+        df.insert(0, "date", pd.to_datetime(raw[:, 0].astype(np.int64), unit="ms", utc=True))
+        return df
+    if data_format == "feather":
+        return pd.read_feather(path)
+    if data_format == "parquet":
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported data file {path}")
+
+
+def checksum(df: pd.DataFrame) -> str:
+    """Digest of the dates (ms) and OHLCV values, independent of the storage format"""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(np.ascontiguousarray(df["date"].to_numpy(dtype="datetime64[ms]").view(np.int64)).tobytes())
+    h.update(np.ascontiguousarray(df[OHLCV_COLUMNS[1:]].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def write_ohlcv(df: pd.DataFrame, path: Path, data_format: str):
+    """Write in the same layout freqtrade's feather/parquet data handlers use"""
+    df = df.reset_index(drop=True).loc[:, OHLCV_COLUMNS]
+    if data_format == "feather":
+        df.to_feather(path, compression_level=9, compression="lz4")
+    elif data_format == "parquet":
+        df.to_parquet(path)
+    else:
+        raise ValueError(f"Unsupported target format {data_format}")
+
+
+def migrate_file(path: Path, data_format: str, delete_source: bool) -> Dict[str, Any]:
+    """Convert, verify and swap one file (runs in a worker process)"""
+    target = path.with_suffix(FORMATS[data_format])
+    tmp = target.with_name(target.name + ".tmp")
+    json_size = path.stat().st_size
+    started = time.perf_counter()
+
+    source = load_ohlcv(path)
+    expected = checksum(source)
+    write_ohlcv(source, tmp, data_format)
+
+    written = load_ohlcv(tmp, data_format)
+    if len(written) != len(source) or checksum(written) != expected:
+        tmp.unlink(missing_ok=True)
+        raise ValueError(f"verification failed: {len(written)}/{len(source)} rows, checksum mismatch")
+
+    os.replace(tmp, target)
+    if delete_source:
+        path.unlink()
+    else:
+        backup = path.parent / BACKUP_DIR / path.name
+        backup.parent.mkdir(exist_ok=True)
+        os.replace(path, backup)
+
+    return {
+        "file": str(path.relative_to(path.parents[1])),
+        "rows": len(source),
+        "checksum": expected,
+        "json_kb": round(json_size / 1024, 1),
+        "new_kb": round(target.stat().st_size / 1024, 1),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def migrate_tree(
+    datadir: Path,
+    data_format: str = "feather",
+    workers: Optional[int] = None,
+    delete_source: bool = False,
+) -> pd.DataFrame:
+    """Migrate every json OHLCV file under ``datadir``; returns one row per file"""
+    files = find_ohlcv_files(datadir, "json")
+    print(f"{BOLD}Migrating {len(files)} json files in {datadir} to {data_format}{RESET}")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = {pool.submit(migrate_file, path, data_format, delete_source): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                print(f"  {RED}✗ {path.name}: {e}{RESET}")
+                rows.append({"file": path.name, "error": str(e)})
+                continue
+            print(
+                f"  {GREEN}✓{RESET} {row['file']} {GREY}{row['rows']} rows, "
+                f"{row['json_kb']} KB -> {row['new_kb']} KB in {row['seconds']}s{RESET}"
+            )
+            rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def _measure_load(path: Path) -> Dict[str, Any]:
+    """Load one file in a fresh process; report wall time and peak RSS growth"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    df = load_ohlcv(path)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "rows": len(df),
+        "load_ms": round(elapsed * 1000, 2),
+        "rss_mb": round((peak - baseline) * scale / 1024**2, 1),
+    }
+
+
+def benchmark_tree(datadir: Path, formats: List[str] = list(FORMATS)) -> pd.DataFrame:
+    """Load time and RSS per pair/timeframe for every format present under ``datadir``.
+
+    Each load runs in its own freshly spawned process so RSS figures are not
+    polluted by earlier loads. Backed-up json files are included so a tree
+    can be compared before and after migration.
+    """
+    targets = []
+    for data_format in formats:
+        for path in find_ohlcv_files(datadir, data_format):
+            targets.append((path.stem, data_format, path))
+        if data_format == "json":
+            for path in sorted(datadir.rglob(f"{BACKUP_DIR}/*.json")):
+                targets.append((path.stem, "json", path))
+
+    rows = []
+    for name, data_format, path in sorted(targets):
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+            stats = pool.submit(_measure_load, path).result()
+        rows.append({"file": name, "format": data_format, "size_kb": round(path.stat().st_size / 1024, 1), **stats})
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    EXCHANGE = "binance"
+    USER_DATA_DIR = Path(__file__).parent / "user_data"
+    DATADIR = USER_DATA_DIR / "data" / EXCHANGE
+
+    TARGET_FORMAT = "feather"  # Options: "feather", "parquet"
+    WORKERS = None  # defaults to the number of CPUs
+    DELETE_JSON = False  # False keeps the originals in <dir>/.json_backup/
+    MIGRATE = True
+    BENCHMARK = True
+
+    if not DATADIR.exists():
+        print(f"{RED}Data directory {DATADIR} does not exist{RESET}")
+        sys.exit(1)
+
+    if MIGRATE:
+        result = migrate_tree(DATADIR, TARGET_FORMAT, WORKERS, DELETE_JSON)
+        failed = int(result["error"].notna().sum()) if "error" in result else 0
+        print(f"\n{GREEN if not failed else YELLOW}Migrated {len(result) - failed}/{len(result)} files{RESET}")
+        if not failed:
+            print(f"{GREY}Set data_format / dataformat_ohlcv to \"{TARGET_FORMAT}\" in your scripts{RESET}")
+
+    if BENCHMARK:
+        report = benchmark_tree(DATADIR)
+        if report.empty:
+            print(f"{YELLOW}No OHLCV files to benchmark{RESET}")
+        else:
+            print(f"\n{BOLD}Load benchmark{RESET}")
+            print(report.pivot_table(
+                index="file", columns="format", values=["load_ms", "rss_mb", "size_kb"]
+            ).to_string())
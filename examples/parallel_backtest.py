@@ -0,0 +1,259 @@
+"""
+Run many (strategy, pairs, timerange) backtests in parallel on one machine.
+
+OHLCV is loaded once in the parent and placed in shared memory; workers
+attach to it by name instead of receiving pickled DataFrames. Every job runs
+freqtrade's Backtesting for one strategy on its pairs, and the per-job
+results are merged into one report sorted by total profit.
+"""
+
+import logging
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "freqtrade"))
+sys.path.append(str(Path(__file__).parent))
+
+from freqtrade.configuration import TimeRange
+from freqtrade.data.history import load_data
+from freqtrade.enums import CandleType, RunMode
+from freqtrade.exchange import timeframe_to_seconds
+from freqtrade.loggers import setup_logging
+
+# ANSI color codes
+GREEN = "\033[32m"
+RED = "\033[31m"
+GREY = "\033[90m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Shared-memory blocks attached by this worker process, by pair
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def share_frame(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """Copy one OHLCV frame into a shared-memory block.
+
+    Layout: ``n`` int64 dates (ns since epoch) followed by an ``n x 5``
+    float64 OHLCV matrix. Returns the block and the metadata a worker needs
+    to attach to it.
+    """
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 8 * (1 + len(OHLCV_COLUMNS)), 1))
+    dates = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((n, len(OHLCV_COLUMNS)), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+    dates[:] = df["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    values[:] = df[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+    return shm, {"name": shm.name, "rows": n}
+
+
+def attach_frame(pair: str, meta: Dict[str, Any]) -> pd.DataFrame:
+    """Rebuild an OHLCV DataFrame over a shared block (the OHLCV values are not copied)"""
+    shm = _attached.get(pair)
+    if shm is None:
+        shm = _attached[pair] = shared_memory.SharedMemory(name=meta["name"])
+    n = meta["rows"]
+    dates = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((n, len(OHLCV_COLUMNS)), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+
+    df = pd.DataFrame(values, columns=OHLCV_COLUMNS, copy=False)
+    df.insert(0, "date", pd.to_datetime(dates, utc=True))
+    return df
+
+
+def slice_frame(df: pd.DataFrame, timerange: Optional[TimeRange], startup_seconds: int) -> pd.DataFrame:
+    """Keep the job's timerange plus the strategy's startup candles"""
+    if timerange is None:
+        return df
+    start, stop = 0, len(df)
+    if timerange.startts:
+        start = df["date"].searchsorted(pd.Timestamp(timerange.startts - startup_seconds, unit="s", tz="UTC"))
+    if timerange.stopts:
+        stop = df["date"].searchsorted(pd.Timestamp(timerange.stopts, unit="s", tz="UTC"), side="right")
+    return df.iloc[start:stop].reset_index(drop=True)
+
+
+def summarize(trades: pd.DataFrame, wallet: float) -> Dict[str, Any]:
+    """Comparable per-job numbers computed from the trade list"""
+    if trades.empty:
+        return {"trades": 0, "wins": 0, "winrate": 0.0, "profit_total_abs": 0.0,
+                "profit_total_pct": 0.0, "profit_mean_pct": 0.0, "max_drawdown_abs": 0.0,
+                "avg_duration_min": 0.0}
+
+    profits = trades["profit_abs"].to_numpy(dtype=np.float64)
+    equity = np.cumsum(profits)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity
+    wins = int((profits > 0).sum())
+    return {
+        "trades": len(trades),
+        "wins": wins,
+        "winrate": wins / len(trades),
+        "profit_total_abs": float(equity[-1]),
+        "profit_total_pct": float(equity[-1] / wallet * 100),
+        "profit_mean_pct": float(trades["profit_ratio"].mean() * 100),
+        "max_drawdown_abs": float(drawdown.max()),
+        "avg_duration_min": float(trades["trade_duration"].mean()),
+    }
+
+
+def run_job(job: Dict[str, Any], shared: Dict[str, Dict[str, Any]], base_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Backtest one strategy on one pair set in a worker process"""
+    from freqtrade.optimize.backtesting import Backtesting
+
+    started = time.perf_counter()
+    config = {
+        **base_config,
+        "strategy": job["strategy"],
+        "pairs": job["pairs"],
+        "exchange": {**base_config["exchange"], "pair_whitelist": job["pairs"]},
+        "timerange": job["timerange"],
+    }
+    timerange = TimeRange.parse_timerange(job["timerange"]) if job["timerange"] else None
+
+    backtesting = Backtesting(config)
+    strategy = backtesting.strategylist[0]
+    if base_config.get("analysis_cache_dir"):
+        from analysis_cache import AnalysisCache
+        AnalysisCache(base_config["analysis_cache_dir"]).cache_indicators(strategy)
+    if base_config.get("informative_cache"):
+        from informative_cache import install_alignment_cache
+        install_alignment_cache(strategy)
+    startup = strategy.startup_candle_count * timeframe_to_seconds(config["timeframe"])
+    data = {
+        pair: slice_frame(attach_frame(pair, shared[pair]), timerange, startup)
+        for pair in job["pairs"]
+    }
+    backtesting.backtest_one_strategy(strategy, data, timerange or TimeRange())
+
+    content = getattr(backtesting, "all_bt_content", None) or backtesting.all_results
+    trades = content[strategy.get_strategy_name()]["results"]
+    Backtesting.cleanup()
+
+    return {
+        "strategy": job["strategy"],
+        "pairs": ",".join(job["pairs"]),
+        "timerange": job["timerange"] or "all",
+        **summarize(trades, config["dry_run_wallet"]),
+        "runtime_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def run_grid(
+    jobs: List[Dict[str, Any]],
+    base_config: Dict[str, Any],
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """Run all jobs on a process pool over shared OHLCV; returns the merged report"""
+    pairs = sorted({pair for job in jobs for pair in job["pairs"]})
+    data = load_data(
+        datadir=base_config["datadir"],
+        timeframe=base_config["timeframe"],
+        pairs=pairs,
+        data_format=base_config["dataformat_ohlcv"],
+        fill_up_missing=True,
+        startup_candles=0,
+        candle_type=CandleType.SPOT,
+    )
+    missing = [p for p in pairs if p not in data]
+    if missing:
+        logging.warning(f"{RED}No data for {', '.join(missing)}; jobs using them are skipped{RESET}")
+        jobs = [job for job in jobs if not set(job["pairs"]) & set(missing)]
+
+    blocks, shared = [], {}
+    for pair, df in data.items():
+        shm, meta = share_frame(df)
+        blocks.append(shm)
+        shared[pair] = meta
+    del data
+
+    rows = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            futures = {pool.submit(run_job, job, shared, base_config): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    logging.error(f"{RED}{job['strategy']} on {job['pairs']} failed: {e}{RESET}")
+                    continue
+                rows.append(row)
+                logging.info(
+                    f"{GREEN}done{RESET} {row['strategy']} {GREY}{row['pairs']} {row['timerange']}{RESET} "
+                    f"profit={row['profit_total_abs']:.2f} trades={row['trades']} ({row['runtime_s']}s)"
+                )
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    report = pd.DataFrame(rows)
+    if not report.empty:
+        report = report.sort_values("profit_total_abs", ascending=False, ignore_index=True)
+    return report
+
+
+if __name__ == "__main__":
+    setup_logging(config={"verbosity": 0})
+
+    user_data_dir = Path(__file__).parent / "user_data"
+    exchange_name = "binance"
+
+    STRATEGIES = ["SampleStrategy"]
+    PAIR_SETS = [
+        ["BTC/USDT"],
+        ["ETH/USDT"],
+        # ["BTC/USDT", "ETH/USDT"],
+    ]
+    TIMERANGES = [None]  # e.g. ["20240101-20240701", "20240701-20250101"]
+    WORKERS = None  # defaults to the number of CPUs
+
+    base_config: Dict[str, Any] = {
+        "timeframe": "5m",
+        "exchange": {"name": exchange_name},
+        "user_data_dir": user_data_dir,
+        "datadir": user_data_dir / "data" / exchange_name,
+        "strategy_path": str(Path(__file__).parent / "strategies"),
+        "dataformat_ohlcv": "json",
+        "dataformat_trades": "json",
+        "runmode": RunMode.BACKTEST,
+        "stake_currency": "USDT",
+        "stake_amount": 30,
+        "dry_run_wallet": 1000,
+        "max_open_trades": 3,
+        "export": "none",
+        "analysis_cache_dir": user_data_dir / "analysis_cache",  # None disables the cache
+        "informative_cache": True,  # align informative pairs once per worker, append per candle
+        "pairlists": [{"method": "StaticPairList"}],
+        "entry_pricing": {"price_side": "same", "use_order_book": True, "order_book_top": 1},
+        "exit_pricing": {"price_side": "same", "use_order_book": True, "order_book_top": 1},
+    }
+
+    jobs = [
+        {"strategy": strategy, "pairs": pair_set, "timerange": timerange}
+        for strategy in STRATEGIES
+        for pair_set in PAIR_SETS
+        for timerange in TIMERANGES
+    ]
+
+    started = time.perf_counter()
+    report = run_grid(jobs, base_config, WORKERS)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{BOLD}Backtest grid: {len(report)}/{len(jobs)} jobs in {elapsed:.1f}s{RESET}")
+    if not report.empty:
+        print(report.to_string(index=False))
+        out = user_data_dir / "backtest_results" / "grid_report.csv"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        report.to_csv(out, index=False)
+        print(f"{GREY}Report saved to {out}{RESET}")
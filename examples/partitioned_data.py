@@ -0,0 +1,203 @@
+"""
+Month-partitioned OHLCV store with timerange pushdown.
+
+``load_data`` reads a pair's whole history file and trims it afterwards, so
+a one-month backtest on two years of 1m candles still parses two years. This
+store splits every pair/timeframe into one uncompressed Feather file per
+calendar month and keeps an index with each partition's first and last
+candle. A load only opens the partitions overlapping the requested
+``TimeRange`` (extended backwards by the startup candles), memory-mapped,
+and trims the Arrow table before converting it, so only the candles in range
+are copied into the DataFrame. Like ``load_data``, both ends of the range are
+inclusive and gaps are filled with ``clean_ohlcv_dataframe``.
+
+Layout::
+
+    <root>/index.json
+    <root>/BTC_USDT-5m/2024-01.feather
+    <root>/BTC_USDT-5m/2024-02.feather
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+sys.path.append(str(Path(__file__).parent.parent / "freqtrade"))
+sys.path.append(str(Path(__file__).parent))
+
+from freqtrade.configuration import TimeRange
+from freqtrade.data.converter import clean_ohlcv_dataframe
+from freqtrade.exchange import timeframe_to_seconds
+
+from migrate_data_format import OHLCV_COLUMNS, OHLCV_FILE, find_ohlcv_files, load_ohlcv
+
+# ANSI color codes
+GREEN = "\033[32m"
+RED = "\033[31m"
+GREY = "\033[90m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+INDEX_FILE = "index.json"
+
+
+def series_key(pair: str, timeframe: str, candle_type: str = "") -> str:
+    """Directory/index name of one series, matching freqtrade's file names (BTC/USDT -> BTC_USDT-5m)"""
+    key = f"{pair.replace('/', '_').replace(':', '_')}-{timeframe}"
+    return f"{key}-{candle_type}" if candle_type and candle_type != "spot" else key
+
+
+class PartitionedStore:
+    """OHLCV partitioned by pair/timeframe/month, with a JSON index of partition bounds.
+
+    Index entries are ``{"month", "file", "start", "stop", "rows"}`` with
+    ``start``/``stop`` the first and last candle open time in ms.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.index: Dict[str, List[dict]] = {}
+        index_path = self.root / INDEX_FILE
+        if index_path.exists():
+            self.index = json.loads(index_path.read_text())
+
+    def exists(self) -> bool:
+        return bool(self.index)
+
+    def write(self, key: str, df: pd.DataFrame):
+        """Replace the partitions of one series with ``df``, split by month"""
+        df = df.loc[:, OHLCV_COLUMNS].sort_values("date").drop_duplicates("date").reset_index(drop=True)
+        series_dir = self.root / key
+        series_dir.mkdir(parents=True, exist_ok=True)
+
+        dates = df["date"].dt.tz_convert("UTC")
+        months = dates.dt.strftime("%Y-%m")
+        entries = []
+        for month, part in df.groupby(months, sort=True):
+            path = series_dir / f"{month}.feather"
+            tmp = path.with_suffix(".tmp")
+            # Uncompressed so reads can map the file instead of decompressing it
+            part.reset_index(drop=True).to_feather(tmp, compression="uncompressed")
+            os.replace(tmp, path)
+            ms = part["date"].to_numpy(dtype="datetime64[ms]").view("int64")
+            entries.append({
+                "month": month,
+                "file": f"{key}/{month}.feather",
+                "start": int(ms[0]),
+                "stop": int(ms[-1]),
+                "rows": len(part),
+            })
+
+        for stale in {p.stem for p in series_dir.glob("*.feather")} - {e["month"] for e in entries}:
+            (series_dir / f"{stale}.feather").unlink()
+
+        self.index[key] = entries
+        self._save_index()
+
+    def partitions(self, key: str, start_ms: Optional[int] = None, stop_ms: Optional[int] = None) -> List[dict]:
+        """Index entries of ``key`` overlapping [start_ms, stop_ms]"""
+        return [
+            e for e in self.index.get(key, [])
+            if (start_ms is None or e["stop"] >= start_ms) and (stop_ms is None or e["start"] <= stop_ms)
+        ]
+
+    def load_pair(
+        self,
+        pair: str,
+        timeframe: str,
+        timerange: Optional[TimeRange] = None,
+        startup_candles: int = 0,
+        candle_type: str = "",
+        fill_up_missing: bool = True,
+    ) -> pd.DataFrame:
+        """Candles of ``timerange`` plus ``startup_candles`` before its start"""
+        start_ms = stop_ms = None
+        if timerange is not None and timerange.startts:
+            start_ms = (timerange.startts - startup_candles * timeframe_to_seconds(timeframe)) * 1000
+        if timerange is not None and timerange.stopts:
+            stop_ms = timerange.stopts * 1000
+
+        parts = self.partitions(series_key(pair, timeframe, candle_type), start_ms, stop_ms)
+        if not parts:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        table = pa.concat_tables(
+            feather.read_table(self.root / e["file"], memory_map=True) for e in parts
+        )
+
+        # Only the first and last partition can hold candles outside the range;
+        # trim on the mapped table so to_pandas only copies the rows kept
+        ms = table.column("date").cast(pa.timestamp("ms", tz="UTC")).to_numpy().view("int64")
+        first, last = 0, len(ms)
+        if start_ms is not None:
+            first = int(ms.searchsorted(start_ms))
+        if stop_ms is not None:
+            last = int(ms.searchsorted(stop_ms, side="right"))
+        df = table.slice(first, last - first).to_pandas()
+        if df.empty:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return clean_ohlcv_dataframe(df, timeframe, pair, fill_missing=fill_up_missing, drop_incomplete=False)
+
+    def load(
+        self,
+        pairs: List[str],
+        timeframe: str,
+        timerange: Optional[TimeRange] = None,
+        startup_candles: int = 0,
+        candle_type: str = "",
+        fill_up_missing: bool = True,
+    ) -> Dict[str, pd.DataFrame]:
+        """Drop-in for ``load_data``: ``{pair: DataFrame}`` for pairs that have data"""
+        data = {}
+        for pair in pairs:
+            df = self.load_pair(pair, timeframe, timerange, startup_candles, candle_type, fill_up_missing)
+            if not df.empty:
+                data[pair] = df
+        return data
+
+    def _save_index(self):
+        path = self.root / INDEX_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.index, indent=1, sort_keys=True))
+        os.replace(tmp, path)
+
+
+def partition_tree(datadir: Path, root: Path, data_format: str = "json") -> PartitionedStore:
+    """Build (or refresh) a partitioned store from a freqtrade data directory"""
+    store = PartitionedStore(root)
+    files = [p for p in find_ohlcv_files(datadir, data_format) if Path(root) not in p.parents]
+    print(f"{BOLD}Partitioning {len(files)} {data_format} files from {datadir}{RESET}")
+
+    for path in files:
+        match = OHLCV_FILE.match(path.stem)
+        key = series_key(match["pair"], match["timeframe"], match["candle_type"] or "")
+        try:
+            df = load_ohlcv(path)
+            store.write(key, df)
+        except Exception as e:
+            print(f"  {RED}✗ {path.name}: {e}{RESET}")
+            continue
+        print(f"  {GREEN}✓{RESET} {key} {GREY}{len(df)} rows in {len(store.index[key])} partitions{RESET}")
+
+    return store
+
+
+if __name__ == "__main__":
+    EXCHANGE = "binance"
+    USER_DATA_DIR = Path(__file__).parent / "user_data"
+    DATADIR = USER_DATA_DIR / "data" / EXCHANGE
+    PARTITION_DIR = DATADIR / "partitioned"
+    SOURCE_FORMAT = "json"  # Options: "json", "feather", "parquet"
+
+    if not DATADIR.exists():
+        print(f"{RED}Data directory {DATADIR} does not exist{RESET}")
+        sys.exit(1)
+
+    store = partition_tree(DATADIR, PARTITION_DIR, SOURCE_FORMAT)
+    print(f"\n{GREEN}Index written to {PARTITION_DIR / INDEX_FILE}{RESET}")
@@ -0,0 +1,334 @@
+"""
+Sweep SampleStrategy's RSI thresholds without re-running the backtest per combination.
+
+Indicators are computed once per pair. Entry and exit masks for every
+threshold come from one broadcast comparison (``crossed_above`` for all
+thresholds at once), ROI and stoploss exits are resolved once per possible
+entry candle, and then all (buy_rsi, sell_rsi) combinations are stepped
+through their trades together, one trade per iteration, as NumPy arrays.
+
+This is a screening tool: one position per pair, no max_open_trades, no
+trailing stop, and the exit prices follow freqtrade's backtesting rules only
+approximately. Confirm the best rows with a real backtest.
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "freqtrade"))
+sys.path.append(str(Path(__file__).parent))
+
+from freqtrade.configuration import TimeRange
+from freqtrade.data.dataprovider import DataProvider
+from freqtrade.data.history import load_data
+from freqtrade.enums import CandleType, RunMode
+from freqtrade.exchange import timeframe_to_minutes
+from freqtrade.loggers import setup_logging
+from freqtrade.resolvers import StrategyResolver
+
+from partitioned_data import PartitionedStore
+
+# ANSI color codes
+GREEN = "\033[32m"
+RED = "\033[31m"
+GREY = "\033[90m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+FIRST_WINDOW = 256  # candles scanned per entry for ROI/stoploss before widening
+
+
+def sample_entry_guard(df: pd.DataFrame) -> np.ndarray:
+    """SampleStrategy's long entry conditions besides the RSI cross"""
+    tema = df["tema"]
+    return ((tema <= df["bb_middleband"]) & (tema > tema.shift(1)) & (df["volume"] > 0)).to_numpy()
+
+
+def sample_exit_guard(df: pd.DataFrame) -> np.ndarray:
+    """SampleStrategy's long exit conditions besides the RSI cross"""
+    tema = df["tema"]
+    return ((tema > df["bb_middleband"]) & (tema < tema.shift(1)) & (df["volume"] > 0)).to_numpy()
+
+
+def crossed_above_all(series: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """``qtpylib.crossed_above(series, t)`` for every threshold: bool (len(thresholds), len(series))"""
+    prev = np.concatenate(([np.nan], series[:-1]))
+    t = thresholds[:, None]
+    return (series[None, :] > t) & (prev[None, :] <= t)
+
+
+def next_true(mask: np.ndarray) -> np.ndarray:
+    """For each row, the index of the next True at or after every column (n_cols when none).
+
+    Has one extra column so ``result[:, n_cols]`` is valid and equals n_cols.
+    """
+    n = mask.shape[1]
+    idx = np.where(mask, np.arange(n, dtype=np.int64), n)
+    idx = np.concatenate((idx, np.full((mask.shape[0], 1), n)), axis=1)
+    return np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+
+
+def roi_close_rate(open_rate: np.ndarray, roi: np.ndarray, fee: float) -> np.ndarray:
+    """Exit rate that yields ``roi`` after fees (same formula as freqtrade's backtesting)"""
+    return -(open_rate * roi + open_rate * (1 + fee)) / (fee - 1)
+
+
+def roi_stoploss_exits(
+    df: pd.DataFrame,
+    entries: np.ndarray,
+    minimal_roi: Dict[str, float],
+    stoploss: float,
+    timeframe_min: int,
+    fee: float,
+):
+    """First ROI or stoploss exit after each entry candle.
+
+    Returns ``(exit_candle, exit_rate)`` aligned with ``entries``; the exit
+    candle is ``len(df)`` when neither triggers before the data ends. The
+    forward window starts at FIRST_WINDOW candles and doubles for entries
+    still open, so typical short trades never scan far.
+    """
+    open_, high, low = (df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low"))
+    n = len(df)
+    roi_minutes = np.array(sorted(int(k) for k in minimal_roi), dtype=np.int64)
+    roi_values = np.array([minimal_roi[str(k)] for k in roi_minutes], dtype=np.float64)
+
+    exit_candle = np.full(len(entries), n, dtype=np.int64)
+    exit_rate = np.full(len(entries), np.nan)
+    pending = np.arange(len(entries))
+    offset, window = 0, FIRST_WINDOW
+    while len(pending) and offset < n:
+        k = entries[pending]
+        steps = np.arange(offset, offset + window)
+        idx = k[:, None] + steps[None, :]
+        valid = idx < n
+        idx = np.minimum(idx, n - 1)
+
+        open_rate = open_[k][:, None]
+        stop_rate = open_rate * (1 + stoploss)
+        bracket = np.searchsorted(roi_minutes, steps * timeframe_min, side="right") - 1
+        roi_rate = roi_close_rate(open_rate, np.where(bracket >= 0, roi_values[bracket], np.inf), fee)
+
+        hit_stop = valid & (low[idx] <= stop_rate)
+        hit_roi = valid & (high[idx] >= roi_rate)
+        hit = hit_stop | hit_roi
+        found = hit.any(axis=1)
+        first = hit.argmax(axis=1)
+
+        rows = np.flatnonzero(found)
+        j, c = first[rows], idx[rows, first[rows]]
+        gap = steps[j] > 0  # the entry candle opens at open_rate, later candles may gap past it
+        stop_hit = hit_stop[rows, j]
+        stop_px = np.where(gap, np.minimum(stop_rate[rows, 0], open_[c]), stop_rate[rows, 0])
+        roi_px = np.where(gap, np.maximum(roi_rate[rows, j], open_[c]), roi_rate[rows, j])
+
+        done = pending[rows]
+        exit_candle[done] = c
+        exit_rate[done] = np.where(stop_hit, stop_px, roi_px)
+
+        pending = pending[~found]
+        offset += window
+        window *= 2
+
+    return exit_candle, exit_rate
+
+
+def sweep_pair(
+    df: pd.DataFrame,
+    buy_values: np.ndarray,
+    sell_values: np.ndarray,
+    minimal_roi: Dict[str, float],
+    stoploss: float,
+    timeframe_min: int,
+    fee: float,
+    entry_guard: Callable[[pd.DataFrame], np.ndarray] = sample_entry_guard,
+    exit_guard: Callable[[pd.DataFrame], np.ndarray] = sample_exit_guard,
+) -> Dict[str, np.ndarray]:
+    """Trade statistics of every (buy, sell) threshold pair on one analyzed frame.
+
+    Every returned array has shape (len(buy_values), len(sell_values)).
+    """
+    n = len(df)
+    rsi = df["rsi"].to_numpy(dtype=np.float64)
+    open_ = df["open"].to_numpy(dtype=np.float64)
+    last_close = float(df["close"].iloc[-1])
+
+    entry_mask = crossed_above_all(rsi, buy_values) & entry_guard(df)[None, :]
+    exit_mask = crossed_above_all(rsi, sell_values) & exit_guard(df)[None, :]
+    next_entry = next_true(entry_mask)  # signal candle; the trade opens on the next candle
+    next_exit = next_true(exit_mask)
+
+    # ROI/stoploss depend only on the entry candle, so resolve each candidate once
+    candidates = np.flatnonzero(entry_mask.any(axis=0)) + 1
+    candidates = candidates[candidates < n]
+    roi_candle = np.full(n + 1, n, dtype=np.int64)
+    roi_rate = np.full(n + 1, np.nan)
+    roi_candle[candidates], roi_rate[candidates] = roi_stoploss_exits(
+        df, candidates, minimal_roi, stoploss, timeframe_min, fee
+    )
+
+    shape = (len(buy_values), len(sell_values))
+    b = np.repeat(np.arange(shape[0]), shape[1])
+    s = np.tile(np.arange(shape[1]), shape[0])
+    signal = next_entry[b, 0]
+
+    trades = np.zeros(b.size, dtype=np.int64)
+    wins = np.zeros(b.size, dtype=np.int64)
+    profit = np.zeros(b.size)
+    equity = np.zeros(b.size)
+    peak = np.zeros(b.size)
+    drawdown = np.zeros(b.size)
+    duration = np.zeros(b.size)
+
+    active = np.flatnonzero(signal + 1 < n)
+    while len(active):
+        k = signal[active] + 1
+        open_rate = open_[k]
+
+        # An exit signal on candle x exits at the open of x + 1, unless ROI/stoploss hit earlier
+        sig_candle = next_exit[s[active], k] + 1
+        use_signal = (sig_candle < n) & (sig_candle <= roi_candle[k])
+        exit_at = np.where(use_signal, sig_candle, roi_candle[k])
+        rate = np.where(use_signal, open_[np.minimum(sig_candle, n - 1)], roi_rate[k])
+        rate = np.where(exit_at >= n, last_close, rate)  # still open at the end: force exit
+
+        ratio = (rate * (1 - fee) - open_rate * (1 + fee)) / (open_rate * (1 + fee))
+        trades[active] += 1
+        wins[active] += ratio > 0
+        profit[active] += ratio
+        duration[active] += np.minimum(exit_at, n - 1) - k
+        equity[active] += ratio
+        peak[active] = np.maximum(peak[active], equity[active])
+        drawdown[active] = np.maximum(drawdown[active], peak[active] - equity[active])
+
+        signal[active] = next_entry[b[active], np.minimum(exit_at, n)]
+        active = active[signal[active] + 1 < n]
+
+    return {
+        "trades": trades.reshape(shape),
+        "wins": wins.reshape(shape),
+        "profit_ratio": profit.reshape(shape),
+        "max_drawdown_ratio": drawdown.reshape(shape),
+        "duration_candles": duration.reshape(shape),
+    }
+
+
+def sweep(
+    analyzed: Dict[str, pd.DataFrame],
+    buy_values: Sequence[int],
+    sell_values: Sequence[int],
+    minimal_roi: Dict[str, float],
+    stoploss: float,
+    timeframe: str,
+    stake_amount: float,
+    fee: float = 0.001,
+) -> pd.DataFrame:
+    """Ranked grid over all pairs; profits assume ``stake_amount`` per trade"""
+    buy_values = np.asarray(buy_values, dtype=np.float64)
+    sell_values = np.asarray(sell_values, dtype=np.float64)
+    timeframe_min = timeframe_to_minutes(timeframe)
+
+    totals: Dict[str, np.ndarray] = {}
+    for pair, df in analyzed.items():
+        stats = sweep_pair(df, buy_values, sell_values, minimal_roi, stoploss, timeframe_min, fee)
+        for name, value in stats.items():
+            if name == "max_drawdown_ratio":
+                # Pairs run independently here; report the worst single-pair drawdown
+                totals[name] = np.maximum(totals.get(name, 0), value)
+            else:
+                totals[name] = totals.get(name, 0) + value
+
+    buy, sell = np.meshgrid(buy_values.astype(int), sell_values.astype(int), indexing="ij")
+    trades = totals["trades"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        report = pd.DataFrame({
+            "buy_rsi": buy.ravel(),
+            "sell_rsi": sell.ravel(),
+            "trades": trades.ravel(),
+            "wins": totals["wins"].ravel(),
+            "winrate": np.nan_to_num(totals["wins"] / trades).ravel(),
+            "profit_total_abs": (totals["profit_ratio"] * stake_amount).ravel(),
+            "profit_mean_pct": np.nan_to_num(totals["profit_ratio"] / trades * 100).ravel(),
+            "max_drawdown_abs": (totals["max_drawdown_ratio"] * stake_amount).ravel(),
+            "avg_duration_min": np.nan_to_num(totals["duration_candles"] / trades * timeframe_min).ravel(),
+        })
+    return report.sort_values("profit_total_abs", ascending=False, ignore_index=True)
+
+
+if __name__ == "__main__":
+    setup_logging(config={"verbosity": 0})
+
+    user_data_dir = Path(__file__).parent / "user_data"
+    exchange_name = "binance"
+
+    PAIRS = ["BTC/USDT"]
+    TIMERANGE = None  # e.g. "20240101-20240701"
+    FEE = 0.001
+    TOP = 20
+
+    config: Dict[str, Any] = {
+        "timeframe": "5m",
+        "exchange": {"name": exchange_name, "pair_whitelist": PAIRS},
+        "pairs": PAIRS,
+        "user_data_dir": user_data_dir,
+        "datadir": user_data_dir / "data" / exchange_name,
+        "strategy": "SampleStrategy",
+        "strategy_path": str(Path(__file__).parent / "strategies"),
+        "runmode": RunMode.BACKTEST,
+        "stake_currency": "USDT",
+        "stake_amount": 30,
+        "dry_run_wallet": 1000,
+    }
+
+    strategy = StrategyResolver.load_strategy(config)
+    strategy.dp = DataProvider(config, None, None)
+    strategy.ft_bot_start()
+
+    timerange = TimeRange.parse_timerange(TIMERANGE) if TIMERANGE else None
+    partitioned = PartitionedStore(config["datadir"] / "partitioned")
+    if partitioned.exists():
+        data = partitioned.load(PAIRS, config["timeframe"], timerange, strategy.startup_candle_count)
+    else:
+        data = load_data(
+            datadir=config["datadir"],
+            timeframe=config["timeframe"],
+            pairs=PAIRS,
+            timerange=timerange,
+            data_format="json",
+            fill_up_missing=True,
+            startup_candles=strategy.startup_candle_count,
+            candle_type=CandleType.SPOT,
+        )
+    if not data:
+        logging.error(f"{RED}No data found for {PAIRS}{RESET}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    analyzed = {pair: strategy.advise_indicators(df, {"pair": pair}) for pair in data}
+    indicators_s = time.perf_counter() - started
+
+    buy_values = np.arange(strategy.buy_rsi.low, strategy.buy_rsi.high + 1)
+    sell_values = np.arange(strategy.sell_rsi.low, strategy.sell_rsi.high + 1)
+    started = time.perf_counter()
+    report = sweep(
+        analyzed, buy_values, sell_values,
+        strategy.minimal_roi, strategy.stoploss, config["timeframe"], config["stake_amount"], FEE,
+    )
+    sweep_s = time.perf_counter() - started
+
+    print(
+        f"\n{BOLD}RSI sweep: {len(report)} combinations on {len(analyzed)} pairs{RESET} "
+        f"{GREY}(indicators {indicators_s:.2f}s, sweep {sweep_s:.2f}s){RESET}"
+    )
+    print(report.head(TOP).to_string(index=False))
+
+    out = user_data_dir / "backtest_results" / "rsi_sweep.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(out, index=False)
+    print(f"{GREY}Full grid saved to {out}{RESET}")
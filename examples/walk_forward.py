@@ -0,0 +1,287 @@
+"""
+Walk-forward analysis: optimize on a train window, evaluate on the window after it, roll forward.
+
+Windows are independent, so each one runs in its own worker process over
+the shared-memory OHLCV from parallel_backtest.py. Inside a window the
+strategy's indicators are computed once over the whole train+test span
+(the same assumption freqtrade's hyperopt makes: only entry/exit logic
+depends on the parameters), every sampled parameter point is backtested on
+the train range, all of them are scored with one ``batch_loss`` call of the
+hyperopt loss, and the best point is backtested on the test range. The test
+trades of all windows are stitched into one out-of-sample equity curve.
+"""
+
+import logging
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "freqtrade"))
+sys.path.append(str(Path(__file__).parent))
+
+from freqtrade.configuration import TimeRange
+from freqtrade.data.history import load_data
+from freqtrade.enums import CandleType, RunMode
+from freqtrade.exchange import timeframe_to_seconds
+from freqtrade.loggers import setup_logging
+from freqtrade.resolvers import StrategyResolver
+
+from hyperopt_search import TEMPLATES_PATH, sample_point, score_epochs, search_space
+from parallel_backtest import attach_frame, share_frame, slice_frame, summarize
+
+# ANSI color codes
+GREEN = "\033[32m"
+RED = "\033[31m"
+GREY = "\033[90m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+DAY = 86400
+TRADE_COLUMNS = ["pair", "open_date", "close_date", "profit_ratio", "profit_abs", "exit_reason"]
+
+
+def make_windows(
+    start: int, stop: int, train_days: int, test_days: int, step_days: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """Rolling ``{"train", "test"}`` timeranges (epoch seconds) covering [start, stop]"""
+    step_days = step_days or test_days
+    if step_days < test_days:
+        raise ValueError("step_days must be >= test_days, overlapping test windows cannot be stitched")
+
+    windows = []
+    train_start = start
+    while train_start + (train_days + test_days) * DAY <= stop:
+        train_stop = train_start + train_days * DAY
+        test_stop = train_stop + test_days * DAY
+        windows.append({"train": f"{train_start}-{train_stop}", "test": f"{train_stop}-{test_stop}"})
+        train_start += step_days * DAY
+    return windows
+
+
+def run_window(
+    index: int,
+    window: Dict[str, str],
+    shared: Dict[str, Dict[str, Any]],
+    base_config: Dict[str, Any],
+    epochs: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Optimize on the train range and backtest the best point on the test range (worker process)"""
+    from freqtrade.optimize.backtesting import Backtesting
+    from freqtrade.resolvers.hyperopt_resolver import HyperOptLossResolver
+
+    started = time.perf_counter()
+    train = TimeRange.parse_timerange(window["train"])
+    test = TimeRange.parse_timerange(window["test"])
+    span = TimeRange.parse_timerange(f"{train.startts}-{test.stopts}")
+
+    backtesting = Backtesting(base_config)
+    strategy = backtesting.strategylist[0]
+    backtesting._set_strategy(strategy)
+    loss = HyperOptLossResolver.load_hyperoptloss(base_config)
+
+    startup = strategy.startup_candle_count * timeframe_to_seconds(base_config["timeframe"])
+    frames = {pair: slice_frame(attach_frame(pair, meta), span, startup) for pair, meta in shared.items()}
+    indicators = strategy.advise_all_indicators(frames)
+
+    def backtest(params: Dict[str, Any], tr: TimeRange) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        for name, value in params.items():
+            getattr(strategy, name).value = value
+        processed = {pair: slice_frame(df, tr, startup) for pair, df in indicators.items()}
+        backtesting.timerange = tr
+        result = backtesting.backtest(
+            processed=processed,
+            start_date=pd.Timestamp(tr.startts, unit="s", tz="UTC").to_pydatetime(),
+            end_date=pd.Timestamp(tr.stopts, unit="s", tz="UTC").to_pydatetime(),
+        )
+        return result["results"], processed
+
+    space = search_space(strategy)
+    rng = np.random.default_rng(seed)
+    points = {}
+    for _ in range(epochs):
+        point = sample_point(space, rng)
+        points.setdefault(tuple(sorted(point.items())), point)
+
+    params_list, trade_lists, processed = list(points.values()), [], {}
+    for params in params_list:
+        trades, processed = backtest(params, train)
+        trade_lists.append(trades)
+
+    losses = score_epochs(loss, trade_lists, train, base_config, processed) if trade_lists else np.array([])
+    if np.isnan(losses).all():
+        raise ValueError(f"no parameter point could be scored on {window['train']}")
+    best_index = int(np.nanargmin(losses))
+    best, best_loss = params_list[best_index], float(losses[best_index])
+
+    trades, _ = backtest(best, test)
+    Backtesting.cleanup()
+
+    return {
+        "window": index,
+        "train": window["train"],
+        "test": window["test"],
+        "params": best,
+        "train_loss": best_loss,
+        **summarize(trades, base_config["dry_run_wallet"]),
+        "trade_list": trades.loc[:, [c for c in TRADE_COLUMNS if c in trades]],
+        "runtime_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def stitch_equity(trade_lists: List[pd.DataFrame], wallet: float) -> pd.DataFrame:
+    """One out-of-sample equity curve from the test trades of consecutive windows"""
+    trades = pd.concat([t for t in trade_lists if not t.empty], ignore_index=True) if trade_lists else pd.DataFrame()
+    if trades.empty:
+        return pd.DataFrame(columns=["date", "pair", "profit_abs", "equity"])
+    trades = trades.sort_values("close_date", ignore_index=True)
+    return pd.DataFrame({
+        "date": trades["close_date"],
+        "pair": trades["pair"],
+        "profit_abs": trades["profit_abs"],
+        "equity": wallet + trades["profit_abs"].cumsum(),
+    })
+
+
+def walk_forward(
+    base_config: Dict[str, Any],
+    train_days: int,
+    test_days: int,
+    epochs: int,
+    step_days: Optional[int] = None,
+    workers: Optional[int] = None,
+    seed: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Run every window on a process pool; returns (per-window report, stitched OOS equity curve)"""
+    strategy = StrategyResolver.load_strategy(base_config)
+    startup = strategy.startup_candle_count * timeframe_to_seconds(base_config["timeframe"])
+    timerange = TimeRange.parse_timerange(base_config["timerange"]) if base_config.get("timerange") else None
+    data = load_data(
+        datadir=base_config["datadir"],
+        timeframe=base_config["timeframe"],
+        pairs=base_config["pairs"],
+        timerange=timerange,
+        data_format=base_config["dataformat_ohlcv"],
+        fill_up_missing=True,
+        startup_candles=strategy.startup_candle_count,
+        candle_type=CandleType.SPOT,
+    )
+    if not data:
+        raise ValueError(f"No data found for {base_config['pairs']}")
+
+    start = min(int(df["date"].iloc[0].timestamp()) for df in data.values()) + startup
+    stop = max(int(df["date"].iloc[-1].timestamp()) for df in data.values())
+    windows = make_windows(start, stop, train_days, test_days, step_days)
+    if not windows:
+        raise ValueError(f"Not enough data for a {train_days}d train + {test_days}d test window")
+    logging.info(f"{len(windows)} walk-forward windows ({train_days}d train / {test_days}d test)")
+
+    blocks, shared = [], {}
+    for pair, df in data.items():
+        shm, meta = share_frame(df)
+        blocks.append(shm)
+        shared[pair] = meta
+    del data
+
+    rows = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            futures = {
+                pool.submit(run_window, i, window, shared, base_config, epochs, seed): window
+                for i, window in enumerate(windows)
+            }
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    logging.error(f"{RED}Window {window['test']} failed: {e}{RESET}")
+                    continue
+                rows.append(row)
+                logging.info(
+                    f"{GREEN}done{RESET} window {row['window']} {GREY}{_dates(row['test'])}{RESET} "
+                    f"train_loss={row['train_loss']:.4f} oos_profit={row['profit_total_abs']:.2f} "
+                    f"trades={row['trades']} ({row['runtime_s']}s)"
+                )
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    rows.sort(key=lambda row: row["window"])
+    equity = stitch_equity([row.pop("trade_list") for row in rows], base_config["dry_run_wallet"])
+    report = pd.DataFrame(rows)
+    if not report.empty:
+        report["train"] = report["train"].map(_dates)
+        report["test"] = report["test"].map(_dates)
+    return report, equity
+
+
+def _dates(timerange: str) -> str:
+    """'1704067200-1706745600' -> '20240101-20240201'"""
+    return "-".join(
+        pd.Timestamp(int(ts), unit="s", tz="UTC").strftime("%Y%m%d") for ts in timerange.split("-")
+    )
+
+
+if __name__ == "__main__":
+    setup_logging(config={"verbosity": 0})
+
+    user_data_dir = Path(__file__).parent / "user_data"
+    exchange_name = "binance"
+
+    TRAIN_DAYS = 90
+    TEST_DAYS = 30
+    STEP_DAYS = None  # defaults to TEST_DAYS (back-to-back test windows)
+    EPOCHS = 100  # parameter points sampled per train window
+    WORKERS = None  # defaults to the number of CPUs
+    SEED = 0
+
+    base_config: Dict[str, Any] = {
+        "timeframe": "5m",
+        "timerange": None,  # e.g. "20230101-20250101"
+        "pairs": ["BTC/USDT"],
+        "exchange": {"name": exchange_name, "pair_whitelist": ["BTC/USDT"]},
+        "user_data_dir": user_data_dir,
+        "datadir": user_data_dir / "data" / exchange_name,
+        "strategy": "SampleStrategy",
+        "strategy_path": str(Path(__file__).parent / "strategies"),
+        "hyperopt_loss": "SampleHyperOptLoss",
+        "hyperopt_path": str(TEMPLATES_PATH),
+        "dataformat_ohlcv": "json",
+        "dataformat_trades": "json",
+        "runmode": RunMode.BACKTEST,
+        "stake_currency": "USDT",
+        "stake_amount": 30,
+        "dry_run_wallet": 1000,
+        "max_open_trades": 3,
+        "export": "none",
+        "pairlists": [{"method": "StaticPairList"}],
+        "entry_pricing": {"price_side": "same", "use_order_book": True, "order_book_top": 1},
+        "exit_pricing": {"price_side": "same", "use_order_book": True, "order_book_top": 1},
+    }
+
+    started = time.perf_counter()
+    report, equity = walk_forward(base_config, TRAIN_DAYS, TEST_DAYS, EPOCHS, STEP_DAYS, WORKERS, SEED)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{BOLD}Walk-forward: {len(report)} windows in {elapsed:.1f}s{RESET}")
+    if not report.empty:
+        print(report.to_string(index=False))
+        final = equity["equity"].iloc[-1] if not equity.empty else base_config["dry_run_wallet"]
+        print(
+            f"\n{BOLD}Out-of-sample:{RESET} {len(equity)} trades, "
+            f"equity {base_config['dry_run_wallet']} -> {final:.2f}"
+        )
+
+        out_dir = user_data_dir / "backtest_results"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        report.to_csv(out_dir / "walk_forward_report.csv", index=False)
+        equity.to_csv(out_dir / "walk_forward_equity.csv", index=False)
+        print(f"{GREY}Report and equity curve saved to {out_dir}{RESET}")
@@ -0,0 +1,435 @@
+import atexit
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import multiprocessing as mp
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import cloudpickle
+import numpy as np
+import pandas as pd
+
+from freqtrade.freqai.data_kitchen import FreqaiDataKitchen
+from freqtrade.freqai.prediction_models.XGBoostClassifier import XGBoostClassifier
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_CACHE_DIR = "user_data/models/background_cache"
+DEFAULT_CACHE_MAX_MB = 1024
+DEFAULT_CACHE_MAX_AGE_DAYS = 30
+
+
+def _train(
+    model_training_parameters: dict, freqai_info: dict, data_dictionary: dict, init_model: Any, pair: str
+) -> Any:
+    """
+    Run XGBoostClassifier.fit in a pool worker. fit only reads the training parameters,
+    the freqai config and the init model, so small stand-ins replace the live objects.
+    """
+    model = SimpleNamespace(
+        model_training_parameters=model_training_parameters,
+        freqai_info=freqai_info,
+        get_init_model=lambda pair: init_model,
+    )
+    dk = SimpleNamespace(pair=pair, data_dictionary=data_dictionary)
+    return XGBoostClassifier.fit(model, data_dictionary, dk)
+
+
+class ByValue:
+    """
+    A function that pickles by value. Spawned pool workers cannot import this module
+    (the resolver loads it by path), so its functions are sent with cloudpickle and the
+    worker runs the unpickled copy.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def __reduce__(self):
+        return (cloudpickle.loads, (cloudpickle.dumps(self.fn),))
+
+
+def _write_pickle(path: Path, obj: Any):
+    """
+    Write to a temporary file renamed into place, so readers never see a partial pickle.
+    Uses cloudpickle like FreqAI's own model files: this module is loaded by path, so its
+    classes can only be pickled by value.
+    """
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        cloudpickle.dump(obj, f)
+    os.replace(tmp, path)
+
+
+class Generation:
+    """
+    A trained model together with the pipelines and feature/label lists it was
+    trained with. A pair's model is swapped as one generation, so predictions
+    never mix a model with another training's scaling or columns.
+    """
+
+    def __init__(self, model: Any, feature_pipeline: Any, label_pipeline: Any, features: list, labels: list):
+        self.model = model
+        self.feature_pipeline = feature_pipeline
+        self.label_pipeline = label_pipeline
+        self.features = features
+        self.labels = labels
+
+    @classmethod
+    def from_kitchen(cls, model: Any, dk: FreqaiDataKitchen) -> "Generation":
+        return cls(
+            model, dk.feature_pipeline, dk.label_pipeline, list(dk.training_features_list), list(dk.label_list)
+        )
+
+
+class ModelCache:
+    """
+    Trained models on disk, one pickle per key. Reads refresh a file's mtime; after
+    each write the least recently used files are removed until the cache holds at
+    most `max_bytes`, and files unused for `max_age` seconds are removed as well.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: Optional[int] = None, max_age: Optional[float] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self.cache_dir / f"{key}.pkl"
+        try:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+            os.utime(path)
+            return model
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, key: str, model: Any):
+        _write_pickle(self.cache_dir / f"{key}.pkl", model)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries[:-1]:  # never the model just written
+            too_old = self.max_age is not None and now - mtime > self.max_age
+            too_big = self.max_bytes is not None and total > self.max_bytes
+            if not (too_old or too_big):
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class TrainingPool:
+    """
+    Trains models in worker processes, one job per pair at a time.
+
+    Queued jobs are ordered by priority (lower first). A pair resubmitted while
+    queued keeps only its newest data, and one resubmitted while training is
+    queued again when the running job finishes. A finished model replaces the
+    pair's current `Generation` in one dict assignment, so predictions switch
+    between two calls and never see a half-trained model or another model's
+    pipeline. If the job has a ``save_path`` (the model file FreqAI wrote for
+    its train window), the new generation is written there as well.
+    """
+
+    def __init__(self, workers: int, cache: ModelCache):
+        self.workers = workers
+        self.cache = cache
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        self.models: dict[str, Any] = {}
+        self.trained_at: dict[str, float] = {}
+        self.jobs: dict[str, tuple] = {}
+        self.running: set[str] = set()
+        self.queue: list = []
+        self.seq = itertools.count()
+        self.lock = threading.Lock()
+        atexit.register(self.executor.shutdown, wait=False, cancel_futures=True)
+
+    def current(self, pair: str) -> Optional[Any]:
+        return self.models.get(pair)
+
+    def install(self, pair: str, generation: Generation):
+        self.models[pair] = generation
+        self.trained_at[pair] = time.time()
+
+    def submit(self, pair: str, key: str, priority: tuple, job: tuple, generation: Generation,
+               save_path: Optional[Path] = None):
+        """Train ``job`` and install it as ``generation`` (whose model is filled in when done)"""
+        with self.lock:
+            self.jobs[pair] = (key, priority, job, generation, save_path)
+            if pair not in self.running:
+                heapq.heappush(self.queue, (priority, next(self.seq), pair))
+            self._dispatch()
+
+    def _dispatch(self):
+        while len(self.running) < self.workers and self.queue:
+            _, _, pair = heapq.heappop(self.queue)
+            if pair in self.running or pair not in self.jobs:
+                continue  # superseded heap entry
+            key, _, job, generation, save_path = self.jobs.pop(pair)
+            self.running.add(pair)
+            future = self.executor.submit(ByValue(_train), *job, pair)
+            future.add_done_callback(partial(self._done, pair, key, generation, save_path))
+
+    def _done(self, pair: str, key: str, generation: Generation, save_path: Optional[Path], future: Future):
+        try:
+            generation.model = future.result()
+            self.cache.put(key, generation.model)
+            self.install(pair, generation)
+            if save_path is not None and save_path.parent.exists():
+                _write_pickle(save_path, PinnedModel(generation))
+            logger.info(f"Background training finished for {pair}, new model is live")
+        except Exception as e:
+            logger.error(f"Background training failed for {pair}, keeping the previous model: {e}")
+        finally:
+            with self.lock:
+                self.running.discard(pair)
+                if pair in self.jobs:
+                    heapq.heappush(self.queue, (self.jobs[pair][1], next(self.seq), pair))
+                self._dispatch()
+
+
+class PinnedModel:
+    """
+    One fixed `Generation` in the shape of a model: attribute access goes to its
+    model. This is what FreqAI saves to disk, so a model file always carries the
+    pipelines it needs, whichever train window's directory it was written to.
+    """
+
+    def __init__(self, generation: Generation):
+        self.generation = generation
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "generation":  # during unpickling, before __dict__ is restored
+            raise AttributeError(name)
+        return getattr(self.generation.model, name)
+
+
+class SwappableModel:
+    """
+    Stand-in FreqAI keeps as the pair's model: `generation` is the pair's current
+    generation in the pool and every other attribute access goes to its model.
+    Pickles as a `PinnedModel` of the generation current at that moment.
+    """
+
+    def __init__(self, pool: TrainingPool, pair: str):
+        self._pool = pool
+        self._pair = pair
+
+    @property
+    def generation(self) -> Generation:
+        return self._pool.current(self._pair)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.generation.model, name)
+
+    def __reduce__(self):
+        return (PinnedModel, (self.generation,))
+
+
+_pool: Optional[TrainingPool] = None
+
+
+class BackgroundXGBoostClassifier(XGBoostClassifier):
+    """
+    XGBoostClassifier that retrains in a process pool instead of the bot loop.
+
+    In dry/live runs a due retrain is queued and `fit` returns at once; the pair
+    keeps predicting with its previous model until the new one is ready and
+    swapped in. Pairs with open trades are trained first, then the pairs whose
+    model is oldest. Only the very first model of a pair (nothing to predict with
+    yet) is trained inline. Trained models are cached on disk by pair, feature
+    and label lists, feature and model parameters and the train window, so a
+    restart or a retrain over unchanged data loads the model instead of
+    training it. Backtests train inline but still use the cache. With
+    continual learning, a background fit starts from the pair's current model.
+
+    A model, its feature/label pipelines and its feature list are swapped
+    together as one `Generation`; `predict` uses the pipelines of the
+    generation it predicts with, not the ones FreqAI fitted for the queued
+    training. Until the swap, the model file FreqAI saves for the new train
+    window holds the previous generation; it is rewritten once the new model is
+    trained.
+
+    Configure in the freqai section:
+
+    "background_training": {
+        "workers": 2,
+        "cache_dir": "user_data/models/background_cache",
+        "cache_max_mb": 1024,
+        "cache_max_age_days": 30
+    }
+
+    freqtrade trade --strategy FreqaiExampleHybridStrategy --freqaimodel BackgroundXGBoostClassifier
+    --freqaimodel-path fretrade_templates
+    """
+
+    def fit(self, data_dictionary: dict, dk: FreqaiDataKitchen, **kwargs) -> Any:
+        settings = self.freqai_info.get("background_training", {})
+        cache = ModelCache(
+            Path(settings.get("cache_dir", DEFAULT_CACHE_DIR)),
+            max_bytes=int(settings.get("cache_max_mb", DEFAULT_CACHE_MAX_MB) * 1024**2),
+            max_age=settings.get("cache_max_age_days", DEFAULT_CACHE_MAX_AGE_DAYS) * 86400,
+        )
+        key = self.cache_key(data_dictionary, dk)
+
+        cached = cache.get(key)
+        if not self.live:
+            if cached is None:
+                cached = super().fit(data_dictionary, dk, **kwargs)
+                cache.put(key, cached)
+            return cached
+
+        pool = self.training_pool(settings, cache)
+        if cached is not None:
+            logger.info(f"Loaded cached model for {dk.pair}")
+            pool.install(dk.pair, Generation.from_kitchen(cached, dk))
+            return SwappableModel(pool, dk.pair)
+
+        if pool.current(dk.pair) is None:
+            previous = self.previous_generation(dk.pair)
+            if previous is None:
+                logger.info(f"No model for {dk.pair} yet, training inline")
+                model = super().fit(data_dictionary, dk, **kwargs)
+                cache.put(key, model)
+                pool.install(dk.pair, Generation.from_kitchen(model, dk))
+                return SwappableModel(pool, dk.pair)
+            pool.install(dk.pair, previous)
+
+        pool.submit(
+            dk.pair,
+            key,
+            self.training_priority(dk.pair, pool),
+            (self.model_training_parameters, self.freqai_info, data_dictionary, self.init_model(dk.pair)),
+            Generation.from_kitchen(None, dk),
+            Path(dk.data_path) / f"{dk.model_filename}_model.joblib",
+        )
+        logger.info(f"Queued background training for {dk.pair}, predicting with the previous model")
+        return SwappableModel(pool, dk.pair)
+
+    def predict(self, unfiltered_df: pd.DataFrame, dk: FreqaiDataKitchen, **kwargs) -> tuple:
+        """
+        Predict with one generation read once: its model, pipelines and feature
+        lists, even if a newer generation is installed meanwhile
+        """
+        generation = getattr(self.model, "generation", None)
+        if generation is None:
+            return super().predict(unfiltered_df, dk, **kwargs)
+
+        live = self.model
+        self.model = generation.model
+        dk.feature_pipeline = generation.feature_pipeline
+        dk.label_pipeline = generation.label_pipeline
+        dk.training_features_list = generation.features
+        dk.label_list = generation.labels
+        try:
+            return super().predict(unfiltered_df, dk, **kwargs)
+        finally:
+            self.model = live
+
+    def init_model(self, pair: str) -> Any:
+        """
+        The model continual learning starts the background fit from (None when disabled):
+        the bare model of the pair's current generation, not the stand-in around it
+        """
+        model = self.get_init_model(pair)
+        generation = getattr(model, "generation", None)
+        return generation.model if generation is not None else model
+
+    def previous_generation(self, pair: str) -> Optional[Generation]:
+        """
+        The generation FreqAI loaded for ``pair`` (from disk or the last fit),
+        taken before this fit's pipelines replace it
+        """
+        dd = getattr(self, "dd", None)
+        model = getattr(dd, "model_dictionary", {}).get(pair)
+        if model is None:
+            return None
+        # Checked by attribute: a PinnedModel loaded from disk has a by-value copy of the class
+        generation = getattr(model, "generation", None)
+        if generation is not None:
+            return generation
+        pipelines = dd.pipeline_dictionary.get(pair, {})
+        meta = dd.meta_data_dictionary.get(pair, {}).get("meta_data", {})
+        return Generation(
+            model,
+            pipelines.get("feature_pipeline"),
+            pipelines.get("label_pipeline"),
+            list(meta.get("training_features_list", [])),
+            list(meta.get("label_list", [])),
+        )
+
+    @staticmethod
+    def training_pool(settings: dict, cache: ModelCache) -> TrainingPool:
+        global _pool
+        if _pool is None:
+            _pool = TrainingPool(settings.get("workers", DEFAULT_WORKERS), cache)
+        return _pool
+
+    def training_priority(self, pair: str, pool: TrainingPool) -> tuple:
+        """
+        Lower sorts first: pairs with an open trade, then the oldest model
+        """
+        try:
+            from freqtrade.persistence import Trade
+
+            in_trade = any(t.pair == pair for t in Trade.get_trades_proxy(is_open=True))
+        except Exception:
+            in_trade = False
+        return (0 if in_trade else 1, pool.trained_at.get(pair, 0.0))
+
+    def cache_key(self, data_dictionary: dict, dk: FreqaiDataKitchen) -> str:
+        """
+        Digest of everything that determines the trained model
+        """
+        h = hashlib.blake2b(digest_size=20)
+        h.update(
+            json.dumps(
+                {
+                    "pair": dk.pair,
+                    "features": list(dk.training_features_list),
+                    "labels": list(dk.label_list),
+                    "feature_parameters": self.freqai_info.get("feature_parameters", {}),
+                    "data_split_parameters": self.freqai_info.get("data_split_parameters", {}),
+                    "model_training_parameters": self.model_training_parameters,
+                },
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        dates = data_dictionary.get("train_dates")
+        if dates is not None and len(dates):
+            h.update(f"{dates.iloc[0]}-{dates.iloc[-1]}".encode())
+        for name in ("train_features", "train_labels", "train_weights"):
+            values = data_dictionary.get(name)
+            if isinstance(values, (pd.DataFrame, pd.Series)):
+                h.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+            elif values is not None:
+                h.update(np.ascontiguousarray(values).tobytes())
+        return h.hexdigest()
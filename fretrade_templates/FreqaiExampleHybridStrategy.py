@@ -21,6 +21,10 @@ class FreqaiExampleHybridStrategy(IStrategy):
     freqtrade trade --strategy FreqaiExampleHybridStrategy --strategy-path freqtrade/templates
     --freqaimodel XGBoostClassifier --config config_examples/config_freqai.example.json
 
+    To retrain in a background process pool instead of the bot loop, use
+    `--freqaimodel BackgroundXGBoostClassifier --freqaimodel-path fretrade_templates`
+    (see BackgroundXGBoostClassifier.py for its "background_training" settings).
+
     or the user simply adds this to their config:
 
     "freqai": {
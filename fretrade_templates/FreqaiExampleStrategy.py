@@ -1,6 +1,11 @@
 import logging
+import math
+from collections import OrderedDict, deque
 from functools import reduce
+from typing import Callable
 
+import numpy as np
+import pandas as pd
 import talib.abstract as ta
 from pandas import DataFrame
 from technical import qtpylib
@@ -10,6 +15,324 @@ from freqtrade.strategy import IStrategy
 
 logger = logging.getLogger(__name__)
 
+# Bytes of float32 feature blocks kept per process, see FeatureCache
+FEATURE_CACHE_BYTES = 512 * 1024**2
+# Candles (in multiples of the period) replayed to bring recursive indicators to their steady state
+WARMUP_PERIODS = 50
+# Longer appends recompute the block with TA-Lib, which beats per-candle updates in Python there
+INCREMENTAL_MAX_ROWS = 256
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+
+class Rolling:
+    """
+    Last `size` values with their running sum and, optionally, sum of squares.
+
+    Sums are kept relative to a reference value (the window mean at the last
+    resum) so the variance does not cancel out at price-sized magnitudes, and
+    are recomputed from the window every `size` pushes so rounding cannot drift.
+    A window of one repeated value (a stretch of filled-up candles) has exactly
+    that value as its mean, like pandas' rolling mean, and a variance of 0.
+    """
+
+    def __init__(self, size: int, squares: bool = False):
+        self.values = deque(maxlen=size)
+        self.squares = squares
+        self.ref = self.sum = self.sum_sq = 0.0
+        self.since = 0
+        self.same = 0  # trailing run of equal values
+
+    def push(self, x: float) -> bool:
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0] - self.ref
+            self.sum -= old
+            if self.squares:
+                self.sum_sq -= old * old
+        self.same = self.same + 1 if self.values and self.values[-1] == x else 1
+        self.values.append(x)
+        d = x - self.ref
+        self.sum += d
+        if self.squares:
+            self.sum_sq += d * d
+
+        self.since += 1
+        if self.since >= self.values.maxlen:
+            self.resum()
+        return len(self.values) == self.values.maxlen
+
+    def resum(self):
+        self.ref = sum(self.values) / len(self.values)
+        deltas = [x - self.ref for x in self.values]
+        self.sum = sum(deltas)
+        self.sum_sq = sum(d * d for d in deltas) if self.squares else 0.0
+        self.since = 0
+
+    def total(self) -> float:
+        return self.sum + self.ref * len(self.values)
+
+    def mean(self) -> float:
+        if self.same >= len(self.values):
+            return self.values[-1]
+        return self.ref + self.sum / len(self.values)
+
+    def var(self) -> float:
+        """Sample variance (ddof=1)"""
+        n = len(self.values)
+        if self.same >= n:
+            return 0.0
+        return max(self.sum_sq - self.sum * self.sum / n, 0.0) / (n - 1)
+
+
+def divide(a: float, b: float) -> float:
+    """`a / b` with pandas' float semantics: x / 0 is a signed inf and 0 / 0 is NaN"""
+    if b:
+        return a / b
+    if a == 0 or math.isnan(a):
+        return np.nan
+    return math.copysign(np.inf, a) * math.copysign(1.0, b)
+
+
+class EMA:
+    """TA-Lib EMA: seeded with the SMA of the first `period` values"""
+
+    def __init__(self, period: int):
+        self.period, self.k = period, 2.0 / (period + 1)
+        self.seed, self.value = [], np.nan
+
+    def update(self, x: float) -> float:
+        if len(self.seed) < self.period:
+            self.seed.append(x)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+            return self.value
+        self.value += (x - self.value) * self.k
+        return self.value
+
+
+class RSI:
+    """TA-Lib RSI (Wilder smoothing)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prev, self.n, self.gain, self.loss = None, 0, 0.0, 0.0
+
+    def update(self, close: float) -> float:
+        if self.prev is None:
+            self.prev = close
+            return np.nan
+        change, self.prev = close - self.prev, close
+        up, down = max(change, 0.0), max(-change, 0.0)
+        p = self.period
+        self.n += 1
+        if self.n <= p:
+            self.gain, self.loss = self.gain + up / p, self.loss + down / p
+            if self.n < p:
+                return np.nan
+        else:
+            self.gain = (self.gain * (p - 1) + up) / p
+            self.loss = (self.loss * (p - 1) + down) / p
+        total = self.gain + self.loss
+        return 100.0 * self.gain / total if total else 0.0
+
+
+class MFI:
+    """TA-Lib MFI over the last `period` money flows"""
+
+    def __init__(self, period: int):
+        self.positive, self.negative = Rolling(period), Rolling(period)
+        self.prev = None
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        tp = (high + low + close) / 3
+        if self.prev is None:
+            self.prev = tp
+            return np.nan
+        flow = tp * volume
+        self.positive.push(flow if tp > self.prev else 0.0)
+        full = self.negative.push(flow if tp < self.prev else 0.0)
+        self.prev = tp
+        if not full:
+            return np.nan
+        # Flows are never negative, running sums can be by a rounding residual
+        pos = max(self.positive.total(), 0.0)
+        total = pos + max(self.negative.total(), 0.0)
+        return 0.0 if total < 1.0 else 100.0 * pos / total
+
+
+class ADX:
+    """TA-Lib ADX: Wilder-smoothed true range and directional movement"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prev = None
+        self.n = 0
+        self.tr = self.plus_dm = self.minus_dm = 0.0
+        self.dx_sum, self.value = 0.0, np.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev is None:
+            self.prev = (high, low, close)
+            return np.nan
+        prev_high, prev_low, prev_close = self.prev
+        self.prev = (high, low, close)
+        diff_p, diff_m = high - prev_high, prev_low - low
+        plus = diff_p if diff_p > 0 and diff_p > diff_m else 0.0
+        minus = diff_m if diff_m > 0 and diff_p < diff_m else 0.0
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        p = self.period
+        self.n += 1
+        if self.n < p:
+            self.tr, self.plus_dm, self.minus_dm = self.tr + tr, self.plus_dm + plus, self.minus_dm + minus
+            return np.nan
+        self.tr += tr - self.tr / p
+        self.plus_dm += plus - self.plus_dm / p
+        self.minus_dm += minus - self.minus_dm / p
+
+        dx = None
+        if self.tr:
+            plus_di, minus_di = 100.0 * self.plus_dm / self.tr, 100.0 * self.minus_dm / self.tr
+            if plus_di + minus_di:
+                dx = 100.0 * abs(minus_di - plus_di) / (plus_di + minus_di)
+        if self.n < 2 * p:
+            self.dx_sum += dx or 0.0
+            if self.n == 2 * p - 1:
+                self.value = self.dx_sum / p
+            return self.value
+        if dx is not None:
+            self.value = (self.value * (p - 1) + dx) / p
+        return self.value
+
+
+class PeriodFeatures:
+    """
+    Per-candle versions of `FreqaiExampleStrategy.period_features`: `update` takes one
+    candle and returns its feature row in the same column order, in O(1) amortized.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.rsi, self.mfi, self.adx, self.ema = RSI(period), MFI(period), ADX(period), EMA(period)
+        self.closes = Rolling(period + 1)
+        self.typical = Rolling(period, squares=True)
+        self.volumes = Rolling(period)
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> list:
+        p = self.period
+        rsi = self.rsi.update(close)
+        mfi = self.mfi.update(high, low, close, volume)
+        adx = self.adx.update(high, low, close)
+        ema = self.ema.update(close)
+
+        sma = roc = bb_width = close_bb_lower = relative_volume = np.nan
+        if self.closes.push(close):
+            base = self.closes.values[0]
+            roc = (close / base - 1) * 100 if base else 0.0
+        if len(self.closes.values) > p:
+            sma = (self.closes.total() - self.closes.values[0]) / p
+        elif len(self.closes.values) == p:
+            sma = self.closes.total() / p
+        if self.typical.push((high + low + close) / 3):
+            mid = self.typical.mean()
+            std = self.typical.var() ** 0.5
+            bb_width = divide(4 * std, mid)
+            close_bb_lower = divide(close, mid - 2 * std)
+        if self.volumes.push(volume):
+            relative_volume = divide(volume, self.volumes.mean())
+
+        return [rsi, mfi, adx, sma, ema, bb_width, close_bb_lower, roc, relative_volume]
+
+
+class FeatureSeries:
+    """
+    Feature block of one (pair, timeframe, period) plus the candles it was computed
+    from and the incremental indicator state after its last candle.
+    """
+
+    def __init__(self, columns: list, dates: np.ndarray, ohlcv: np.ndarray, block: np.ndarray, period: int):
+        self.columns, self.dates, self.ohlcv, self.block = columns, dates, ohlcv, block
+        self.state = PeriodFeatures(period)
+        for row in ohlcv[-WARMUP_PERIODS * period:].tolist():
+            self.state.update(*row)
+
+    def extend(self, dates: np.ndarray, ohlcv: np.ndarray) -> bool:
+        """
+        Move to the window `dates`: drop candles that left it and compute only the new ones.
+        Returns False when the window is not a continuation of the stored candles, or
+        when more than INCREMENTAL_MAX_ROWS candles are new and a TA-Lib rebuild is cheaper.
+        """
+        start = int(np.searchsorted(self.dates, dates[0]))
+        overlap = len(self.dates) - start
+        if (
+            start == len(self.dates)
+            or self.dates[start] != dates[0]
+            or len(dates) < overlap
+            or not np.array_equal(self.dates[start:], dates[:overlap])
+            or not np.array_equal(self.ohlcv[start:], ohlcv[:overlap])
+            or len(dates) - overlap > INCREMENTAL_MAX_ROWS
+        ):
+            return False
+
+        new_rows = [self.state.update(*row) for row in ohlcv[overlap:].tolist()]
+        if new_rows:
+            self.block = np.concatenate((self.block[start:], np.asarray(new_rows, dtype=np.float32)))
+        else:
+            self.block = self.block[start:]
+        self.dates, self.ohlcv = dates, ohlcv
+        return True
+
+
+class FeatureCache:
+    """
+    LRU of float32 feature blocks keyed by (pair, timeframe, period).
+
+    FreqAI calls `feature_engineering_expand_all` once per
+    `indicator_periods_candles` x `include_timeframes` x corr pair for every pair
+    it trains or predicts, each time over the full lookback. When the candles
+    are the same as last time (a corr pair shared by many traded pairs) the
+    stored block is reused as is; when the window only moved forward (live, one
+    new candle) the new rows are computed incrementally from the stored
+    indicator state and appended, so the indicator work per candle no longer
+    depends on the lookback length. Anything else recomputes the block. A block
+    is one contiguous (rows x features) float32 matrix.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.series: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, dataframe: DataFrame, period: int, build: Callable[[], dict]) -> tuple[list, np.ndarray]:
+        dates = dataframe["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        ohlcv = dataframe[OHLCV].to_numpy(dtype=np.float64)
+
+        series = self.series.get(key)
+        if series is not None and series.extend(dates, ohlcv):
+            self.series.move_to_end(key)
+            self.hits += 1
+            return series.columns, series.block
+
+        self.misses += 1
+        features = build()
+        columns = list(features)
+        block = np.empty((len(dataframe), len(columns)), dtype=np.float32)
+        for i, values in enumerate(features.values()):
+            block[:, i] = values
+
+        self.series[key] = FeatureSeries(columns, dates, ohlcv, block, period)
+        self.series.move_to_end(key)
+        while self._nbytes() > self.max_bytes and len(self.series) > 1:
+            self.series.popitem(last=False)
+        return columns, block
+
+    def _nbytes(self) -> int:
+        return sum(s.block.nbytes + s.ohlcv.nbytes + s.dates.nbytes for s in self.series.values())
+
+
+_feature_cache = FeatureCache(FEATURE_CACHE_BYTES)
+
 
 class FreqaiExampleStrategy(IStrategy):
     """
@@ -75,31 +398,37 @@ class FreqaiExampleStrategy(IStrategy):
         dataframe["%-ema-period"] = ta.EMA(dataframe, timeperiod=period)
         """
 
-        dataframe["%-rsi-period"] = ta.Function('RSI')(dataframe, timeperiod=period)
-        dataframe["%-mfi-period"] = ta.Function('MFI')(dataframe, timeperiod=period)
-        dataframe["%-adx-period"] = ta.Function('ADX')(dataframe, timeperiod=period)
-        dataframe["%-sma-period"] = ta.Function('SMA')(dataframe, timeperiod=period)
-        dataframe["%-ema-period"] = ta.Function('EMA')(dataframe, timeperiod=period)
+        key = (metadata.get("pair"), metadata.get("tf"), period)
+        columns, block = _feature_cache.get(
+            key, dataframe, period, lambda: self.period_features(dataframe, period)
+        )
+        features = DataFrame(block, columns=columns, index=dataframe.index, copy=True)
+        return pd.concat([dataframe, features], axis=1)
 
+    @staticmethod
+    def period_features(dataframe: DataFrame, period: int) -> dict:
+        """
+        The `%-...-period` features of one period, computed in float64 and stored as float32
+        by the cache. The Bollinger bands are only intermediates of the two band features.
+        """
         bollinger = qtpylib.bollinger_bands(
             qtpylib.typical_price(dataframe), window=period, stds=2
         )
-        dataframe["bb_lowerband-period"] = bollinger["lower"]
-        dataframe["bb_middleband-period"] = bollinger["mid"]
-        dataframe["bb_upperband-period"] = bollinger["upper"]
-
-        dataframe["%-bb_width-period"] = (
-            dataframe["bb_upperband-period"] - dataframe["bb_lowerband-period"]
-        ) / dataframe["bb_middleband-period"]
-        dataframe["%-close-bb_lower-period"] = dataframe["close"] / dataframe["bb_lowerband-period"]
-
-        dataframe["%-roc-period"] = ta.Function('ROC')(dataframe, timeperiod=period)
-
-        dataframe["%-relative_volume-period"] = (
-            dataframe["volume"] / dataframe["volume"].rolling(period).mean()
-        )
-
-        return dataframe
+        lower, mid, upper = bollinger["lower"], bollinger["mid"], bollinger["upper"]
+
+        return {
+            "%-rsi-period": ta.Function('RSI')(dataframe, timeperiod=period),
+            "%-mfi-period": ta.Function('MFI')(dataframe, timeperiod=period),
+            "%-adx-period": ta.Function('ADX')(dataframe, timeperiod=period),
+            "%-sma-period": ta.Function('SMA')(dataframe, timeperiod=period),
+            "%-ema-period": ta.Function('EMA')(dataframe, timeperiod=period),
+            "%-bb_width-period": (upper - lower) / mid,
+            "%-close-bb_lower-period": dataframe["close"] / lower,
+            "%-roc-period": ta.Function('ROC')(dataframe, timeperiod=period),
+            "%-relative_volume-period": (
+                dataframe["volume"] / dataframe["volume"].rolling(period).mean()
+            ),
+        }
 
     def feature_engineering_expand_basic(
         self, dataframe: DataFrame, metadata: dict, **kwargs
@@ -134,9 +463,9 @@ class FreqaiExampleStrategy(IStrategy):
         dataframe["%-pct-change"] = dataframe["close"].pct_change()
         dataframe["%-ema-200"] = ta.EMA(dataframe, timeperiod=200)
         """
-        dataframe["%-pct-change"] = dataframe["close"].pct_change()
-        dataframe["%-raw_volume"] = dataframe["volume"]
-        dataframe["%-raw_price"] = dataframe["close"]
+        dataframe["%-pct-change"] = dataframe["close"].pct_change().astype(np.float32)
+        dataframe["%-raw_volume"] = dataframe["volume"].astype(np.float32)
+        dataframe["%-raw_price"] = dataframe["close"].astype(np.float32)
         return dataframe
 
     def feature_engineering_standard(
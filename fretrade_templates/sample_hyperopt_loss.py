@@ -1,6 +1,8 @@
+from abc import abstractmethod
 from datetime import datetime
-from math import exp
+from typing import Optional
 
+import numpy as np
 from pandas import DataFrame
 
 from freqtrade.constants import Config
@@ -24,17 +26,78 @@ EXPECTED_MAX_PROFIT = 3.0
 MAX_ACCEPTED_TRADE_DURATION = 300
 
 
-class SampleHyperOptLoss(IHyperOptLoss):
+def segment_sum(values: np.ndarray, epoch_ids: np.ndarray, n_epochs: int) -> np.ndarray:
+    """Per-epoch sum of ``values`` (epochs without trades sum to 0)"""
+    return np.bincount(epoch_ids, weights=values, minlength=n_epochs)
+
+
+def segment_mean(values: np.ndarray, epoch_ids: np.ndarray, n_epochs: int) -> np.ndarray:
+    """Per-epoch mean of ``values`` (NaN for epochs without trades, like ``Series.mean``)"""
+    counts = np.bincount(epoch_ids, minlength=n_epochs)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return segment_sum(values, epoch_ids, n_epochs) / counts
+
+
+def stack_results(
+    results: list[DataFrame], names: Optional[tuple[str, ...]] = None
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
     """
-    Defines the default loss function for hyperopt
-    This is intended to give you some inspiration for your own loss function.
+    Concatenate per-epoch result frames into epoch ids plus one array per column.
+    Only the columns in ``names`` are stacked, all of them when it is None.
+    """
+    epoch_ids = np.repeat(np.arange(len(results)), [len(r) for r in results])
+    if names is None:
+        names = tuple(results[0].columns) if results else ()
+    columns = {}
+    for name in names:
+        columns[name] = np.concatenate([r[name].to_numpy() for r in results])
+    return epoch_ids, columns
 
-    The Function needs to return a number (float) - which becomes smaller for better backtest
-    results.
+
+def has_batch_loss(loss: type[IHyperOptLoss]) -> bool:
+    """
+    Whether ``loss`` implements ``hyperopt_loss_batch``.
+    Checked by the abstract marker rather than against BatchHyperOptLoss: the
+    resolver loads loss files as fresh modules, so their BatchHyperOptLoss is
+    not necessarily the one imported here.
     """
+    method = getattr(loss, "hyperopt_loss_batch", None)
+    return callable(method) and not getattr(method, "__isabstractmethod__", False)
+
+
+class BatchHyperOptLoss(IHyperOptLoss):
+    """
+    Loss interface that scores many epochs in one call.
+
+    ``hyperopt_loss_batch`` receives the trades of all epochs as columns
+    (``profit_ratio``, ``trade_duration``, ...) plus an ``epoch_ids`` array
+    saying which epoch each trade belongs to, and returns one loss per epoch.
+    Implementations use segmented reductions (``segment_sum``/``segment_mean``)
+    instead of a pandas frame per epoch. ``hyperopt_loss_function`` is
+    provided on top of it, so subclasses still work with the regular
+    per-epoch hyperopt.
+
+    ``batch_columns`` names the result columns the loss reads; only those are
+    stacked. None stacks every column.
+    """
+
+    batch_columns: Optional[tuple[str, ...]] = None
 
     @staticmethod
+    @abstractmethod
+    def hyperopt_loss_batch(
+        epoch_ids: np.ndarray,
+        columns: dict[str, np.ndarray],
+        n_epochs: int,
+        min_date: datetime,
+        max_date: datetime,
+        config: Config,
+    ) -> np.ndarray:
+        """One loss per epoch, smaller is better"""
+
+    @classmethod
     def hyperopt_loss_function(
+        cls,
         results: DataFrame,
         trade_count: int,
         min_date: datetime,
@@ -44,14 +107,72 @@ class SampleHyperOptLoss(IHyperOptLoss):
         *args,
         **kwargs,
     ) -> float:
+        epoch_ids, columns = stack_results([results], cls.batch_columns)
+        return float(cls.hyperopt_loss_batch(epoch_ids, columns, 1, min_date, max_date, config)[0])
+
+
+def batch_loss(
+    loss: type[IHyperOptLoss],
+    results: list[DataFrame],
+    min_date: datetime,
+    max_date: datetime,
+    config: Config,
+    processed: dict[str, DataFrame],
+) -> np.ndarray:
+    """
+    Loss of every epoch in ``results``.
+    Batch losses score all epochs at once; any other ``IHyperOptLoss`` is
+    called once per epoch, so existing loss functions keep working.
+    """
+    if has_batch_loss(loss):
+        epoch_ids, columns = stack_results(results, getattr(loss, "batch_columns", None))
+        return loss.hyperopt_loss_batch(epoch_ids, columns, len(results), min_date, max_date, config)
+
+    return np.array(
+        [
+            loss.hyperopt_loss_function(
+                results=r,
+                trade_count=len(r),
+                min_date=min_date,
+                max_date=max_date,
+                config=config,
+                processed=processed,
+            )
+            for r in results
+        ],
+        dtype=np.float64,
+    )
+
+
+class SampleHyperOptLoss(BatchHyperOptLoss):
+    """
+    Defines the default loss function for hyperopt
+    This is intended to give you some inspiration for your own loss function.
+
+    The Function needs to return a number (float) - which becomes smaller for better backtest
+    results.
+    """
+
+    batch_columns = ("profit_ratio", "trade_duration")
+
+    @staticmethod
+    def hyperopt_loss_batch(
+        epoch_ids: np.ndarray,
+        columns: dict[str, np.ndarray],
+        n_epochs: int,
+        min_date: datetime,
+        max_date: datetime,
+        config: Config,
+    ) -> np.ndarray:
         """
-        Objective function, returns smaller number for better results
+        Objective function for a batch of epochs, returns smaller numbers for better results
         """
-        total_profit = results["profit_ratio"].sum()
-        trade_duration = results["trade_duration"].mean()
+        trade_count = np.bincount(epoch_ids, minlength=n_epochs)
+        total_profit = segment_sum(columns["profit_ratio"], epoch_ids, n_epochs)
+        trade_duration = segment_mean(columns["trade_duration"], epoch_ids, n_epochs)
 
-        trade_loss = 1 - 0.25 * exp(-((trade_count - TARGET_TRADES) ** 2) / 10**5.8)
-        profit_loss = max(0, 1 - total_profit / EXPECTED_MAX_PROFIT)
-        duration_loss = 0.4 * min(trade_duration / MAX_ACCEPTED_TRADE_DURATION, 1)
+        trade_loss = 1 - 0.25 * np.exp(-((trade_count - TARGET_TRADES) ** 2) / 10**5.8)
+        profit_loss = np.maximum(0, 1 - total_profit / EXPECTED_MAX_PROFIT)
+        duration_loss = 0.4 * np.minimum(trade_duration / MAX_ACCEPTED_TRADE_DURATION, 1)
         result = trade_loss + profit_loss + duration_loss
         return result
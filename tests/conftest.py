@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+sys.path.append(str(ROOT / "archives" / "v4"))
+sys.path.append(str(ROOT / "examples"))
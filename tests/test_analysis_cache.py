@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis_cache import AnalysisCache
+
+
+class Provider:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_pair_dataframe(self, pair, timeframe, candle_type=""):
+        return self.frames[(pair, timeframe)]
+
+
+class Strategy:
+    timeframe = "5m"
+
+    def __init__(self, dp=None, pairs=(), config=None):
+        self.dp = dp
+        self.pairs = list(pairs)
+        self.config = config or {}
+        self.calls = 0
+
+    def informative_pairs(self):
+        return self.pairs
+
+    def analyze_ticker(self, df, metadata):
+        self.calls += 1
+        return df.assign(signal=df["close"] > df["open"])
+
+
+def ohlcv(n, seed):
+    rng = np.random.default_rng(seed)
+    values = rng.random((n, 5))
+    df = pd.DataFrame(values, columns=["open", "high", "low", "close", "volume"])
+    df.insert(0, "date", pd.date_range("2024-01-01", periods=n, freq="5min", tz="UTC"))
+    return df
+
+
+def test_informative_candles_are_part_of_the_key(tmp_path):
+    cache = AnalysisCache(tmp_path)
+    df = ohlcv(50, 0)
+    frames = {("ETH/USDT", "1h"): ohlcv(10, 1)}
+    strategy = Strategy(Provider(frames), [("ETH/USDT", "1h")])
+
+    cache.analyze(strategy, df, {"pair": "BTC/USDT"})
+    cache.analyze(strategy, df, {"pair": "BTC/USDT"})
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    frames[("ETH/USDT", "1h")] = ohlcv(10, 2)
+    cache.analyze(strategy, df, {"pair": "BTC/USDT"})
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_unkeyable_strategies_bypass_the_cache(tmp_path):
+    cache = AnalysisCache(tmp_path)
+    df = ohlcv(50, 0)
+
+    cache.analyze(Strategy(None, [("ETH/USDT", "1h")]), df, {"pair": "BTC/USDT"})
+    cache.analyze(Strategy(config={"freqai": {"enabled": True}}), df, {"pair": "BTC/USDT"})
+    assert (cache.hits, cache.misses, cache.bypassed) == (0, 0, 2)
+    assert not list(tmp_path.glob("*.feather"))
+
+
+def test_concurrent_puts_of_one_key(tmp_path):
+    cache = AnalysisCache(tmp_path)
+    df = ohlcv(2000, 0)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: cache.put("same", df), range(32)))
+
+    pd.testing.assert_frame_equal(cache.get("same"), df)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_config_keys_are_part_of_the_key(tmp_path):
+    df = ohlcv(50, 0)
+    usdt, btc = Strategy(config={"stake_currency": "USDT"}), Strategy(config={"stake_currency": "BTC"})
+    cache = AnalysisCache(tmp_path)
+    assert cache.key(usdt, df, {}) != cache.key(btc, df, {})
+    assert cache.key(usdt, df, {}) == cache.key(Strategy(config={"stake_currency": "USDT", "dry_run": True}), df, {})
+
+    custom = AnalysisCache(tmp_path, config_keys=["stake_currency", "rsi_period"])
+    assert custom.key(usdt, df, {}) != custom.key(Strategy(config={"stake_currency": "USDT", "rsi_period": 9}), df, {})
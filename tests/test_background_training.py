@@ -0,0 +1,63 @@
+import importlib.util
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+pytest.importorskip("freqtrade.freqai.prediction_models.XGBoostClassifier")
+
+MODEL_PATH = Path(__file__).parent.parent / "fretrade_templates" / "BackgroundXGBoostClassifier.py"
+
+
+def load_model_module():
+    # How freqtrade's resolver loads models: by path, not registered in sys.modules
+    spec = importlib.util.spec_from_file_location(MODEL_PATH.stem, str(MODEL_PATH))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def training_data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    features = pd.DataFrame(rng.standard_normal((n, 3)), columns=["%-a", "%-b", "%-c"])
+    labels = pd.DataFrame({"&s-up_or_down": np.where(features["%-a"] > 0, "up", "down")})
+    return {"train_features": features, "train_labels": labels, "train_weights": np.ones(n)}
+
+
+def wait_for(pool, pair, model, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with pool.lock:
+            idle = pair not in pool.running and pair not in pool.jobs
+        generation = pool.current(pair)
+        if idle:
+            assert generation is not None and generation.model is not model, "background training failed"
+            return generation
+        time.sleep(0.05)
+    pytest.fail(f"no model for {pair} within {timeout}s")
+
+
+def test_background_training_round_trip(tmp_path):
+    module = load_model_module()
+    pool = module.TrainingPool(1, module.ModelCache(tmp_path))
+    params = {"n_estimators": 5, "max_depth": 2}
+    freqai_info = {"data_split_parameters": {"test_size": 0}}
+    data = training_data()
+    try:
+        pool.submit("BTC/USDT", "first", (1, 0.0), (params, freqai_info, data, None),
+                    module.Generation(None, None, None, list(data["train_features"]), ["&s-up_or_down"]))
+        first = wait_for(pool, "BTC/USDT", None).model
+        assert first.get_booster().num_boosted_rounds() == 5
+        assert first.predict(data["train_features"].to_numpy()).shape == (200,)
+        assert (tmp_path / "first.pkl").exists()
+
+        # Continual learning: the next fit starts from the current model
+        pool.submit("BTC/USDT", "second", (1, 0.0), (params, freqai_info, training_data(seed=1), first),
+                    module.Generation(None, None, None, list(data["train_features"]), ["&s-up_or_down"]))
+        second = wait_for(pool, "BTC/USDT", first).model
+        assert second.get_booster().num_boosted_rounds() == 10
+    finally:
+        pool.executor.shutdown(wait=True, cancel_futures=True)
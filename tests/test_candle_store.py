@@ -0,0 +1,67 @@
+import numpy as np
+
+from backend import CandleStore
+
+
+def test_late_candle_into_full_buffer():
+    store = CandleStore(max_candles=5, reorder_window=3)
+    for t in range(0, 600, 60):
+        assert store.update(t, "100", "1")
+
+    assert store.update(510, "99", "2")
+
+    assert store.times.tolist() == [360, 420, 480, 510, 540]
+    assert store.get(510)["close"] == 99.0
+    assert store.get(540)["close"] == 100.0
+
+
+def test_late_candle_keeps_order_after_compaction():
+    store = CandleStore(max_candles=5, reorder_window=3)
+    for t in range(0, 6000, 60):
+        store.update(t, "100", "1")
+        store.update(t - 30, "100", "1")
+        assert np.all(np.diff(store.times) > 0)
+
+
+def closes(store):
+    return [c["close"] for c in store.get_all()]
+
+
+def test_bulk_load_merges_interleaved_backfill():
+    store = CandleStore(max_candles=100)
+    t = np.arange(0, 600, 60)
+    store.bulk_load(t, t, t, t, t, t)
+
+    back = np.array([30, 90, 570, 600, 120, -60])
+    assert store.bulk_load(back, back, back, back, back + 1000, back) == 5
+
+    expected = sorted(set(t.tolist()) | set(back.tolist()))
+    assert store.times.tolist() == expected
+    overwritten = {120: 1120}
+    assert closes(store) == [float(overwritten.get(x, x + 1000 if x in back else x)) for x in expected]
+
+
+def test_bulk_load_older_than_full_window_moves_nothing():
+    store = CandleStore(max_candles=5)
+    for t in range(0, 600, 60):
+        store.update(t, "100", "1")
+    before = store._times.copy()
+
+    old = np.array([-120, -60])
+    store.bulk_load(old, old, old, old, old, old)
+
+    assert store.times.tolist() == [300, 360, 420, 480, 540]
+    assert np.array_equal(store._times[store._start:], before[store._start:])
+
+
+def test_bulk_load_matches_sorted_union():
+    rng = np.random.default_rng(0)
+    store = CandleStore(max_candles=10_000)
+    seen = {}
+    for _ in range(50):
+        t = rng.choice(5000, size=rng.integers(1, 200), replace=False) * 60
+        c = rng.random(len(t))
+        store.bulk_load(t, c, c, c, c, c)
+        seen.update(zip(t.tolist(), c.tolist()))
+        assert store.times.tolist() == sorted(seen)
+    assert closes(store) == [seen[x] for x in sorted(seen)]
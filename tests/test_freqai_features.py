@@ -0,0 +1,68 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("talib")
+pytest.importorskip("technical")
+pytest.importorskip("freqtrade.strategy")
+
+STRATEGY_PATH = Path(__file__).parent.parent / "fretrade_templates" / "FreqaiExampleStrategy.py"
+PERIOD = 10
+
+
+def load_strategy_module():
+    # How freqtrade's resolver loads strategies: by path, not registered in sys.modules
+    spec = importlib.util.spec_from_file_location(STRATEGY_PATH.stem, str(STRATEGY_PATH))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def candles(n, gap=slice(300, 340), seed=0):
+    """Random candles with a stretch filled up like fill_up_missing: flat at the last close, no volume"""
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(n).cumsum()
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    volume = rng.random(n) * 1000 + 1
+    fill = close[gap.start - 1]
+    open_[gap] = high[gap] = low[gap] = close[gap] = fill
+    volume[gap] = 0.0
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="5min", tz="UTC"),
+        "open": open_, "high": high, "low": low, "close": close, "volume": volume,
+    })
+
+
+def test_incremental_features_match_talib():
+    module = load_strategy_module()
+    df = candles(600)
+    expected = pd.DataFrame(module.FreqaiExampleStrategy.period_features(df, PERIOD))
+
+    state = module.PeriodFeatures(PERIOD)
+    rows = [state.update(*row) for row in df[module.OHLCV].to_numpy().tolist()]
+    actual = pd.DataFrame(rows, columns=expected.columns)
+
+    gap = actual["%-relative_volume-period"].iloc[300 + PERIOD:340]
+    assert gap.isna().all()  # 0 / 0 over the filled-up stretch, like pandas
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-6, atol=1e-6)
+
+
+def test_feature_cache_extends_across_zero_volume():
+    module = load_strategy_module()
+    df = candles(900, gap=slice(820, 860))
+    cache = module.FeatureCache(64 * 1024**2)
+    build = module.FreqaiExampleStrategy.period_features
+
+    window = 600
+    for end in range(window, len(df) + 1):
+        frame = df.iloc[end - window:end].reset_index(drop=True)
+        columns, block = cache.get(("BTC/USDT", "5m", PERIOD), frame, PERIOD, lambda: build(frame, PERIOD))
+    assert (cache.misses, cache.hits) == (1, len(df) - window)
+
+    expected = pd.DataFrame(build(df, PERIOD)).iloc[-window:]
+    np.testing.assert_allclose(block[-100:], expected.to_numpy(dtype=np.float32)[-100:], rtol=1e-4, atol=1e-4)
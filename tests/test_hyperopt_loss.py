@@ -0,0 +1,68 @@
+import importlib.util
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("freqtrade.optimize.hyperopt")
+
+LOSS_PATH = Path(__file__).parent.parent / "fretrade_templates" / "sample_hyperopt_loss.py"
+
+
+def load_loss_module():
+    # How freqtrade's resolver loads loss files: a fresh module per load, not in sys.modules
+    spec = importlib.util.spec_from_file_location("sample_hyperopt_loss", str(LOSS_PATH))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def trades(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "pair": ["BTC/USDT"] * n,
+        "profit_ratio": rng.normal(0.002, 0.01, n),
+        "trade_duration": rng.integers(5, 600, n),
+    })
+
+
+def test_batch_loss_matches_per_epoch_loss():
+    ours, resolved = load_loss_module(), load_loss_module()
+    loss = resolved.SampleHyperOptLoss
+    results = [trades(n, seed) for seed, n in enumerate((0, 1, 40, 650))]
+    dates = dict(min_date=datetime(2024, 1, 1, tzinfo=timezone.utc), max_date=datetime(2024, 6, 1, tzinfo=timezone.utc))
+
+    assert ours.has_batch_loss(loss)
+    batch = ours.batch_loss(loss, results, config={}, processed={}, **dates)
+    single = [
+        loss.hyperopt_loss_function(results=r, trade_count=len(r), config={}, processed={}, **dates)
+        for r in results
+    ]
+    np.testing.assert_allclose(batch, single)
+
+
+def test_loss_without_batch_method_runs_per_epoch():
+    module = load_loss_module()
+
+    class PerEpochOnly(module.BatchHyperOptLoss):
+        calls = 0
+
+        @classmethod
+        def hyperopt_loss_function(cls, results, *args, **kwargs):
+            cls.calls += 1
+            return float(len(results))
+
+    assert not module.has_batch_loss(PerEpochOnly)
+    with pytest.raises(TypeError):
+        PerEpochOnly()
+    losses = module.batch_loss(PerEpochOnly, [trades(3, 0), trades(5, 1)], None, None, {}, {})
+    assert list(losses) == [3.0, 5.0] and PerEpochOnly.calls == 2
+
+
+def test_stack_results_only_stacks_the_named_columns():
+    module = load_loss_module()
+    epoch_ids, columns = module.stack_results([trades(2, 0), trades(3, 1)], ("profit_ratio",))
+    assert list(epoch_ids) == [0, 0, 1, 1, 1]
+    assert list(columns) == ["profit_ratio"]
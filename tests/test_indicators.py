@@ -0,0 +1,98 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import SMA, BollingerBands, Indicator, IndicatorEngine
+
+
+def candles(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    closes = 100 + rng.standard_normal(n).cumsum()
+    highs = closes + rng.random(n)
+    lows = closes - rng.random(n)
+    times = np.arange(n, dtype=np.int64) * 60
+    return times, highs, lows, closes
+
+
+def test_bollinger_bands_match_sample_strategy():
+    times, highs, lows, closes = candles(500)
+    engine = IndicatorEngine({"bb": BollingerBands(20, 2.0), "sma": SMA(200)})
+    engine.sync(times, highs, lows, closes, revision=0)
+    rows = pd.DataFrame(engine.closed())
+
+    typical = pd.Series((highs + lows + closes) / 3)[:-1]
+    mid = typical.rolling(20).mean()
+    std = typical.rolling(20).std()  # qtpylib.rolling_std: sample std
+    np.testing.assert_allclose(rows["bb_middleband"].astype(float), mid, rtol=1e-9)
+    np.testing.assert_allclose(rows["bb_upperband"].astype(float), mid + 2 * std, rtol=1e-9)
+    np.testing.assert_allclose(rows["sma"].astype(float), pd.Series(closes[:-1]).rolling(200).mean(), rtol=1e-9)
+
+
+def test_incremental_sync_matches_rebuild():
+    times, highs, lows, closes = candles(400, seed=1)
+    engine = IndicatorEngine({"bb": BollingerBands(20, 2.0), "sma": SMA(50)})
+    for end in range(1, len(times) + 1, 7):
+        engine.latest(times[:end], highs[:end], lows[:end], closes[:end], revision=0)
+    latest = engine.latest(times, highs, lows, closes, revision=0)
+
+    fresh = engine.rebuilt(times, highs, lows, closes, revision=1)
+    assert fresh.closed() == engine.closed()
+    assert fresh.latest(times, highs, lows, closes) == latest
+    assert engine.revision == 0
+
+
+def test_indicator_base_is_abstract():
+    with pytest.raises(TypeError):
+        Indicator()
+
+    sma = SMA(3)
+    for x in (1.0, 2.0):
+        sma.commit(x)
+    state, value = sma.step(sma.state, 6.0)
+    assert value == sma.peek(6.0) == 3.0
+    assert list(sma.state[0]) == [1.0, 2.0]  # step leaves the committed state alone
+    sma.commit(6.0)
+    assert sma.step(state, 7.0)[1] == sma.peek(7.0) == 5.0
+
+
+def test_sync_on_new_candles_only():
+    times, highs, lows, closes = candles(300, seed=2)
+    full = IndicatorEngine({"bb": BollingerBands(20, 2.0), "sma": SMA(50)})
+    full.sync(times, highs, lows, closes, revision=0)
+
+    tail = IndicatorEngine({"bb": BollingerBands(20, 2.0), "sma": SMA(50)})
+    tail.sync(times[:2], highs[:2], lows[:2], closes[:2], revision=0)
+    for end in range(3, len(times) + 1, 5):
+        start = int(np.searchsorted(times, tail.last_time, side="right"))
+        tail.latest(times[start:end], highs[start:end], lows[start:end], closes[start:end])
+    start = int(np.searchsorted(times, tail.last_time, side="right"))
+    tail.sync(times[start:], highs[start:], lows[start:], closes[start:])
+    assert tail.closed() == full.closed()
+
+
+def test_backend_converts_only_new_candles(monkeypatch):
+    import backend
+
+    store = backend.CandleStore(max_candles=1000)
+    for i in range(300):
+        store.update(i * 60, 100.0 + i % 7, 1.0)
+    engine = IndicatorEngine({"sma": SMA(20)})
+    monkeypatch.setattr(backend, "candle_store", store)
+    monkeypatch.setattr(backend, "indicators", engine)
+    monkeypatch.setattr(backend, "indicator_lock", asyncio.Lock())
+
+    converted = []
+    prices_out = store.scale.prices_out
+    monkeypatch.setattr(store.scale, "prices_out", lambda v: converted.append(len(v)) or prices_out(v))
+
+    asyncio.run(backend.latest_indicators())
+    converted.clear()
+    store.update(300 * 60, 105.0, 1.0)
+    store.update(301 * 60, 106.0, 1.0)
+    row = asyncio.run(backend.latest_indicators())
+
+    assert converted == [3, 3, 3]  # the previously forming candle, the newly closed one, the forming one
+    assert row["time"] == 301 * 60
+    assert engine.closed()[-1]["time"] == 300 * 60
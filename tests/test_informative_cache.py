@@ -0,0 +1,114 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import informative_cache
+
+STRATEGY = '''
+from freqtrade.strategy import merge_informative_pair
+
+
+class FileStrategy:
+    timeframe = "5m"
+
+    def populate_indicators(self, dataframe, informative):
+        return merge_informative_pair(dataframe, informative, "5m", "1h", ffill=True)
+'''
+
+
+def candles(start, periods, freq):
+    dates = pd.date_range(start, periods=periods, freq=freq, tz="UTC")
+    return pd.DataFrame({"date": dates, "close": np.arange(periods, dtype=float)})
+
+
+PAIR_STRATEGY = '''
+def merge_informative_pair(*args, **kwargs):
+    raise AssertionError("not routed through the cache")
+
+
+class PairStrategy:
+    def __init__(self, informative, ffill):
+        self.informative = informative
+        self.ffill = ffill
+
+    def advise_indicators(self, dataframe, metadata):
+        informative = self.informative[metadata["pair"]]
+        return merge_informative_pair(dataframe, informative, "5m", "1h", ffill=self.ffill)
+'''
+
+
+def load_strategy(tmp_path, name, source):
+    path = tmp_path / f"{name}.py"
+    path.write_text(source)
+    # How freqtrade's resolver loads strategies: by path, not registered in sys.modules
+    spec = importlib.util.spec_from_file_location(path.stem, str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, name)
+
+
+def reference_merge(dataframe, informative, timeframe, timeframe_inf, ffill=True):
+    """freqtrade's merge_informative_pair, without its checks"""
+    minutes = informative_cache.timeframe_to_seconds(timeframe) // 60
+    minutes_inf = informative_cache.timeframe_to_seconds(timeframe_inf) // 60
+    informative = informative.copy()
+    informative["date_merge"] = (
+        informative["date"] + pd.to_timedelta(minutes_inf, "m") - pd.to_timedelta(minutes, "m")
+    )
+    informative.columns = [f"{col}_{timeframe_inf}" for col in informative.columns]
+    date_merge = f"date_merge_{timeframe_inf}"
+    if ffill:
+        merged = pd.merge_ordered(dataframe, informative, fill_method="ffill", left_on="date",
+                                  right_on=date_merge, how="left")
+    else:
+        merged = pd.merge(dataframe, informative, left_on="date", right_on=date_merge, how="left")
+    return merged.drop(date_merge, axis=1)
+
+
+@pytest.mark.parametrize("ffill", [True, False])
+def test_pairs_keep_their_own_entries(tmp_path, ffill):
+    pairs = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+    base = {pair: candles("2024-01-01", 600, "5min").assign(close=lambda df, i=i: df["close"] * (i + 1))
+            for i, pair in enumerate(pairs)}
+    informative = {pair: candles("2024-01-01", 50, "1h").assign(close=lambda df, i=i: df["close"] + 100 * i)
+                   for i, pair in enumerate(pairs)}
+    strategy = load_strategy(tmp_path, "PairStrategy", PAIR_STRATEGY)(informative, ffill)
+    cache = informative_cache.install_alignment_cache(strategy)
+    misses = cache.misses
+
+    window = 300
+    for end in range(window, 600, 7):
+        for pair in pairs:
+            frame = base[pair].iloc[end - window:end].reset_index(drop=True)
+            # Informative candles closed by the end of the window, like the DataProvider returns them
+            inf = informative[pair]
+            inf = inf[inf["date"] + pd.Timedelta("1h") <= frame["date"].iloc[-1] + pd.Timedelta("5min")]
+            merged = strategy.advise_indicators(frame, {"pair": pair})
+            expected = reference_merge(frame, inf.reset_index(drop=True), "5m", "1h", ffill=ffill)
+            pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
+
+    assert cache.misses - misses == len(pairs)  # one per pair, every later window is appended
+
+
+def test_timeframe_to_seconds():
+    assert [informative_cache.timeframe_to_seconds(tf) for tf in ("1m", "5m", "1h", "4h", "1d", "1w")] == [
+        60, 300, 3600, 14400, 86400, 604800,
+    ]
+
+
+def test_strategy_loaded_from_file_uses_the_cache(tmp_path):
+    pytest.importorskip("freqtrade.strategy")
+    strategy = load_strategy(tmp_path, "FileStrategy", STRATEGY)()
+
+    cache = informative_cache.install_alignment_cache(strategy)
+    base, informative = candles("2024-01-01", 48, "5min"), candles("2024-01-01", 4, "1h")
+    hits, misses = cache.hits, cache.misses
+
+    first = strategy.populate_indicators(base, informative)
+    second = strategy.populate_indicators(base, informative)
+
+    assert (cache.misses - misses, cache.hits - hits) == (1, 1)
+    pd.testing.assert_frame_equal(first, second)
+    assert "close_1h" in first
@@ -0,0 +1,55 @@
+import json
+
+from ledger import TradeLedger
+
+
+def trade(ts: int, side: str = "buy") -> dict:
+    return {"account": "a", "symbol": "BTCUSDT", "side": side, "price": 1.0, "quantity": 1.0, "timestamp": ts}
+
+
+def test_torn_line_is_cut_before_appending(tmp_path):
+    path = tmp_path / "trades.jsonl"
+    ledger = TradeLedger(str(path))
+    ledger.extend([trade(1), trade(2)])
+    ledger.close()
+    with open(path, "a") as f:
+        f.write('{"id":2,"account":"a","sym')  # crash mid-write
+
+    ledger = TradeLedger(str(path))
+    assert len(ledger) == 2
+    assert ledger.append(trade(3, "sell"))["id"] == 2
+    ledger.close()
+
+    ledger = TradeLedger(str(path))
+    total, page = ledger.query()
+    assert total == 3
+    assert [r["id"] for r in page] == [0, 1, 2]
+    assert page[-1]["side"] == "sell"
+    ledger.close()
+
+
+def test_replay_keeps_persisted_ids(tmp_path):
+    path = tmp_path / "trades.jsonl"
+    path.write_text(
+        "".join(json.dumps({"id": i, **trade(i)}) + "\n" for i in (0, 1, 5))
+        + "not json\n"
+        + "[1, 2]\n"
+        + '{"id": 7}\n'
+        + "null\n"
+    )
+
+    ledger = TradeLedger(str(path))
+    assert ledger.skipped == 4
+    total, page = ledger.query(start=1)
+    assert total == 2
+    assert [r["id"] for r in page] == [1, 5]
+    assert ledger.append(trade(9))["id"] == 6
+    ledger.close()
+
+
+def test_backend_import_opens_no_ledger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import backend
+
+    assert backend.trading is None
+    assert not (tmp_path / backend.LEDGER_PATH).exists()
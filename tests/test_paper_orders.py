@@ -0,0 +1,84 @@
+from trading import PaperTrading
+
+
+def test_unaffordable_fill_rejects_the_order(tmp_path):
+    trading = PaperTrading(str(tmp_path / "trades.jsonl"), 1000.0)
+    big = trading.place_order("a", "BTCUSDT", {"side": "buy", "type": "limit", "price": 100, "quantity": 50}, 1)
+    small = trading.place_order("b", "BTCUSDT", {"side": "buy", "type": "limit", "price": 99, "quantity": 2}, 1)
+
+    trading.on_trade("BTCUSDT", "98", "51", 2)
+
+    rejected = trading.order(big["order"]["id"])
+    assert rejected["status"] == "rejected"
+    assert rejected["reason"] == "Insufficient balance"
+    assert rejected["filled"] == 0
+    assert trading.open_orders() == []
+
+    # The liquidity the rejected order did not take goes to the next order
+    assert trading.order(small["order"]["id"])["status"] == "filled"
+    assert trading.snapshot("b")["cash"] == 1000.0 - 2 * 99
+
+    page = trading.trades()["trades"]
+    assert [(t["order_id"], t.get("status")) for t in page] == [
+        (big["order"]["id"], "rejected"),
+        (small["order"]["id"], None),
+    ]
+    trading.close()
+
+
+def test_rejected_trade_opens_no_account(tmp_path):
+    trading = PaperTrading(str(tmp_path / "trades.jsonl"), 1000.0)
+    result = trading.trade_batch(
+        [{"account": "c", "symbol": "BTCUSDT", "side": "sell", "quantity": 1}], {"BTCUSDT": 100.0}, 1
+    )[0]
+    assert not result["success"]
+    assert "c" not in trading.portfolio.accounts
+    assert trading.portfolio.total_equity == 0
+    trading.close()
+
+
+def test_restart_rebuilds_cash_and_positions(tmp_path):
+    path = str(tmp_path / "trades.jsonl")
+    trading = PaperTrading(path, 1000.0)
+    trading.place_order("a", "BTCUSDT", {"side": "buy", "type": "limit", "price": 100, "quantity": 3}, 1)
+    trading.on_trade("BTCUSDT", "100", "5", 2)
+    trading.place_order("a", "BTCUSDT", {"side": "sell", "type": "limit", "price": 110, "quantity": 1}, 3)
+    trading.on_trade("BTCUSDT", "110", "5", 4)
+    before = trading.snapshot("a")
+    trading.close()
+
+    restarted = PaperTrading(path, 1000.0)
+    after = restarted.snapshot("a")
+    assert after["cash"] == before["cash"] == 1000.0 - 300 + 110
+    assert after["positions"]["BTCUSDT"]["qty"] == before["positions"]["BTCUSDT"]["qty"] == 2
+    assert after["realized_pnl"] == before["realized_pnl"]
+    restarted.close()
+
+
+def test_restart_restores_resting_orders(tmp_path):
+    path = str(tmp_path / "trades.jsonl")
+    trading = PaperTrading(path, 10_000.0)
+    partial = trading.place_order("a", "BTCUSDT", {"side": "buy", "type": "limit", "price": 100, "quantity": 5}, 1)
+    canceled = trading.place_order("a", "BTCUSDT", {"side": "buy", "type": "limit", "price": 90, "quantity": 1}, 1)
+    stop = trading.place_order(
+        "a", "BTCUSDT", {"side": "buy", "type": "stop_limit", "price": 105, "stop_price": 110, "quantity": 1}, 1
+    )
+    trading.on_trade("BTCUSDT", "100", "2", 2)
+    trading.cancel_order(canceled["order"]["id"])
+    trading.on_trade("BTCUSDT", "111", "0", 3)  # triggers the stop, no liquidity
+    before = {o["id"]: o for o in trading.open_orders()}
+    trading.close()
+
+    restarted = PaperTrading(path, 10_000.0)
+    assert {o["id"]: o for o in restarted.open_orders()} == before
+    assert before[partial["order"]["id"]]["filled"] == 2
+    assert before[stop["order"]["id"]]["triggered"]
+    assert restarted.order(canceled["order"]["id"])["status"] == "canceled"
+
+    # The triggered stop-limit rests at 105 and fills below its stop price
+    restarted.on_trade("BTCUSDT", "99", "10", 4)
+    assert restarted.order(stop["order"]["id"])["status"] == "filled"
+    assert restarted.order(partial["order"]["id"])["status"] == "filled"
+    new = restarted.place_order("a", "BTCUSDT", {"side": "sell", "type": "limit", "price": 200, "quantity": 1}, 5)
+    assert new["order"]["id"] == stop["order"]["id"] + 1
+    restarted.close()
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from shards import ShardedTrading, ShardUnavailable
+
+
+def test_dead_shard_fails_fast_and_restarts(tmp_path):
+    async def scenario():
+        shards = ShardedTrading(1, str(tmp_path / "trades.jsonl"), 1000.0, sample_interval=0.1, call_timeout=5.0)
+        shards.start(asyncio.get_running_loop())
+        assert await shards.call("a", "open_orders", None, "a") == []
+
+        dead = shards._procs[0]
+        dead.kill()
+        dead.join()
+        with pytest.raises(ShardUnavailable):
+            await shards.call("a", "open_orders", None, "a")
+
+        for _ in range(100):
+            if shards._procs[0] is not dead and shards._procs[0].is_alive():
+                break
+            await asyncio.sleep(0.05)
+        assert await shards.call("a", "open_orders", None, "a") == []
+        await asyncio.to_thread(shards.stop)
+
+    asyncio.run(scenario())
+
+
+def test_restarted_shard_rebuilds_its_accounts(tmp_path):
+    async def scenario():
+        shards = ShardedTrading(1, str(tmp_path / "trades.jsonl"), 1000.0, sample_interval=0.1, call_timeout=5.0)
+        shards.start(asyncio.get_running_loop())
+        await shards.call("a", "place_order", "a", "BTCUSDT", {"side": "buy", "type": "limit", "price": 100, "quantity": 2}, 1)
+        shards.broadcast_trade("BTCUSDT", "100", "5", 2)
+        resting = await shards.call(
+            "a", "place_order", "a", "BTCUSDT", {"side": "sell", "type": "limit", "price": 120, "quantity": 1}, 3
+        )
+        before = await shards.call("a", "snapshot", "a")
+        await asyncio.sleep(0.3)  # let the ledger writer flush
+
+        dead = shards._procs[0]
+        dead.kill()
+        dead.join()
+        for _ in range(100):
+            if shards._procs[0] is not dead and shards._procs[0].is_alive():
+                break
+            await asyncio.sleep(0.05)
+
+        assert await shards.call("a", "snapshot", "a") == before
+        orders = await shards.call("a", "open_orders", None, "a")
+        assert [o["id"] for o in orders] == [resting["order"]["id"]]
+        await asyncio.to_thread(shards.stop)
+
+    asyncio.run(scenario())
+
+
+def test_stop_terminates_a_hung_shard(tmp_path):
+    async def scenario():
+        shards = ShardedTrading(
+            1, str(tmp_path / "trades.jsonl"), 1000.0, sample_interval=0.1, stop_timeout=0.5
+        )
+        shards.start(asyncio.get_running_loop())
+        await shards.call("a", "open_orders", None, "a")
+        os.kill(shards._procs[0].pid, signal.SIGSTOP)
+
+        started = time.monotonic()
+        await asyncio.to_thread(shards.stop)
+        assert time.monotonic() - started < 5
+        assert not shards._procs[0].is_alive()
+
+    asyncio.run(scenario())